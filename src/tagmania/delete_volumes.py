@@ -54,7 +54,7 @@ def main():
             print(f"\nKubernetes dynamically created volumes for cluster {args.cluster}:")
             for volume in kubernetes_volumes:
                 ts = TagSet(volume.tags)
-                volume_name = ts.get("Name")
+                volume_name = ts.get("Name") or "-"
                 print(volume.id + " (" + volume_name + ")")
 
         if len(volumes) == 0 and len(kubernetes_volumes) == 0:
@@ -67,7 +67,7 @@ def main():
 
         for volume in kubernetes_volumes:
             ts = TagSet(volume.tags)
-            volume_name = ts.get("Name")
+            volume_name = ts.get("Name") or "-"
             print(volume.id + " (" + volume_name + ")")
 
         if len(volumes) != 0 or len(kubernetes_volumes) != 0:
@@ -79,6 +79,8 @@ def main():
                     cluster.delete_volumes()
                 if len(kubernetes_volumes) != 0:
                     cluster.delete_kubernetes_volumes()
+                cluster.deletions.drain()
+                print(cluster.deletions.status())
         else:
             print("No volumes found.")
 
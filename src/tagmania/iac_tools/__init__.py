@@ -6,6 +6,9 @@ resource filtering, and tag operations.
 
 Core Components:
     - ClusterSet: Manages collections of EC2 instances based on cluster tags
+    - ClusterInventory: Cached, indexed describe results shared across operations
+    - DevicePolicy: Selects the devices a backup or restore touches
+    - RestoreProfile: Initialization rate and volume settings of restored volumes
     - TagSet: Handles tag operations on AWS resources
     - FilterSet: Manages AWS resource filtering based on tags
     - Utilities: Helper functions for AWS operations
@@ -13,10 +16,48 @@ Core Components:
 The tools in this module provide the foundation for all cluster operations with
 built-in safety limits and automation tracking to ensure only managed resources
 are modified.
+
+Components are loaded on first access, and boto3 is only imported once the
+first AWS client is created, so command-line tools start quickly.
 """
 
-from .clusterset import ClusterSet
-from .filterset import FilterSet
-from .tagset import TagSet
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .clusterset import ClusterSet
+    from .device_policy import DevicePolicy
+    from .filterset import FilterSet
+    from .inventory import ClusterInventory
+    from .restore_profile import RestoreProfile
+    from .tagset import TagSet
+
+# The components are imported on first access, so that importing one module
+# of the package does not load all the others.
+_EXPORTS = {
+    "ClusterInventory": ".inventory",
+    "ClusterSet": ".clusterset",
+    "DevicePolicy": ".device_policy",
+    "FilterSet": ".filterset",
+    "RestoreProfile": ".restore_profile",
+    "TagSet": ".tagset",
+}
+
+__all__ = [
+    "ClusterInventory",
+    "ClusterSet",
+    "DevicePolicy",
+    "FilterSet",
+    "RestoreProfile",
+    "TagSet",
+]
+
 
-__all__ = ["ClusterSet", "FilterSet", "TagSet"]
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,115 @@
+"""AttachPlan - Match restored volumes to instances in linear time.
+
+Restored volumes carry an ``Instance`` tag holding the ``Name`` tag of the
+instance they belong to and a ``Device`` tag holding the device name to attach
+them as. This module builds a Name -> instance index once and walks the volumes
+a single time to produce an attach plan, instead of comparing every volume with
+every instance.
+
+Problems are collected up front so they can be reported before any API call is
+made:
+
+- volumes whose Instance tag matches no instance, or that lack a Device tag
+- two or more volumes claiming the same (instance, device) slot
+
+Example:
+    Planning and inspecting an attach:
+
+    ```python
+    plan = plan_attachments(instances, volumes, inventory.tags_of)
+    for volume_id in plan.unmatched:
+        print(f"No instance for {volume_id}")
+    for attachment in plan.attachments:
+        print(attachment.volume_id, attachment.device, attachment.instance_id)
+    ```
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from typing import Any, NamedTuple
+
+from .tagset import TagSet
+
+ResourceDict = dict[str, Any]
+
+
+class Attachment(NamedTuple):
+    """One planned volume attachment."""
+
+    volume_id: str
+    instance_id: str
+    instance_name: str
+    device: str
+
+
+class Conflict(NamedTuple):
+    """Several volumes claiming the same device on the same instance."""
+
+    instance_id: str
+    device: str
+    volume_ids: list[str]
+
+
+class AttachPlan:
+    """Result of matching volumes to instances.
+
+    Attributes:
+        attachments: Attachments that can be made, in volume order
+        unmatched: IDs of volumes with no matching instance or no Device tag
+        conflicts: Duplicate (instance, device) claims. None of the volumes
+                  involved appear in ``attachments``.
+    """
+
+    def __init__(self) -> None:
+        self.attachments: list[Attachment] = []
+        self.unmatched: list[str] = []
+        self.conflicts: list[Conflict] = []
+
+    def __len__(self) -> int:
+        return len(self.attachments)
+
+
+def plan_attachments(
+    instances: Iterable[ResourceDict],
+    volumes: Iterable[ResourceDict],
+    tags_of: Callable[[ResourceDict], TagSet] = TagSet.from_resource,
+) -> AttachPlan:
+    """Match volumes to instances by Instance tag -> Name tag.
+
+    Runs in O(instances + volumes).
+
+    Args:
+        instances: Instance describe dicts that may receive volumes
+        volumes: Volume describe dicts carrying Instance and Device tags
+        tags_of: Returns the TagSet of a resource (optional). Pass
+                ClusterInventory.tags_of to reuse cached TagSets.
+
+    Returns:
+        AttachPlan: Planned attachments plus unmatched volumes and conflicts
+    """
+    by_name: dict[str, ResourceDict] = {}
+    for instance in instances:
+        name = tags_of(instance).get("Name")
+        if name:
+            by_name.setdefault(name, instance)
+
+    plan = AttachPlan()
+    slots: dict[tuple[str, str], list[Attachment]] = {}
+    for volume in volumes:
+        ts = tags_of(volume)
+        instance_name = ts.get("Instance")
+        device = ts.get("Device")
+        matched = by_name.get(instance_name) if instance_name else None
+        if matched is None or instance_name is None or not device:
+            plan.unmatched.append(volume["VolumeId"])
+            continue
+        attachment = Attachment(volume["VolumeId"], matched["InstanceId"], instance_name, device)
+        slots.setdefault((attachment.instance_id, device), []).append(attachment)
+
+    for (instance_id, device), claims in slots.items():
+        if len(claims) > 1:
+            plan.conflicts.append(Conflict(instance_id, device, [a.volume_id for a in claims]))
+        else:
+            plan.attachments.append(claims[0])
+    return plan
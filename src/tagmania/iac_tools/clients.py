@@ -0,0 +1,217 @@
+"""ClientFactory - Share boto3 sessions and clients across the process.
+
+Creating a ``boto3.Session`` resolves credentials, and creating a client loads
+the service's endpoint and API model. Done once per ClusterSet, a script that
+works through dozens of clusters pays for that again each time. This module
+caches them instead:
+
+- One session per (profile, region), and one client and resource per service
+  on top of it. Every ClusterSet with the same profile and region shares them.
+- The connection pool of a client is sized for the calls that run at once.
+  botocore keeps 10 connections by default, so 16 parallel calls would wait
+  on each other for a connection. A request for a larger pool replaces the
+  cached client with one that has it.
+- Connect and read timeouts and TCP keep-alive are set in one place and can
+  be changed with ``configure``.
+
+Every client comes with adaptive retries and goes through the process-wide
+rate limiter (see ``rate_limit``).
+
+Example:
+    Clients for two clusters in the same account:
+
+    ```python
+    factory = get_client_factory()
+    factory.configure(read_timeout=120)
+    client = factory.client('ec2', profile='prod', max_pool_connections=34)
+    same = factory.client('ec2', profile='prod')
+    assert client is same
+    ```
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Any
+
+from .rate_limit import RateLimiter, get_rate_limiter, retry_config
+
+# botocore's own pool size, the smallest pool a client gets
+DEFAULT_POOL_CONNECTIONS = 10
+
+# Seconds to wait for a connection, and for a response once connected
+CONNECT_TIMEOUT = 10.0
+READ_TIMEOUT = 60.0
+
+if TYPE_CHECKING:
+    from botocore.config import Config
+
+
+def pool_size(concurrency: int) -> int:
+    """Connections a ClusterSet with ``concurrency`` workers can use at once.
+
+    The batch executor and the deletion queue each run up to ``concurrency``
+    calls, and the calling thread polls and describes next to them.
+    """
+    return max(DEFAULT_POOL_CONNECTIONS, 2 * concurrency + 2)
+
+
+class ClientFactory:
+    """Cached boto3 sessions, clients and resources keyed by (profile, region).
+
+    Attributes:
+        connect_timeout: Seconds to wait for a connection
+        read_timeout: Seconds to wait for a response
+        tcp_keepalive: Whether idle connections send TCP keep-alive probes
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        read_timeout: float = READ_TIMEOUT,
+        tcp_keepalive: bool = True,
+        rate_limiter: RateLimiter | None = None,
+    ) -> None:
+        """Initialize a factory with nothing cached.
+
+        Args:
+            connect_timeout: Seconds to wait for a connection
+            read_timeout: Seconds to wait for a response
+            tcp_keepalive: Send TCP keep-alive probes on idle connections
+            rate_limiter: Limiter the clients are attached to (optional).
+                         Defaults to the process-wide one.
+        """
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.tcp_keepalive = tcp_keepalive
+        self._rate_limiter = rate_limiter
+        self._lock = threading.RLock()
+        self._sessions: dict[tuple[str | None, str | None], Any] = {}
+        # (kind, service, profile, region) -> (client or resource, pool size)
+        self._clients: dict[tuple[str, str, str | None, str | None], tuple[Any, int]] = {}
+
+    def configure(
+        self,
+        connect_timeout: float | None = None,
+        read_timeout: float | None = None,
+        tcp_keepalive: bool | None = None,
+    ) -> None:
+        """Change the connection settings of the clients created from now on.
+
+        Cached clients are dropped; the sessions and their credentials are
+        kept. Clients already handed out keep their settings.
+        """
+        with self._lock:
+            if connect_timeout is not None:
+                self.connect_timeout = connect_timeout
+            if read_timeout is not None:
+                self.read_timeout = read_timeout
+            if tcp_keepalive is not None:
+                self.tcp_keepalive = tcp_keepalive
+            self._clients.clear()
+
+    def clear(self) -> None:
+        """Drop every cached session, client and resource."""
+        with self._lock:
+            self._sessions.clear()
+            self._clients.clear()
+
+    def session(self, profile: str | None = None, region: str | None = None) -> Any:
+        """The boto3 Session for a profile and region, created on first use.
+
+        Args:
+            profile: AWS profile name (optional). None uses the default
+                    credentials chain.
+            region: AWS region (optional). None uses the profile's region.
+        """
+        key = (profile, region)
+        with self._lock:
+            if key not in self._sessions:
+                # boto3 takes a few hundred milliseconds to import, so it is
+                # only loaded once a session is needed
+                import boto3
+
+                options: dict[str, Any] = {}
+                if profile:
+                    options["profile_name"] = profile
+                if region:
+                    options["region_name"] = region
+                self._sessions[key] = boto3.Session(**options)
+            return self._sessions[key]
+
+    def client(
+        self,
+        service: str,
+        profile: str | None = None,
+        region: str | None = None,
+        max_pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+    ) -> Any:
+        """A shared boto3 client, attached to the rate limiter.
+
+        Args:
+            service: Service name (e.g. 'ec2')
+            profile: AWS profile name (optional)
+            region: AWS region (optional)
+            max_pool_connections: Connections the client needs at least
+        """
+        return self._get("client", service, profile, region, max_pool_connections)
+
+    def resource(
+        self,
+        service: str,
+        profile: str | None = None,
+        region: str | None = None,
+        max_pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+    ) -> Any:
+        """A shared boto3 service resource, whose client is attached to the rate limiter.
+
+        Like every boto3 resource, it should only be used from one thread at
+        a time.
+        """
+        return self._get("resource", service, profile, region, max_pool_connections)
+
+    def _get(
+        self,
+        kind: str,
+        service: str,
+        profile: str | None,
+        region: str | None,
+        max_pool_connections: int,
+    ) -> Any:
+        key = (kind, service, profile, region)
+        with self._lock:
+            cached = self._clients.get(key)
+            if cached is not None and cached[1] >= max_pool_connections:
+                return cached[0]
+            # A client with a larger pool replaces the cached one
+            pool = max(max_pool_connections, cached[1] if cached else 0)
+            session = self.session(profile, region)
+            config = retry_config().merge(self._config(pool))
+            made = getattr(session, kind)(service, config=config)
+            limiter = self._rate_limiter or get_rate_limiter()
+            limiter.attach(made.meta.client if kind == "resource" else made)
+            self._clients[key] = (made, pool)
+            return made
+
+    def _config(self, max_pool_connections: int) -> Config:
+        from botocore.config import Config
+
+        return Config(
+            max_pool_connections=max_pool_connections,
+            connect_timeout=self.connect_timeout,
+            read_timeout=self.read_timeout,
+            tcp_keepalive=self.tcp_keepalive,
+        )
+
+
+_factory: ClientFactory | None = None
+_factory_lock = threading.Lock()
+
+
+def get_client_factory() -> ClientFactory:
+    """The process-wide ClientFactory, created on first use."""
+    global _factory
+    with _factory_lock:
+        if _factory is None:
+            _factory = ClientFactory()
+        return _factory
@@ -18,7 +18,7 @@ Key Features:
     - Comprehensive logging and error handling
 
 Safety Features:
-    - Maximum item limits to prevent performance issues
+    - Streaming, paginated queries with an opt-in item cap
     - Automation key tracking to avoid modifying unmanaged resources
     - Built-in confirmation and validation mechanisms
     - Comprehensive error handling and logging
@@ -46,14 +46,122 @@ from __future__ import annotations
 import datetime
 import logging
 import re
+import threading
 import time
+from collections.abc import Callable, Iterator
 from typing import Any
 
-import boto3
+from botocore.exceptions import ClientError
 
+from .attach_plan import AttachPlan, plan_attachments
+from .clients import get_client_factory, pool_size
+from .deletion_queue import DeletionQueue
+from .device_policy import ALL_DEVICES, DevicePolicy
+from .executor import DEFAULT_CONCURRENCY, BatchExecutor, BatchResult
+from .fast_restore import FastRestore
 from .filterset import FilterSet
+from .inventory import LIVE_INSTANCE_STATES, ClusterInventory
+from .paging import DEFAULT_PAGE_SIZE, iter_items
+from .rate_limit import get_rate_limiter
+from .records import InstanceRecord, SnapshotRecord, VolumeRecord
+from .restore_profile import (
+    BASELINE_TAG,
+    DEFAULT_PROFILE,
+    PROFILE_TAG,
+    RestoreProfile,
+    parse_baseline,
+)
 from .tagset import TagSet
 from .timing import log_duration
+from .waiter import Callback, ResourceWaiter, Target
+
+# StartInstances/StopInstances accept many IDs per call. Chunks stay small
+# enough that an instance that makes a call fail only holds back a few others.
+INSTANCE_BATCH_SIZE = 50
+
+# Attempts for an instance that hits InsufficientInstanceCapacity. The delay
+# between attempts starts at CAPACITY_RETRY_DELAY seconds and doubles.
+CAPACITY_RETRY_ATTEMPTS = 4
+CAPACITY_RETRY_DELAY = 15
+
+# Resource IDs per CreateTags/DeleteTags call. EC2 accepts up to 1000 but
+# recommends smaller batches.
+TAG_BATCH_SIZE = 500
+
+# ID field of the describe results for each kind of taggable resource
+_ID_KEYS = {
+    "instances": "InstanceId",
+    "volumes": "VolumeId",
+    "snapshots": "SnapshotId",
+    "subnets": "SubnetId",
+}
+
+# Boto3 waiter names accepted by wait_for_volumes, and the state each waits for
+_VOLUME_WAITER_STATES = {
+    "volume_available": "available",
+    "volume_in_use": "in-use",
+    "volume_deleted": "deleted",
+}
+
+# Seconds to wait for each kind of transition before giving up
+INSTANCE_WAIT_TIMEOUT = 600
+VOLUME_WAIT_TIMEOUT = 1200
+SNAPSHOT_WAIT_TIMEOUT = 3600
+# Optimizing a snapshot for fast restore takes about an hour per TiB
+FAST_RESTORE_WAIT_TIMEOUT = 3600
+# Hydrating a large volume at the lowest initialization rate takes hours
+VOLUME_INITIALIZATION_TIMEOUT = 6 * 3600
+
+# Label given to the volumes a restore detached and kept for a rollback
+ROLLBACK_LABEL_PREFIX = "rollback-"
+
+
+def rollback_label(label: str) -> str:
+    """Label of the volumes kept for rolling back the restore of ``label``."""
+    return f"{ROLLBACK_LABEL_PREFIX}{label}"
+
+
+# Label a backup's snapshots carry until all of them have completed
+PENDING_LABEL_PREFIX = "pending-"
+
+
+def pending_label(label: str) -> str:
+    """Label of the snapshots of a backup of ``label`` that is still in progress."""
+    return f"{PENDING_LABEL_PREFIX}{label}"
+
+
+class _NodeRestore:
+    """Everything the restore pipeline does to one instance, worked out up front.
+
+    Attributes:
+        instance_id: Instance being restored
+        name: Instance Name tag
+        running: Whether the instance has to be stopped first
+        start: Whether to start the instance again once its volumes are attached
+        detachments: (volume_id, device) of each volume to detach
+        delete_ids: Managed volumes of this instance to delete
+        creates: snapshot_id -> (device, create_volume arguments)
+        staged: (volume_id, device) of each already created volume to attach
+        rollback_label: Label to tag the detached volumes with instead of
+                       deleting them, or None to delete them
+    """
+
+    def __init__(self, instance_id: str, name: str, running: bool, start: bool = False) -> None:
+        self.instance_id = instance_id
+        self.name = name
+        self.running = running
+        self.start = start
+        self.detachments: list[tuple[str, str]] = []
+        self.delete_ids: list[str] = []
+        self.creates: dict[str, tuple[str, dict[str, Any]]] = {}
+        self.staged: list[tuple[str, str]] = []
+        self.rollback_label: str | None = None
+
+    def keep_for_rollback(self, label: str) -> None:
+        """Tag the detached volumes with ``label`` instead of deleting them."""
+        self.rollback_label = label
+        kept = {volume_id for volume_id, _device in self.detachments}
+        self.delete_ids = [vid for vid in self.delete_ids if vid not in kept]
 
 
 class ClusterSet:
@@ -66,7 +174,12 @@ class ClusterSet:
 
     Attributes:
         cluster_names: The name(s) of the cluster(s) being managed
-        _MAX_ITEMS: Safety limit for collection operations (150)
+        page_size: Items requested per paginated describe call
+        max_items: Opt-in cap on query results (None means no cap)
+        concurrency: Maximum number of mutating API calls in flight at once
+        deletions: Background queue of the volumes and snapshots being deleted
+        rate_limiter: Process-wide limiter the EC2 calls go through, with
+                     throttle counters
         AUTOMATION_KEY: Key used to track managed resources ('SNAPSHOT_MANAGER')
 
     Note:
@@ -75,18 +188,35 @@ class ClusterSet:
         modification of unmanaged resources.
     """
 
-    def __init__(self, cluster_names: str | list[str], profile: str | None = None) -> None:
+    def __init__(
+        self,
+        cluster_names: str | list[str],
+        profile: str | None = None,
+        page_size: int | None = DEFAULT_PAGE_SIZE,
+        max_items: int | None = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        region: str | None = None,
+    ) -> None:
         """Initialize ClusterSet for managing one or more clusters.
 
         Creates a new ClusterSet instance for managing EC2 instances and related
         resources (volumes, snapshots) for the specified cluster(s). Sets up
-        AWS connectivity and initializes safety limits and automation tracking.
+        AWS connectivity and initializes query paging and automation tracking.
 
         Args:
             cluster_names: The name of a cluster (str) or list of cluster names (list).
                          Must match the "Cluster" tag value on EC2 instances.
             profile: AWS profile name to use for authentication (optional).
                     If None, uses default AWS credentials chain.
+            page_size: Items requested per describe call (MaxResults). None uses
+                      the service default.
+            max_items: Opt-in cap on the items returned by each query method
+                      (optional). None returns everything.
+            concurrency: Maximum number of mutating API calls (create, attach,
+                        delete, ...) run at the same time. 1 runs them one
+                        after the other.
+            region: AWS region (optional). If None, uses the profile's or
+                   the environment's default region.
 
         Example:
             ```python
@@ -104,14 +234,17 @@ class ClusterSet:
             The cluster names must exactly match the "Cluster" tag values
             on your EC2 instances for operations to work correctly.
         """
-        # Collections operate lazily. Turning a collection into a list can cause
-        # performance issues if the collection is very large. Although this is
-        # unlikely in our environment, we protect against this by setting an
-        # upper bound on the number of items from the collection that can be
-        # placed in the list. If the number of items in the collection exceed
-        # this upper bound, then those items will not be processed. If this
-        # happens, then it can be addressed by increasing this value.
-        self._MAX_ITEMS = 150
+        # Queries stream results page by page through the client paginators,
+        # so memory stays bounded by the page size. Nothing is truncated
+        # unless a cap is explicitly requested with max_items, and hitting
+        # that cap is logged rather than silently dropping resources.
+        self.page_size = page_size
+        self.max_items = max_items
+
+        # Per-resource mutations are submitted to one bounded thread pool that
+        # is reused by every method of this ClusterSet.
+        self.concurrency = concurrency
+        self._executor = BatchExecutor(concurrency)
 
         # Used to ensure we don't clobber anything we don't make
         self.AUTOMATION_KEY = "SNAPSHOT_MANAGER"
@@ -134,16 +267,65 @@ class ClusterSet:
         self._logger.setLevel(logging.INFO)
         self._logger.info("Logging initialized.")
 
-        # Create a boto3 session using the specified profile if provided.
+        # The EC2 client and resource are created on first use, so building a
+        # ClusterSet (or a CLI that only parses its arguments) never loads
+        # boto3. They come from the process-wide client factory and are
+        # shared with every other ClusterSet of the same profile and region,
+        # so only the first one pays for credential resolution and endpoint
+        # loading. The client's connection pool is sized for the calls that
+        # run at once. All EC2 calls retry in adaptive mode and go through
+        # the process-wide rate limiter, so parallel work stays under the
+        # account limits.
         if profile:
-            aws_session = boto3.Session(profile_name=profile)
             self._logger.info(f"Using AWS profile: {profile}")
-        else:
-            aws_session = boto3.Session()
+        self._profile = profile
+        self._region = region
+        self._ec2_resource: Any = None
+        self._ec2_client_instance: Any = None
+        self.rate_limiter = get_rate_limiter()
+
+        # Old volumes and snapshots are deleted in the background. Nothing
+        # waits on them unless deletions.drain() is called.
+        self._deletions: DeletionQueue | None = None
+        # Worker threads of the restore pipeline can be the first to use any
+        # of them, so each is created under this lock exactly once
+        self._lazy_lock = threading.RLock()
 
-        # Create EC2 resource and client from the session.
-        self._ec2 = aws_session.resource("ec2")
-        self._ec2_client = aws_session.client("ec2")
+    @property
+    def _ec2(self) -> Any:
+        """EC2 service resource, created on first use."""
+        if self._ec2_resource is None:
+            with self._lazy_lock:
+                if self._ec2_resource is None:
+                    self._ec2_resource = get_client_factory().resource(
+                        "ec2", self._profile, self._region
+                    )
+        return self._ec2_resource
+
+    @property
+    def _ec2_client(self) -> Any:
+        """EC2 client, created on first use."""
+        if self._ec2_client_instance is None:
+            with self._lazy_lock:
+                if self._ec2_client_instance is None:
+                    self._ec2_client_instance = get_client_factory().client(
+                        "ec2", self._profile, self._region, pool_size(self.concurrency)
+                    )
+        return self._ec2_client_instance
+
+    @property
+    def deletions(self) -> DeletionQueue:
+        """Background queue of the volumes and snapshots being deleted."""
+        if self._deletions is None:
+            with self._lazy_lock:
+                if self._deletions is None:
+                    self._deletions = DeletionQueue(self._ec2_client, self.concurrency)
+        return self._deletions
+
+    @property
+    def has_deletions(self) -> bool:
+        """Whether deletions are still pending, without creating the queue (or a client)."""
+        return self._deletions is not None and bool(self._deletions.pending)
 
     @property
     def _cluster_name_str(self) -> str:
@@ -156,32 +338,247 @@ class ClusterSet:
         # Return a copy to defend against modifications
         return self._cluster_filter.copy()
 
-    def _wait_instances_running(self, instance_ids: list[str]) -> None:
-        """Wait for instances to reach running state using 5s polling."""
-        waiter = self._ec2_client.get_waiter("instance_running")
-        waiter.wait(
-            InstanceIds=instance_ids,
-            WaiterConfig={"Delay": 5, "MaxAttempts": 120},
+    def get_inventory(self) -> ClusterInventory:
+        """Create an inventory of this cluster's instances, volumes and snapshots.
+
+        The inventory fetches each section lazily with paginated describe calls
+        and caches it. Pass the same inventory to several ClusterSet methods to
+        share one set of describe results across a multi-step operation.
+
+        Returns:
+            ClusterInventory: Empty inventory bound to this cluster
+
+        Example:
+            ```python
+            inventory = cluster.get_inventory()
+            cluster.stop_instances(inventory=inventory)
+            cluster.create_snapshots('daily-backup', inventory=inventory)
+            ```
+        """
+        return ClusterInventory(
+            self._ec2_client,
+            self.get_cluster_filter(),
+            self.AUTOMATION_KEY,
+            page_size=self.page_size,
         )
 
+    def _inventory(self, inventory: ClusterInventory | None) -> ClusterInventory:
+        """Return the given inventory or a fresh one for a single call."""
+        return inventory if inventory is not None else self.get_inventory()
+
+    def get_waiter(self) -> ResourceWaiter:
+        """Create a waiter that polls this ClusterSet's instances, volumes and snapshots.
+
+        Returns:
+            ResourceWaiter: Empty waiter bound to this ClusterSet's EC2 client
+
+        Example:
+            ```python
+            waiter = cluster.get_waiter()
+            waiter.add_many('volume', volume_ids, 'available')
+            waiter.add_many('snapshot', snapshot_ids, 'completed')
+            waiter.wait()
+            ```
+        """
+        return ResourceWaiter(self._ec2_client)
+
+    def _wait(
+        self,
+        kind: str,
+        resource_ids: list[str],
+        target: Target,
+        timeout: float,
+        callback: Callback | None = None,
+    ) -> None:
+        """Wait for resources of one kind to reach a target state."""
+        waiter = self.get_waiter()
+        waiter.add_many(kind, resource_ids, target, callback)
+        waiter.wait(timeout=timeout)
+
+    def _wait_instances_running(self, instance_ids: list[str]) -> None:
+        """Wait for instances to reach running state."""
+        self._wait("instance", instance_ids, "running", INSTANCE_WAIT_TIMEOUT)
+
     def _wait_instances_stopped(self, instance_ids: list[str]) -> None:
-        """Wait for instances to reach stopped state using 5s polling."""
-        waiter = self._ec2_client.get_waiter("instance_stopped")
-        waiter.wait(
-            InstanceIds=instance_ids,
-            WaiterConfig={"Delay": 5, "MaxAttempts": 120},
+        """Wait for instances to reach stopped state."""
+        self._wait("instance", instance_ids, "stopped", INSTANCE_WAIT_TIMEOUT)
+
+    def _change_instance_states(
+        self, inv: ClusterInventory, instances: list[Any], action: str
+    ) -> None:
+        """Start or stop inventory instances in chunked calls, then wait for them.
+
+        Args:
+            inv: Inventory the instances came from
+            instances: Inventory instance dicts
+            action: 'start' or 'stop'
+        """
+        call: Callable[..., Any]
+        if action == "start":
+            call, wait, verb, state = (
+                self._ec2_client.start_instances,
+                self._wait_instances_running,
+                "Starting",
+                "running",
+            )
+        else:
+            call, wait, verb, state = (
+                self._ec2_client.stop_instances,
+                self._wait_instances_stopped,
+                "Stopping",
+                "stopped",
+            )
+        for i in instances:
+            name = inv.tags_of(i).get("Name")
+            print(f"{verb} {name} ({i['InstanceId']})")
+        changed, retried = self._send_instance_state_calls(
+            call, f"{action}_instances", [i["InstanceId"] for i in instances]
         )
+        if changed:
+            # Wait for all instances in one ResourceWaiter loop, which polls
+            # only the unfinished ones and backs off while nothing changes
+            print(f"Waiting for {len(changed)} instances to {action}...")
+            wait(changed)
+            inv.mark_state(changed, state)
+        retried.raise_for_failures()
+
+    def _send_instance_state_calls(
+        self, call: Callable[..., Any], operation: str, instance_ids: list[str]
+    ) -> tuple[list[str], BatchResult]:
+        """Send StartInstances/StopInstances for many instances in chunked calls.
 
-    def get_instances(self) -> list[Any]:
+        Returns:
+            The IDs whose state change was accepted, and the result of the
+            per-instance retries, whose failures are the instances that could
+            not be changed
+        """
+        # One call per chunk of IDs, chunks run concurrently
+        chunks = [
+            instance_ids[n : n + INSTANCE_BATCH_SIZE]
+            for n in range(0, len(instance_ids), INSTANCE_BATCH_SIZE)
+        ]
+        result = self._executor.run(
+            operation, lambda chunk: self._instance_state_call(call, chunk), chunks
+        )
+        changed = [instance_id for chunk in result.succeeded_items for instance_id in chunk]
+        # A single instance (e.g. one without capacity) fails its whole chunk.
+        # Retry those chunks one instance at a time so the others still go
+        # through and each failure is reported against its own instance.
+        retry_ids = [instance_id for chunk, _error in result.failed for instance_id in chunk]
+        retried = self._executor.run(
+            operation,
+            lambda instance_id: self._instance_state_call_with_retry(call, instance_id),
+            retry_ids,
+        )
+        changed.extend(retried.succeeded_items)
+        for changes in result.results + retried.results:
+            for instance_id, previous, current in changes:
+                self._logger.debug(f"{operation}: {instance_id} {previous} -> {current}")
+        return changed, retried
+
+    @staticmethod
+    def _instance_state_call(
+        call: Callable[..., Any], instance_ids: list[str]
+    ) -> list[tuple[str, str, str]]:
+        """Run StartInstances or StopInstances for a list of IDs.
+
+        Returns:
+            (instance_id, previous state, current state) for each instance
+        """
+        response = call(InstanceIds=instance_ids)
+        changes = response.get("StartingInstances") or response.get("StoppingInstances") or []
+        return [
+            (c["InstanceId"], c["PreviousState"]["Name"], c["CurrentState"]["Name"])
+            for c in changes
+        ]
+
+    def _instance_state_call_with_retry(
+        self, call: Callable[..., Any], instance_id: str
+    ) -> list[tuple[str, str, str]]:
+        """Change one instance's state, retrying capacity errors with backoff."""
+        delay = CAPACITY_RETRY_DELAY
+        attempt = 1
+        while True:
+            try:
+                return self._instance_state_call(call, [instance_id])
+            except ClientError as e:
+                code = e.response.get("Error", {}).get("Code")
+                if code != "InsufficientInstanceCapacity" or attempt >= CAPACITY_RETRY_ATTEMPTS:
+                    raise
+            self._logger.warning(
+                f"{instance_id}: insufficient capacity, retrying in {delay}s "
+                f"(attempt {attempt} of {CAPACITY_RETRY_ATTEMPTS})."
+            )
+            time.sleep(delay)
+            delay *= 2
+            attempt += 1
+
+    def _iter_describe(
+        self,
+        operation: str,
+        result_path: str,
+        filters: list[Any],
+        max_items: int | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Stream describe results using this ClusterSet's paging settings."""
+        return iter_items(
+            self._ec2_client,
+            operation,
+            result_path,
+            page_size=self.page_size,
+            max_items=max_items if max_items is not None else self.max_items,
+            Filters=filters,
+        )
+
+    def _build_resource(self, resource_name: str, identifier: str) -> Any:
+        """boto3 resource a record falls back on for actions and unknown attributes."""
+        return getattr(self._ec2, resource_name)(identifier)
+
+    @staticmethod
+    def _hydrate(factory: Callable[[str], Any], identifier: str, data: dict[str, Any]) -> Any:
+        """Build a boto3 resource object pre-loaded with describe data.
+
+        Pre-loading the data means attribute access (tags, placement, ...)
+        does not trigger a per-object describe call.
+        """
+        resource = factory(identifier)
+        resource.meta.data = data
+        return resource
+
+    def iter_instances(
+        self, states: list[str] | None = None, max_items: int | None = None
+    ) -> Iterator[InstanceRecord]:
+        """Stream EC2 instances belonging to this cluster set.
+
+        Instances are fetched page by page as the iterator is consumed.
+
+        Args:
+            states: Instance states to include (optional). Defaults to every
+                   state except terminated.
+            max_items: Cap for this call (optional). Defaults to self.max_items.
+
+        Yields:
+            InstanceRecord: Describe data of each instance, read like a boto3
+            Instance without building one
+        """
+        fs = FilterSet(self.get_cluster_filter())
+        fs.add("instance-state-name", states or LIVE_INSTANCE_STATES)
+        for data in self._iter_describe(
+            "describe_instances", "Reservations.Instances", fs.to_list(), max_items
+        ):
+            yield InstanceRecord(data, self._build_resource)
+
+    def get_instances(self) -> list[InstanceRecord]:
         """Get all EC2 instances belonging to this cluster set.
 
         Retrieves all EC2 instances that have a "Cluster" tag matching any of the
-        cluster names specified during initialization. The instances are filtered
-        using the cluster filter and limited by the safety maximum (_MAX_ITEMS).
+        cluster names specified during initialization, excluding terminated
+        instances.
 
         Returns:
-            list: List of EC2 instance objects from boto3. Each instance object
-                 contains all AWS instance metadata including ID, state, tags, etc.
+            list: InstanceRecord of each instance. It reads like a boto3
+                 Instance (ID, state, tags, etc.), and builds one only for
+                 actions and attributes missing from the describe data.
 
         Example:
             ```python
@@ -192,19 +589,25 @@ class ClusterSet:
             ```
 
         Note:
-            Returns a maximum of _MAX_ITEMS (150) instances for performance protection.
-            If your cluster has more instances, increase this limit or use filtering.
+            Results are not capped unless max_items was given. Use
+            iter_instances to stream very large clusters.
         """
         self._logger.debug("method_call: get_instances")
-        fs = FilterSet(self.get_cluster_filter())
-        # Exclude terminated instances
-        fs.add(
-            "instance-state-name",
-            ["pending", "running", "shutting-down", "stopped", "stopping"],
+        return list(self.iter_instances())
+
+    def _group_by_cluster(self, instances: Iterator[Any]) -> dict[Any, list[Any]]:
+        """Group instances by their Cluster tag."""
+        cluster_names = (
+            self.cluster_names if isinstance(self.cluster_names, list) else [self.cluster_names]
         )
-        filters = fs.to_list()
-        instances = self._ec2.instances.filter(Filters=filters)
-        return list(instances.limit(self._MAX_ITEMS))
+        cluster_dict: dict[str, list[Any]] = {k: [] for k in cluster_names}
+
+        for i in instances:
+            cluster_tag = TagSet(i.tags).get("Cluster")
+            if cluster_tag is not None:
+                cluster_dict[cluster_tag].append(i)
+
+        return cluster_dict
 
     def get_deployed_clusters(self) -> dict[Any, list[Any]]:
         """
@@ -216,26 +619,7 @@ class ClusterSet:
             dictionary of clusters
         """
         self._logger.debug("method_call: get_deployed_clusters")
-        fs = FilterSet(self.get_cluster_filter())
-        # Exclude terminated instances
-        fs.add(
-            "instance-state-name",
-            ["pending", "running", "shutting-down", "stopped", "stopping"],
-        )
-        filters = fs.to_list()
-        instances = self._ec2.instances.filter(Filters=filters)
-        instance_list = list(instances)
-        cluster_names = (
-            self.cluster_names if isinstance(self.cluster_names, list) else [self.cluster_names]
-        )
-        cluster_dict: dict[str, list[Any]] = {k: [] for k in cluster_names}
-
-        for i in instance_list:
-            cluster_tag = TagSet(i.tags).get("Cluster")
-            if cluster_tag is not None:
-                cluster_dict[cluster_tag].append(i)
-
-        return cluster_dict
+        return self._group_by_cluster(self.iter_instances())
 
     def get_deployed_cluster_names(self) -> set[str | None]:
         """
@@ -247,25 +631,10 @@ class ClusterSet:
             set of deployed cluster_names
         """
         self._logger.debug("method_call: get_deployed_cluster_names")
-        fs = FilterSet(self.get_cluster_filter())
-        # Exclude terminated instances
-        fs.add(
-            "instance-state-name",
-            ["pending", "running", "shutting-down", "stopped", "stopping"],
-        )
-        filters = fs.to_list()
-        instances = self._ec2.instances.filter(Filters=filters)
-        instance_list = list(instances)
-        instance_cluster_names = []
+        # Only the names are kept, so memory does not grow with the cluster
+        return {TagSet(i.tags).get("Cluster") for i in self.iter_instances()}
 
-        for i in instance_list:
-            cluster_name = TagSet(i.tags).get("Cluster")
-            if cluster_name not in instance_cluster_names:
-                instance_cluster_names.append(cluster_name)
-
-        return set(instance_cluster_names)
-
-    def get_running_instances(self) -> list[Any]:
+    def get_running_instances(self) -> list[InstanceRecord]:
         """
         Get list of instances that are powered on. This includes instances in
         a pending, running, or stopping state.
@@ -276,12 +645,8 @@ class ClusterSet:
             list of instances
         """
         self._logger.debug("method_call: get_instances")
-        fs = FilterSet(self.get_cluster_filter())
         # Only want instances that are pending, running, or stopping
-        fs.add("instance-state-name", ["pending", "running", "stopping"])
-        filters = fs.to_list()
-        instances = self._ec2.instances.filter(Filters=filters)
-        return list(instances.limit(self._MAX_ITEMS))
+        return list(self.iter_instances(["pending", "running", "stopping"]))
 
     def get_running_clusters(self) -> dict[Any, list[Any]]:
         """
@@ -294,25 +659,10 @@ class ClusterSet:
             dictionary of running clusters
         """
         self._logger.debug("method_call: get_running_clusters")
-        fs = FilterSet(self.get_cluster_filter())
         # Only want instances that are pending, running, or stopping
-        fs.add("instance-state-name", ["pending", "running", "stopping"])
-        filters = fs.to_list()
-        instances = self._ec2.instances.filter(Filters=filters)
-        instance_list = list(instances)
-        cluster_names = (
-            self.cluster_names if isinstance(self.cluster_names, list) else [self.cluster_names]
-        )
-        cluster_dict: dict[str, list[Any]] = {k: [] for k in cluster_names}
-
-        for i in instance_list:
-            cluster_tag = TagSet(i.tags).get("Cluster")
-            if cluster_tag is not None:
-                cluster_dict[cluster_tag].append(i)
-
-        return cluster_dict
+        return self._group_by_cluster(self.iter_instances(["pending", "running", "stopping"]))
 
-    def get_stopped_instances(self) -> list[Any]:
+    def get_stopped_instances(self) -> list[InstanceRecord]:
         """
         Get list of instances that are powered off.
 
@@ -322,12 +672,8 @@ class ClusterSet:
             list of instances
         """
         self._logger.debug("method_call: get_instances")
-        fs = FilterSet(self.get_cluster_filter())
         # Only want instances that are completely stopped
-        fs.add("instance-state-name", "stopped")
-        filters = fs.to_list()
-        instances = self._ec2.instances.filter(Filters=filters)
-        return list(instances.limit(self._MAX_ITEMS))
+        return list(self.iter_instances(["stopped"]))
 
     def get_stopped_clusters(self) -> dict[Any, list[Any]]:
         """
@@ -339,31 +685,20 @@ class ClusterSet:
             dictionary of stopped clusters
         """
         self._logger.debug("method_call: get_stopped_clusters")
-        fs = FilterSet(self.get_cluster_filter())
         # Only want instances that are completely stopped
-        fs.add("instance-state-name", "stopped")
-        filters = fs.to_list()
-        instances = self._ec2.instances.filter(Filters=filters)
-        instance_list = list(instances)
-        cluster_names = (
-            self.cluster_names if isinstance(self.cluster_names, list) else [self.cluster_names]
-        )
-        cluster_dict: dict[str, list[Any]] = {k: [] for k in cluster_names}
-
-        for i in instance_list:
-            cluster_tag = TagSet(i.tags).get("Cluster")
-            if cluster_tag is not None:
-                cluster_dict[cluster_tag].append(i)
-
-        return cluster_dict
+        return self._group_by_cluster(self.iter_instances(["stopped"]))
 
-    def start_instances(self) -> None:
+    def start_instances(self, inventory: ClusterInventory | None = None) -> None:
         """Start all stopped EC2 instances in this cluster.
 
         Identifies all instances in the cluster that are currently in 'stopped' state
         and starts them. Running instances are not affected. The operation processes
         instances in batches and provides feedback on progress.
 
+        Args:
+            inventory: Shared cluster inventory (optional). If None, a fresh
+                      inventory is fetched for this call.
+
         Example:
             ```python
             cluster = ClusterSet('production-web')
@@ -376,72 +711,46 @@ class ClusterSet:
             several minutes for large clusters.
         """
         self._logger.debug("method_call: start_instances")
-        instances = self.get_stopped_instances()
+        inv = self._inventory(inventory)
+        instances = inv.instances_in_state("stopped")
         if len(instances) == 0:
             print("No instances to start.")
         else:
-            # Start instances
-            for i in instances:
-                name = TagSet(i.tags).get("Name")
-                print(f"Starting {name} ({i.id})")
-                i.start()
-            # Wait for all instances in one batch call with 5s polling
-            print(f"Waiting for {len(instances)} instances to start...")
-            self._wait_instances_running([i.id for i in instances])
+            self._change_instance_states(inv, instances, "start")
 
-    def stop_instances(self) -> None:
+    def stop_instances(self, inventory: ClusterInventory | None = None) -> None:
         """
         Stop instances associated with this cluster.
 
         Args:
-            none
+            - inventory: shared cluster inventory (optional)
         Returns:
             none
         """
         self._logger.debug("method_call: stop_instances")
-        instances = self.get_running_instances()
+        inv = self._inventory(inventory)
+        instances = inv.instances_in_state("pending", "running", "stopping")
         if len(instances) == 0:
             print("No instances to stop.")
         else:
-            # Stop instances
-            for i in instances:
-                name = TagSet(i.tags).get("Name")
-                print(f"Stopping {name} ({i.id})")
-                i.stop()
-            # Wait for all instances in one batch call with 5s polling
-            print(f"Waiting for {len(instances)} instances to stop...")
-            self._wait_instances_stopped([i.id for i in instances])
+            self._change_instance_states(inv, instances, "stop")
 
     def tag_instances(self, tags: list[dict[str, str]]) -> None:
-        # The resource API is somewhat less efficient than the low-level client
-        # API because it does one request per tag operation. For reasonably
-        # sized collections this should be ok.
-        # tags = {'key': 'values'}
-        instances = self.get_instances()
-        for i in instances:
-            print(f"Tagging instance {i.id}")
-            i.create_tags(Tags=tags)
+        self._bulk_tag("create_tags", {"instances": [i.data for i in self.iter_instances()]}, tags)
 
     def untag_instances(self, tags: list[dict[str, str]]) -> None:
-        # Might as well un-tag on one big batch since instance objects don't
-        # have direct support for un-tagging.
-        instances = self.get_instances()
-        instance_ids = []
-        for i in instances:
-            print(f"Un-tagging instance {i.id}")
-            instance_ids.append(i.id)
-        self._ec2_client.delete_tags(Resources=instance_ids, Tags=tags)  # type: ignore[arg-type]
+        self._bulk_tag("delete_tags", {"instances": [i.data for i in self.iter_instances()]}, tags)
 
-    def get_volumes(self) -> list[Any]:
-        """
-        Get list of volumes associated with this cluster.
+    def iter_volumes(self, max_items: int | None = None) -> Iterator[VolumeRecord]:
+        """Stream managed volumes associated with this cluster.
 
         Args:
-            none
-        Returns:
-            list of volumes
+            max_items: Cap for this call (optional). Defaults to self.max_items.
+
+        Yields:
+            VolumeRecord: Describe data of each volume, read like a boto3
+            Volume without building one
         """
-        self._logger.debug("method_call: get_volumes")
         fs = FilterSet(self.get_cluster_filter())
         # The tool deliberately only works with volumes that have the tag
         # 'automation_key' set. It will ignore all other volumes so that it
@@ -451,20 +760,31 @@ class ClusterSet:
         # so when looking for restored volumes, we can just look for managed
         # volumes that have a label.
         fs.add("tag:automation_key", ["PROVISIONER", self.AUTOMATION_KEY])
-        filters = fs.to_list()
-        volumes = self._ec2.volumes.filter(Filters=filters)
-        return list(volumes.limit(self._MAX_ITEMS))
+        for data in self._iter_describe("describe_volumes", "Volumes", fs.to_list(), max_items):
+            yield VolumeRecord(data, self._build_resource)
 
-    def get_kubernetes_volumes(self) -> list[Any]:
+    def get_volumes(self) -> list[VolumeRecord]:
         """
-        Get list of kubernetes volumes associated with this cluster.
+        Get list of volumes associated with this cluster.
 
         Args:
             none
         Returns:
-            list of kubernetes volumes
+            list of volumes
+        """
+        self._logger.debug("method_call: get_volumes")
+        return list(self.iter_volumes())
+
+    def iter_kubernetes_volumes(self, max_items: int | None = None) -> Iterator[VolumeRecord]:
+        """Stream kubernetes volumes associated with this cluster.
+
+        Args:
+            max_items: Cap for this call (optional). Defaults to self.max_items.
+
+        Yields:
+            VolumeRecord: Describe data of each volume, read like a boto3
+            Volume without building one
         """
-        self._logger.debug("method_call: get_kubernetes_volumes")
         fs = FilterSet(
             [
                 {
@@ -479,20 +799,34 @@ class ClusterSet:
                 },
             ]
         )
-        filters = fs.to_list()
-        volumes = self._ec2.volumes.filter(Filters=filters)
-        return list(volumes)
+        for data in self._iter_describe("describe_volumes", "Volumes", fs.to_list(), max_items):
+            yield VolumeRecord(data, self._build_resource)
 
-    def get_restored_volumes(self, label: str | None = None) -> list[Any]:
+    def get_kubernetes_volumes(self) -> list[VolumeRecord]:
         """
-        Get list of volumes that were previously created from snapshots.
+        Get list of kubernetes volumes associated with this cluster.
 
         Args:
-            - label: label of volumes being sought (optional)
+            none
         Returns:
-            list of snapshots
+            list of kubernetes volumes
+        """
+        self._logger.debug("method_call: get_kubernetes_volumes")
+        return list(self.iter_kubernetes_volumes())
+
+    def iter_restored_volumes(
+        self, label: str | None = None, max_items: int | None = None
+    ) -> Iterator[VolumeRecord]:
+        """Stream volumes that were previously created from snapshots.
+
+        Args:
+            label: Label of volumes being sought (optional)
+            max_items: Cap for this call (optional). Defaults to self.max_items.
+
+        Yields:
+            VolumeRecord: Describe data of each volume, read like a boto3
+            Volume without building one
         """
-        self._logger.debug("method_call: get_restored_volumes")
         fs = FilterSet(self.get_cluster_filter())
         # These volumes can be in available state (if just created) or in-use state (if attached)
         # We need to check for both states to properly detect restored volumes
@@ -506,118 +840,271 @@ class ClusterSet:
         # set of available volumes.
         if label is not None:
             fs.add("tag:Label", label)
-        filters = fs.to_list()
-        volumes = self._ec2.volumes.filter(Filters=filters)
-        return list(volumes.limit(self._MAX_ITEMS))
+        for data in self._iter_describe("describe_volumes", "Volumes", fs.to_list(), max_items):
+            yield VolumeRecord(data, self._build_resource)
 
-    def attach_volumes(self, label: str) -> None:
+    def get_restored_volumes(self, label: str | None = None) -> list[VolumeRecord]:
+        """
+        Get list of volumes that were previously created from snapshots.
+
+        Args:
+            - label: label of volumes being sought (optional)
+        Returns:
+            list of volumes
+        """
+        self._logger.debug("method_call: get_restored_volumes")
+        return list(self.iter_restored_volumes(label))
+
+    def plan_attachments(
+        self,
+        label: str,
+        name_pattern: str | None = None,
+        inventory: ClusterInventory | None = None,
+        policy: DevicePolicy = ALL_DEVICES,
+    ) -> AttachPlan:
+        """
+        Work out which restored volumes go to which instances without attaching anything.
+
+        Args:
+            - label: label of volumes to attach
+            - name_pattern: regex pattern limiting the instances (optional)
+            - inventory: shared cluster inventory (optional)
+            - policy: devices to attach (optional). Defaults to all of them.
+        Returns:
+            AttachPlan with attachments, unmatched volumes and conflicts
+        """
+        inv = self._inventory(inventory)
+        # We should be able to work with get_volumes, but this just protects
+        # against the case when users are manually creating volumes. It filters
+        # out any volumes that were not created by the snapshot manager.
+        volumes = [
+            v for v in inv.restored_volumes(label) if v.get("State") not in ("deleting", "deleted")
+        ]
+        instances = inv.instances
+        if name_pattern:
+            instances = self._filter_instances_by_name_regex(instances, name_pattern)
+            # Volumes of instances outside the pattern are not ours to attach
+            pattern = re.compile(name_pattern)
+            volumes = [v for v in volumes if pattern.search(inv.tags_of(v).get("Instance") or "")]
+        volumes = [v for v in volumes if self._selects_tagged(inv, policy, v, v.get("Size"))]
+        # The association is performed by matching the volume 'Instance' tag
+        # to the instance 'Name' tag.
+        return plan_attachments(instances, volumes, inv.tags_of)
+
+    def _attach_planned(self, plan: AttachPlan, inv: ClusterInventory) -> list[str]:
+        """Report problems in an attach plan, then perform its attachments.
+
+        Raises:
+            Exception: If two volumes claim the same device on one instance.
+                      Nothing is attached in that case.
+        """
+        for volume_id in plan.unmatched:
+            print(f"Warning: No matching instance or device for volume {volume_id}.")
+        if plan.conflicts:
+            for conflict in plan.conflicts:
+                print(
+                    f"Error: Volumes {', '.join(conflict.volume_ids)} all claim "
+                    f"{conflict.device} on {conflict.instance_id}."
+                )
+            raise Exception("Error: attach_volumes: conflicting volumes, nothing was attached.")
+        for attachment in plan.attachments:
+            shortname = attachment.instance_name.split(".")[0]
+            print(
+                f"Attaching {attachment.device} ({attachment.volume_id}) to "
+                f"{shortname} ({attachment.instance_id})"
+            )
+        result = self._executor.run(
+            "attach_volume",
+            lambda a: self._ec2_client.attach_volume(
+                Device=a.device, InstanceId=a.instance_id, VolumeId=a.volume_id
+            ),
+            plan.attachments,
+        )
+        volume_ids = [a.volume_id for a in result.succeeded_items]
+        if volume_ids:
+            # Wait for the volumes to be attached
+            print(f"Waiting for {len(volume_ids)} volumes to be attached...")
+            self.wait_for_volumes(volume_ids, "volume_in_use")
+            inv.invalidate("attached_volumes", "volumes")
+        result.raise_for_failures()
+        return volume_ids
+
+    def attach_volumes(
+        self,
+        label: str,
+        inventory: ClusterInventory | None = None,
+        policy: DevicePolicy = ALL_DEVICES,
+    ) -> None:
         """
         Attach volumes to associated instances.
 
         Args:
             - label: label of volume to attach
+            - inventory: shared cluster inventory (optional)
+            - policy: devices to attach (optional). Defaults to all of them.
         Returns:
             none
         """
         self._logger.debug("method_call: attach_volumes")
-        instances = self.get_instances()
-        # We should be able to work with get_volumes, but this just protects
-        # against the case when users are manually creating volumes. It filters
-        # out any volumes that were not created by the snapshot manager.
-        volumes = self.get_restored_volumes(label)
-        # This is for debugging purposes. Sometimes the algorithm below doesn't
-        # find all volumes.
-        # volume_list = list(volumes)
-        # print(f"Found {len(volume_list)} volumes to attach.")
-
-        # For each instance, find all associated volumes and attach them. The
-        # association is performed by matching the volume 'Instance' tag to
-        # the instance 'Name' tag.
-        volume_ids = []
-        for i in instances:
-            instance_name = TagSet(i.tags).get("Name") or ""
-            for volume in volumes:
-                ts = TagSet(volume.tags)
-                instance = ts.get("Instance")
-                device = ts.get("Device")
-                if instance == instance_name:
-                    # Attach volume
-                    shortname = instance_name.split(".")[0]
-                    print(f"Attaching {device} ({volume.id}) to {shortname} ({i.id})")
-                    volume.attach_to_instance(Device=device, InstanceId=i.id)
-                    volume_ids.append(volume.id)
-        if len(volume_ids) == 0:
+        inv = self._inventory(inventory)
+        plan = self.plan_attachments(label, inventory=inv, policy=policy)
+        if len(self._attach_planned(plan, inv)) == 0:
             # This is probably an error. The expectation is that we have a set
             # of newly created volumes from snapshots.
             print("Error: No volumes to attach.")
-        else:
-            # Wait for the volumes to be attached
-            print(f"Waiting for {len(volume_ids)} volumes to be attached...")
-            self.wait_for_volumes(volume_ids, "volume_in_use")
 
-    def create_volumes(self, label: str) -> None:
+    def create_volumes(
+        self,
+        label: str,
+        inventory: ClusterInventory | None = None,
+        policy: DevicePolicy = ALL_DEVICES,
+        profile: RestoreProfile = DEFAULT_PROFILE,
+    ) -> None:
         """
         Create new volumes from managed snapshots.
 
         Args:
             - label: label of snapshots to restore
+            - inventory: shared cluster inventory (optional)
+            - policy: devices to restore (optional). Defaults to all of them.
+            - profile: initialization rate and volume settings (optional)
         Returns:
             none
         """
         self._logger.debug("method_call: create_managed_volumes")
         with log_duration(self._logger, "create_volumes"):
-            snapshots = self.get_snapshots(label)
+            inv = self._inventory(inventory)
+            snapshots = inv.snapshots(label)
             # Check if snapshot list is empty (e.g. due to an invalid label)
             if len(snapshots) == 0:
                 print(f"Error: No snapshots found with label '{label}'.")
-            # Create volumes
-            volume_ids = []
-            for snapshot in snapshots:
-                # Determine snapshot's associated instance and device. This is
-                # needed later on so that we know where to attach it.
-                ts = TagSet(snapshot.tags)
-                device = ts.get("Device")
-                instance = ts.get("Instance")
-                if not device:
-                    raise Exception(
-                        f"Error: create_volume: Can't find device tag for snapshot {snapshot.id}."
-                    )
-                if not instance:
-                    raise Exception(
-                        f"Error: create_volume: Can't find instance tag for snapshot {snapshot.id}."
-                    )
-                # Determine availability zone from one of the cluster instances
-                avail_zone = self.get_instances()[0].placement["AvailabilityZone"]
-                # Make tags
-                ts = TagSet()
-                ts.add("Cluster", self._cluster_name_str)
-                ts.add("Device", device)
-                ts.add("Instance", instance)
-                ts.add("Label", label)
-                ts.add("Name", f"{instance} - {device}")
-                ts.add("automation_key", self.AUTOMATION_KEY)
-                tags = ts.to_list()
-                # Create volume
-                print(f"Creating volume from snapshot {snapshot.id}")
-                volume = self._ec2.create_volume(
-                    SnapshotId=snapshot.id,
-                    AvailabilityZone=avail_zone,
-                    VolumeInitializationRate=300,
-                    TagSpecifications=[{"ResourceType": "volume", "Tags": tags}],
+                return
+            snapshots = [
+                s for s in snapshots if self._selects_tagged(inv, policy, s, s.get("VolumeSize"))
+            ]
+            self._create_volumes_from_snapshots(inv, snapshots, label, profile=profile)
+
+    @staticmethod
+    def _snapshot_target(inv: ClusterInventory, snapshot: dict[str, Any]) -> tuple[str, str]:
+        """Return the (device, instance name) a snapshot's volume belongs to.
+
+        Raises:
+            Exception: If the snapshot lacks its Device or Instance tag
+        """
+        # Determine snapshot's associated instance and device. This is
+        # needed later on so that we know where to attach it.
+        ts = inv.tags_of(snapshot)
+        device = ts.get("Device")
+        instance = ts.get("Instance")
+        if not device:
+            raise Exception(
+                f"Error: create_volume: Can't find device tag for snapshot {snapshot['SnapshotId']}."
+            )
+        if not instance:
+            raise Exception(
+                f"Error: create_volume: Can't find instance tag for snapshot {snapshot['SnapshotId']}."
+            )
+        return device, instance
+
+    @staticmethod
+    def _availability_zones(inv: ClusterInventory) -> dict[str, str]:
+        """Map each instance Name tag to the availability zone of that instance."""
+        zones: dict[str, str] = {}
+        for i in inv.instances:
+            name = inv.tags_of(i).get("Name")
+            if name:
+                zones.setdefault(name, i["Placement"]["AvailabilityZone"])
+        return zones
+
+    def _volume_tags(self, device: str, instance: str, label: str) -> TagSet:
+        """Tags of a volume managed by the snapshot manager."""
+        ts = TagSet()
+        ts.add("Cluster", self._cluster_name_str)
+        ts.add("Device", device)
+        ts.add("Instance", instance)
+        ts.add("Label", label)
+        ts.add("Name", f"{instance} - {device}")
+        ts.add("automation_key", self.AUTOMATION_KEY)
+        return ts
+
+    def _volume_request(
+        self,
+        device: str,
+        instance: str,
+        label: str,
+        avail_zone: str,
+        profile: RestoreProfile = DEFAULT_PROFILE,
+        size: int | None = None,
+    ) -> dict[str, Any]:
+        """Build the create_volume arguments (except SnapshotId) for a restored volume."""
+        ts = self._volume_tags(device, instance, label)
+        baseline = profile.baseline_tag()
+        if baseline is not None:
+            ts.add(BASELINE_TAG, baseline)
+        return {
+            "AvailabilityZone": avail_zone,
+            **profile.volume_options(size),
+            "TagSpecifications": [{"ResourceType": "volume", "Tags": ts.to_list()}],
+        }
+
+    def _create_volumes_from_snapshots(
+        self,
+        inv: ClusterInventory,
+        snapshots: list[dict[str, Any]],
+        label: str,
+        show_instance: bool = False,
+        profile: RestoreProfile = DEFAULT_PROFILE,
+    ) -> None:
+        """Create one volume per snapshot concurrently and wait for them.
+
+        Every snapshot is checked for its Device and Instance tags before any
+        volume is created. Each volume is created in the availability zone of
+        the instance it will be attached to. Snapshots of instances that are
+        not in the cluster are skipped.
+
+        Raises:
+            Exception: If a snapshot lacks a tag, or if any create_volume call fails
+        """
+        zones = self._availability_zones(inv)
+        requests: dict[str, dict[str, Any]] = {}
+        for snapshot in snapshots:
+            device, instance = self._snapshot_target(inv, snapshot)
+            avail_zone = zones.get(instance)
+            if avail_zone is None:
+                print(
+                    f"Warning: No instance named {instance} for snapshot "
+                    f"{snapshot['SnapshotId']}, skipping."
                 )
-                volume_ids.append(volume.id)
-            # Wait for the volumes to be created
-            if len(volume_ids) > 0:
-                print(f"Waiting for {len(volume_ids)} volumes to be created...")
-                self.wait_for_volumes(volume_ids, "volume_available")
-                self._wait_for_volume_tags(volume_ids)
+                continue
+            requests[snapshot["SnapshotId"]] = self._volume_request(
+                device, instance, label, avail_zone, profile, snapshot.get("VolumeSize")
+            )
+            suffix = f" for {instance}" if show_instance else ""
+            print(f"Creating volume from snapshot {snapshot['SnapshotId']}{suffix}")
+        # Create volumes
+        result = self._executor.run(
+            "create_volume",
+            lambda snapshot_id: self._ec2_client.create_volume(
+                SnapshotId=snapshot_id, **requests[snapshot_id]
+            ),
+            list(requests),
+        )
+        volume_ids = [volume["VolumeId"] for volume in result.results]
+        # Wait for the volumes to be created
+        if len(volume_ids) > 0:
+            print(f"Waiting for {len(volume_ids)} volumes to be created...")
+            self._wait("volume", volume_ids, self._available_and_tagged, VOLUME_WAIT_TIMEOUT)
+            inv.invalidate("volumes")
+        result.raise_for_failures()
 
-    def delete_volumes(self) -> None:
+    def delete_volumes(self, inventory: ClusterInventory | None = None) -> None:
         """
         Delete all volumes associated with this cluster.
 
+        The volumes are deleted in the background by self.deletions.
+
         Args:
-            none
+            - inventory: shared cluster inventory (optional)
         Returns:
             none
         """
@@ -629,23 +1116,19 @@ class ClusterSet:
             # are any stale volumes hanging around with the same label that we are
             # about to restore from that would cause problems because we wouldn't
             # know which volumes to attach.
-            volumes = self.get_volumes()
+            inv = self._inventory(inventory)
+            volumes = inv.volumes
             if len(volumes) == 0:
                 print("No volumes to delete.")
             else:
-                volume_ids = []
-                for volume in volumes:
-                    print(f"Deleting volume {volume.id}")
-                    volume.delete()
-                    volume_ids.append(volume.id)
-                # Wait for the volumes to be deleted
-                print(f"Waiting for {len(volume_ids)} volumes to be deleted...")
-                self.wait_for_volumes(volume_ids, "volume_deleted")
+                self._delete_volume_ids([v["VolumeId"] for v in volumes], inv)
 
     def delete_kubernetes_volumes(self) -> None:
         """
         Delete all kubernetes volumes associated with this cluster.
 
+        The volumes are deleted in the background by self.deletions.
+
         Args:
             none
         Returns:
@@ -662,104 +1145,217 @@ class ClusterSet:
         if len(volumes) == 0:
             print("No kubernetes volumes to delete.")
         else:
-            volume_ids = []
-            for volume in volumes:
-                print(f"Deleting volume {volume.id}")
-                volume.delete()
-                volume_ids.append(volume.id)
+            self._delete_volume_ids([volume.id for volume in volumes])
+
+    def _delete_volume_ids(
+        self, volume_ids: list[str], inv: ClusterInventory | None = None, wait: bool = False
+    ) -> None:
+        """Queue volumes for background deletion. With wait, wait until they are gone.
+
+        Raises:
+            Exception: With wait, if any volume could not be deleted
+        """
+        for volume_id in volume_ids:
+            print(f"Deleting volume {volume_id}")
+        self.deletions.submit("volume", volume_ids)
+        if inv is not None:
+            inv.invalidate("volumes")
+        if wait and volume_ids:
+            self.deletions.drain()
             # Wait for the volumes to be deleted
             print(f"Waiting for {len(volume_ids)} volumes to be deleted...")
             self.wait_for_volumes(volume_ids, "volume_deleted")
 
-    def detach_volumes(self) -> None:
+    def detach_volumes(
+        self, inventory: ClusterInventory | None = None, policy: DevicePolicy = ALL_DEVICES
+    ) -> None:
         """
         Detach all currently attached volumes.
 
         Args:
-            none
+            - inventory: shared cluster inventory (optional)
+            - policy: devices to detach (optional). Defaults to all of them.
         Returns:
             none
         """
         self._logger.debug("method_call: detach_volumes")
-        # Build list of volume_ids so to pass to waiter in one big batch
-        volume_ids = []
-        # For each instance, detach all volumes
-        instances = self.get_instances()
+        inv = self._inventory(inventory)
+        self._detach_instance_volumes(inv, inv.instances, policy)
+
+    def _detach_instance_volumes(
+        self, inv: ClusterInventory, instances: list[Any], policy: DevicePolicy = ALL_DEVICES
+    ) -> None:
+        """Detach the selected volumes attached to the given inventory instances."""
+        # (volume_id, instance_id, device) for every attachment to remove
+        detachments = []
         for i in instances:
-            volumes = i.volumes.all()
-            for volume in volumes:
-                device = volume.attachments[0]["Device"]
-                instance_name = TagSet(i.tags).get("Name") or ""
-                shortname = instance_name.split(".")[0]
-                print(f"Detaching {device} ({volume.id}) from {shortname} ({i.id})")
-                volume.detach_from_instance(Device=device, InstanceId=i.id)
-                volume_ids.append(volume.id)
-        # Wait for volumes to detach
+            instance_name = inv.tags_of(i).get("Name") or ""
+            shortname = instance_name.split(".")[0]
+            for device, volume in self._selected_devices(inv, i, policy).items():
+                print(
+                    f"Detaching {device} ({volume['VolumeId']}) from {shortname} ({i['InstanceId']})"
+                )
+                detachments.append((volume["VolumeId"], i["InstanceId"], device))
+        result = self._executor.run(
+            "detach_volume",
+            lambda d: self._ec2_client.detach_volume(VolumeId=d[0], InstanceId=d[1], Device=d[2]),
+            detachments,
+        )
+        # Wait for volumes to detach in one big batch
+        volume_ids = [d[0] for d in result.succeeded_items]
         if len(volume_ids) > 0:
             print(f"Waiting for {len(volume_ids)} volumes to be detached...")
             self.wait_for_volumes(volume_ids, "volume_available")
+            inv.invalidate("attached_volumes", "volumes")
+        result.raise_for_failures()
+
+    def get_deleting_volumes(self, inventory: ClusterInventory | None = None) -> list[Any]:
+        """
+        Managed volumes of this cluster that EC2 is still deleting.
+
+        Unlike self.deletions, this also shows deletions started by other
+        processes.
+
+        Args:
+            - inventory: shared cluster inventory (optional)
+        Returns:
+            list of volume describe dicts
+        """
+        self._logger.debug("method_call: get_deleting_volumes")
+        inv = self._inventory(inventory)
+        return [v for v in inv.volumes if v.get("State") == "deleting"]
 
     def tag_volumes(self, tags: list[dict[str, str]]) -> None:
-        volumes = self.get_volumes()
-        for volume in volumes:
-            print(f"Tagging volume {volume.id}")
-            volume.create_tags(Tags=tags)
+        self._bulk_tag("create_tags", {"volumes": [v.data for v in self.iter_volumes()]}, tags)
 
     def untag_volumes(self, tags: list[dict[str, str]]) -> None:
-        volumes = self.get_volumes()
-        volume_ids = []
-        for volume in volumes:
-            print(f"Un-tagging volume {volume.id}")
-            volume_ids.append(volume.id)
-        # Might as well un-tag on one big batch since volume objects don't
-        # have direct support for un-tagging.
-        self._ec2_client.delete_tags(Resources=volume_ids, Tags=tags)  # type: ignore[arg-type]
+        self._bulk_tag("delete_tags", {"volumes": [v.data for v in self.iter_volumes()]}, tags)
+
+    def get_restore_profile(
+        self, inventory: ClusterInventory | None = None
+    ) -> RestoreProfile | None:
+        """
+        Read the cluster's restore profile from the RestoreProfile tag of its instances.
+
+        Args:
+            - inventory: shared cluster inventory (optional)
+        Returns:
+            The profile of the first instance that has the tag, or None
+        Raises:
+            ValueError: If the tag value is not a valid profile
+        """
+        inv = self._inventory(inventory)
+        for i in inv.instances:
+            spec = inv.tags_of(i).get(PROFILE_TAG)
+            if spec:
+                return RestoreProfile.parse(spec)
+        return None
+
+    def settle_volumes(self, inventory: ClusterInventory | None = None, wait: bool = False) -> None:
+        """
+        Modify restored volumes back to their baseline once they are initialized.
+
+        Restored volumes whose profile names a baseline carry it in their
+        RestoreBaseline tag. Each volume whose initialization has completed is
+        modified to that baseline and loses the tag, so settling again later
+        picks up the rest.
 
-    def wait_for_volumes(self, volume_ids: list[str], status: str) -> None:
+        Args:
+            - inventory: shared cluster inventory (optional)
+            - wait: wait for volumes that are still initializing, settling
+                    each one as soon as it is done
+        Returns:
+            none
+        """
+        self._logger.debug("method_call: settle_volumes")
+        with log_duration(self._logger, "settle_volumes"):
+            inv = self._inventory(inventory)
+            baselines: dict[str, dict[str, Any]] = {}
+            for volume in inv.volumes:
+                spec = inv.tags_of(volume).get(BASELINE_TAG)
+                if spec:
+                    baselines[volume["VolumeId"]] = parse_baseline(spec)
+            if not baselines:
+                print("No volumes to settle.")
+                return
+            failures: list[tuple[str, BaseException]] = []
+
+            def settle(volume_id: str, _item: dict[str, Any] | None) -> None:
+                baseline = baselines[volume_id]
+                print(f"Modifying volume {volume_id} to {baseline}")
+                try:
+                    self._ec2_client.modify_volume(VolumeId=volume_id, **baseline)
+                    self._ec2_client.delete_tags(
+                        Resources=[volume_id], Tags=[{"Key": BASELINE_TAG}]
+                    )
+                except Exception as e:
+                    failures.append((volume_id, e))
+
+            waiter = self.get_waiter()
+            waiter.add_many("volume_initialization", list(baselines), "completed", callback=settle)
+            if wait:
+                print(f"Waiting for {len(baselines)} volumes to finish initializing...")
+                waiter.wait(VOLUME_INITIALIZATION_TIMEOUT)
+            else:
+                waiter.poll()
+                initializing = [v for v in baselines if v not in waiter.completed]
+                for volume_id in initializing:
+                    print(f"Volume {volume_id} is still initializing, not settled yet.")
+            inv.invalidate("volumes")
+            if failures:
+                for volume_id, error in failures:
+                    print(f"Error: modify_volume failed for {volume_id}: {error}")
+                raise Exception(
+                    f"Error: settle_volumes: {len(failures)} of {len(baselines)} volumes failed."
+                )
+
+    def wait_for_volumes(
+        self, volume_ids: list[str], status: str, callback: Callback | None = None
+    ) -> None:
         """
         Wait for an action to complete on volumes.
 
         Args:
             volume_ids - volume_ids: list of volume IDs
-            status - status to check for completion of action
+            status - 'volume_available', 'volume_in_use' or 'volume_deleted'
+            callback - called with (volume_id, describe item) as each volume
+                       finishes (optional)
         Returns:
             none
         """
-        # This is a helper method - perhaps it should be static
         self._logger.debug("method_call: wait_for_volumes")
-        waiter = self._ec2_client.get_waiter(status)  # type: ignore[call-overload]
-        waiter.wait(
-            VolumeIds=volume_ids,
-            WaiterConfig={
-                "Delay": 5,
-                "MaxAttempts": 240,
-            },
+        if status not in _VOLUME_WAITER_STATES:
+            raise ValueError(f"Unknown volume status '{status}'.")
+        self._wait(
+            "volume", volume_ids, _VOLUME_WAITER_STATES[status], VOLUME_WAIT_TIMEOUT, callback
         )
 
-    def _wait_for_volume_tags(
-        self, volume_ids: list[str], expected_tag_key: str = "Cluster"
-    ) -> None:
-        """Poll until volumes have their tags propagated (up to 10s)."""
-        for _attempt in range(5):
-            response = self._ec2_client.describe_volumes(VolumeIds=volume_ids)
-            all_tagged = all(
-                any(t["Key"] == expected_tag_key for t in vol.get("Tags", []))
-                for vol in response["Volumes"]
-            )
-            if all_tagged:
-                return
-            time.sleep(2)
+    @staticmethod
+    def _available_and_tagged(volume: dict[str, Any] | None) -> bool:
+        """True once a new volume is available and its tags are visible.
 
-    def get_snapshots(self, label: str | None = None) -> list[Any]:
+        Tags set at creation can show up in describe results a moment after
+        the volume itself, and attach_volumes matches volumes by tag.
         """
-        Get a list of cluster snapshots.
+        return (
+            volume is not None
+            and volume["State"] == "available"
+            and "Cluster" in TagSet.from_resource(volume)
+        )
+
+    def iter_snapshots(
+        self, label: str | None = None, max_items: int | None = None
+    ) -> Iterator[SnapshotRecord]:
+        """Stream completed managed snapshots of this cluster.
 
         Args:
-            label - label of snapshots being sought (optional)
-        Returns:
-            list of snapshots
+            label: Label of snapshots being sought (optional)
+            max_items: Cap for this call (optional). Defaults to self.max_items.
+
+        Yields:
+            SnapshotRecord: Describe data of each snapshot, read like a boto3
+            Snapshot without building one
         """
-        self._logger.debug("method_call: get_all_snapshots")
         fs = FilterSet(self.get_cluster_filter())
         # Only get snapshots in a completed state. It is expected that users
         # will only call this method after snapshots have been completed.
@@ -769,105 +1365,474 @@ class ClusterSet:
         # Optionally, get snapshots with a given label
         if label is not None:
             fs.add("tag:Label", label)
-        filters = fs.to_list()
-        snapshots = self._ec2.snapshots.filter(Filters=filters)
-        return list(snapshots.limit(self._MAX_ITEMS))
+        for data in self._iter_describe("describe_snapshots", "Snapshots", fs.to_list(), max_items):
+            yield SnapshotRecord(data, self._build_resource)
 
-    def create_snapshots(self, label: str) -> None:
+    def get_snapshots(self, label: str | None = None) -> list[SnapshotRecord]:
+        """
+        Get a list of cluster snapshots.
+
+        Args:
+            label - label of snapshots being sought (optional)
+        Returns:
+            list of snapshots
+        """
+        self._logger.debug("method_call: get_all_snapshots")
+        return list(self.iter_snapshots(label))
+
+    def create_snapshots(
+        self,
+        label: str,
+        inventory: ClusterInventory | None = None,
+        multi_volume: bool = False,
+        policy: DevicePolicy = ALL_DEVICES,
+    ) -> None:
         """
         Create snapshots of volumes.
 
+        With multi_volume, each instance's volumes are captured by a single
+        CreateSnapshots call, at the same point in time. The snapshots are
+        crash-consistent across the instance's disks, so the instance does
+        not have to be stopped first.
+
+        The snapshots are taken under the label 'pending-<label>' and only get
+        the label once all of them have completed. The snapshots they
+        supersede are deleted after that, so a failed backup leaves the
+        previous one in place.
+
         Args:
             - label: label to apply to each snapshot
+            - inventory: shared cluster inventory (optional)
+            - multi_volume: one crash-consistent CreateSnapshots call per instance
+            - policy: devices to snapshot (optional). Defaults to all of them.
         Returns:
             none
         """
         self._logger.debug("method_call: create_snapshots")
         with log_duration(self._logger, "create_snapshots"):
-            # Check if any snapshots with the same label already exists. If so,
-            # delete them. Only one set of snapshots with a given label may
-            # exist at a time.
-            old_snapshots = self.get_snapshots(label)
-            if len(old_snapshots) > 0:
-                self.delete_snapshots(label)
-            snapshot_ids = []
-            # Get list of instances that need snapshots taken
-            instances = self.get_instances()
-            for i in instances:
-                instance_name = TagSet(i.tags).get("Name") or ""
-                # Get collection of volumes for the current instance
-                volumes = i.volumes.all()
-                for volume in volumes:
-                    device = volume.attachments[0]["Device"]
-                    # Make description
-                    timestamp = datetime.datetime.now(tz=datetime.UTC)
-                    date = timestamp.strftime("%Y-%m-%d")
-                    timestr = timestamp.strftime("%H:%M:%S")
-                    description = f"Managed snapshot taken on {date} at {timestr}"
-                    # Make tags
-                    ts = TagSet()
-                    ts.add("Cluster", self._cluster_name_str)
-                    ts.add("Device", device)
-                    ts.add("Instance", instance_name)
-                    ts.add("Label", label)
-                    ts.add("Name", f"{instance_name} - {device}")
-                    ts.add("automation_key", self.AUTOMATION_KEY)
-                    tags = ts.to_list()
-                    # Create shapshot
-                    shortname = instance_name.split(".")[0]
-                    print(f"Creating snapshot of {device} ({volume.id}) on {shortname} ({i.id})")
-                    snapshot = volume.create_snapshot(
-                        Description=description,
-                        TagSpecifications=[{"ResourceType": "snapshot", "Tags": tags}],
-                    )
-                    snapshot_ids.append(snapshot.id)
+            inv = self._inventory(inventory)
+            # Only one set of snapshots with a given label may exist at a
+            # time. The current one is replaced once the new one is complete.
+            superseded = self._superseded_snapshots(inv, label)
+            pending = pending_label(label)
+            if multi_volume:
+                result, snapshot_ids = self._create_multi_volume_snapshots(inv, pending, policy)
+            else:
+                # volume_id -> create_snapshot arguments
+                requests: dict[str, dict[str, Any]] = {}
+                # Get list of instances that need snapshots taken
+                for i in inv.instances:
+                    requests.update(self._snapshot_requests(inv, i, pending, policy))
+                # Create shapshots
+                result = self._executor.run(
+                    "create_snapshot",
+                    lambda volume_id: self._ec2_client.create_snapshot(
+                        VolumeId=volume_id, **requests[volume_id]
+                    ),
+                    list(requests),
+                )
+                snapshot_ids = [snapshot["SnapshotId"] for snapshot in result.results]
             # Wait for snapshots to complete
-            print(f"Waiting for {len(snapshot_ids)} snapshots to complete...")
-            waiter = self._ec2_client.get_waiter("snapshot_completed")
-            waiter.wait(
-                SnapshotIds=snapshot_ids,
-                WaiterConfig={
-                    "Delay": 5,
-                    "MaxAttempts": 720,
-                },
+            if snapshot_ids:
+                print(f"Waiting for {len(snapshot_ids)} snapshots to complete...")
+                self._wait("snapshot", snapshot_ids, "completed", SNAPSHOT_WAIT_TIMEOUT)
+            inv.invalidate("snapshots")
+            result.raise_for_failures()
+            self._promote_snapshots(inv, label, snapshot_ids, superseded)
+
+    def _superseded_snapshots(self, inv: ClusterInventory, label: str) -> list[str]:
+        """IDs of the snapshots a new backup of ``label`` replaces, including
+        the leftovers of backups that failed before completing."""
+        # The inventory only holds completed snapshots, while an interrupted
+        # backup leaves its pending-label snapshots in any state
+        fs = FilterSet(self.get_cluster_filter())
+        fs.add("tag:automation_key", self.AUTOMATION_KEY)
+        fs.add("tag:Label", pending_label(label))
+        leftovers = self._iter_describe("describe_snapshots", "Snapshots", fs.to_list())
+        return [s["SnapshotId"] for s in inv.snapshots(label)] + [
+            s["SnapshotId"] for s in leftovers
+        ]
+
+    def _promote_snapshots(
+        self,
+        inv: ClusterInventory,
+        label: str,
+        snapshot_ids: list[str],
+        superseded: list[str],
+    ) -> None:
+        """Move completed snapshots from the pending label to ``label``, then
+        delete the snapshots they supersede without waiting.
+
+        Raises:
+            Exception: If the snapshots could not be relabelled. The ones that
+                      were are put back, so the previous backup stays intact.
+        """
+        if not snapshot_ids:
+            print(f"No snapshots were taken, keeping the previous '{label}' snapshots.")
+            return
+        calls = {
+            f"{chunk[0]}..{chunk[-1]}": chunk
+            for chunk in (
+                snapshot_ids[n : n + TAG_BATCH_SIZE]
+                for n in range(0, len(snapshot_ids), TAG_BATCH_SIZE)
             )
+        }
 
-    def delete_snapshots(self, label: str) -> None:
+        def relabel(name: str, value: str) -> Any:
+            return self._ec2_client.create_tags(
+                Resources=calls[name], Tags=[{"Key": "Label", "Value": value}]
+            )
+
+        result = self._executor.run("create_tags", lambda name: relabel(name, label), list(calls))
+        inv.invalidate("snapshots")
+        if not result.ok:
+            for name in result.succeeded_items:
+                try:
+                    relabel(name, pending_label(label))
+                except Exception as e:
+                    print(f"Error: Failed to put back the label of snapshots {name}: {e}")
+            for name, error in result.failed:
+                print(f"Error: Failed to label snapshots {name}: {error}")
+            raise Exception(
+                f"Error: backup: new snapshots could not be labelled '{label}', "
+                "the previous snapshots are kept."
+            )
+        print(f"Labelled {len(snapshot_ids)} snapshots '{label}'.")
+        if superseded:
+            print(f"Deleting {len(superseded)} superseded snapshots in the background.")
+            self.deletions.submit("snapshot", superseded)
+
+    @staticmethod
+    def _selected_devices(
+        inv: ClusterInventory, instance: dict[str, Any], policy: DevicePolicy
+    ) -> dict[str, dict[str, Any]]:
+        """Return device -> volume for the attached devices the policy selects."""
+        return {
+            device: volume
+            for device, volume in inv.attached_devices(instance["InstanceId"]).items()
+            if policy.selects(device, volume.get("Size"), instance.get("RootDeviceName"))
+        }
+
+    @staticmethod
+    def _attached_volume_ids(inv: ClusterInventory) -> set[str]:
+        """IDs of the managed volumes attached to an instance of the cluster."""
+        attached = {
+            volume["VolumeId"]
+            for instance in inv.instances
+            for volume in inv.attached_devices(instance["InstanceId"]).values()
+        }
+        attached.update(v["VolumeId"] for v in inv.volumes if v.get("Attachments"))
+        return attached
+
+    @staticmethod
+    def _selects_tagged(
+        inv: ClusterInventory, policy: DevicePolicy, resource: dict[str, Any], size: int | None
+    ) -> bool:
+        """Apply a policy to a snapshot or managed volume through its Device and
+        Instance tags. With every device selected, resources without a Device
+        tag are kept, so that the usual checks report them. Under any other
+        policy they are not selected: which device they belong to is unknown,
+        so they may be one the policy leaves alone (e.g. a root volume)."""
+        if policy.selects_all:
+            return True
+        ts = inv.tags_of(resource)
+        device = ts.get("Device")
+        if not device:
+            return False
+        instance = inv.instance_by_name(ts.get("Instance") or "")
+        root_device = instance.get("RootDeviceName") if instance is not None else None
+        return policy.selects(device, size, root_device)
+
+    @staticmethod
+    def _snapshot_description() -> str:
+        timestamp = datetime.datetime.now(tz=datetime.UTC)
+        date = timestamp.strftime("%Y-%m-%d")
+        timestr = timestamp.strftime("%H:%M:%S")
+        return f"Managed snapshot taken on {date} at {timestr}"
+
+    def _snapshot_tags(self, instance_name: str, label: str, device: str | None) -> TagSet:
+        """Tags of a managed snapshot.
+
+        Without a device, only the tags shared by every snapshot of the
+        instance, named after the instance alone.
+        """
+        ts = TagSet()
+        ts.add("Cluster", self._cluster_name_str)
+        if device is not None:
+            ts.add("Device", device)
+        ts.add("Instance", instance_name)
+        ts.add("Label", label)
+        ts.add("Name", instance_name if device is None else f"{instance_name} - {device}")
+        ts.add("automation_key", self.AUTOMATION_KEY)
+        return ts
+
+    def _snapshot_requests(
+        self,
+        inv: ClusterInventory,
+        instance: dict[str, Any],
+        label: str,
+        policy: DevicePolicy = ALL_DEVICES,
+    ) -> dict[str, dict[str, Any]]:
+        """Build the create_snapshot arguments for each volume attached to an instance.
+
+        Args:
+            - inv: cluster inventory
+            - instance: instance describe dict
+            - label: label to apply to each snapshot
+            - policy: devices to snapshot (optional)
+        Returns:
+            volume_id -> create_snapshot arguments
+        """
+        requests: dict[str, dict[str, Any]] = {}
+        instance_name = inv.tags_of(instance).get("Name") or ""
+        # Get the volumes attached to the current instance
+        for device, volume in self._selected_devices(inv, instance, policy).items():
+            description = self._snapshot_description()
+            tags = self._snapshot_tags(instance_name, label, device).to_list()
+            shortname = instance_name.split(".")[0]
+            print(
+                f"Creating snapshot of {device} ({volume['VolumeId']}) on {shortname} ({instance['InstanceId']})"
+            )
+            requests[volume["VolumeId"]] = {
+                "Description": description,
+                "TagSpecifications": [{"ResourceType": "snapshot", "Tags": tags}],
+            }
+        return requests
+
+    def _create_multi_volume_snapshots(
+        self, inv: ClusterInventory, label: str, policy: DevicePolicy = ALL_DEVICES
+    ) -> tuple[BatchResult, list[str]]:
+        """Snapshot every instance with one CreateSnapshots call each.
+
+        CreateSnapshots applies the same tags to every snapshot of the call,
+        so the snapshots are named after their instance and the per-volume
+        Device tag is added afterwards, with one create_tags call per device
+        name for all the snapshots of that device.
+
+        Args:
+            - inv: cluster inventory
+            - label: label to apply to each snapshot
+            - policy: devices to snapshot (optional). Devices it skips are
+                      excluded from the call.
+        Returns:
+            The result of the CreateSnapshots and create_tags calls, and the
+            IDs of the snapshots that were created
+        """
+        # instance_id -> create_snapshots arguments, and volume_id -> device
+        requests: dict[str, dict[str, Any]] = {}
+        devices: dict[str, str] = {}
+        for i in inv.instances:
+            instance_id = i["InstanceId"]
+            attached = self._selected_devices(inv, i, policy)
+            if not attached:
+                continue
+            root_device = i.get("RootDeviceName")
+            skipped = {
+                device: volume
+                for device, volume in inv.attached_devices(instance_id).items()
+                if device not in attached
+            }
+            instance_name = inv.tags_of(i).get("Name") or ""
+            for device, volume in attached.items():
+                devices[volume["VolumeId"]] = device
+            tags = self._snapshot_tags(instance_name, label, None).to_list()
+            shortname = instance_name.split(".")[0]
+            print(f"Creating snapshots of {', '.join(attached)} on {shortname} ({instance_id})")
+            requests[instance_id] = {
+                "InstanceSpecification": {
+                    "InstanceId": instance_id,
+                    "ExcludeBootVolume": root_device in skipped,
+                },
+                "Description": self._snapshot_description(),
+                "TagSpecifications": [{"ResourceType": "snapshot", "Tags": tags}],
+            }
+            data_volume_ids = [v["VolumeId"] for d, v in skipped.items() if d != root_device]
+            if data_volume_ids:
+                requests[instance_id]["InstanceSpecification"]["ExcludeDataVolumes"] = (
+                    data_volume_ids
+                )
+        result = self._executor.run(
+            "create_snapshots",
+            lambda instance_id: self._ec2_client.create_snapshots(**requests[instance_id]),
+            list(requests),
+        )
+        snapshots = [snapshot for response in result.results for snapshot in response["Snapshots"]]
+        snapshot_ids = [snapshot["SnapshotId"] for snapshot in snapshots]
+        # A volume attached after the inventory was taken is snapshotted too
+        unknown = sorted({snapshot["VolumeId"] for snapshot in snapshots} - set(devices))
+        if unknown:
+            devices.update(self._attachment_devices(unknown))
+        # device -> snapshot IDs that need that Device tag
+        by_device: dict[str, list[str]] = {}
+        for snapshot in snapshots:
+            snapshot_device = devices.get(snapshot["VolumeId"])
+            if snapshot_device is None:
+                self._logger.warning(
+                    f"{snapshot['SnapshotId']}: device of {snapshot['VolumeId']} unknown, "
+                    "leaving the snapshot without a Device tag."
+                )
+                continue
+            by_device.setdefault(snapshot_device, []).append(snapshot["SnapshotId"])
+        calls: dict[str, tuple[list[str], str]] = {}
+        for device, ids in by_device.items():
+            for n in range(0, len(ids), TAG_BATCH_SIZE):
+                chunk = ids[n : n + TAG_BATCH_SIZE]
+                calls[f"{device}: {chunk[0]}..{chunk[-1]}"] = (chunk, device)
+        tagged = self._executor.run(
+            "create_tags",
+            lambda name: self._ec2_client.create_tags(
+                Resources=calls[name][0], Tags=[{"Key": "Device", "Value": calls[name][1]}]
+            ),
+            list(calls),
+        )
+        # Without its Device tag a snapshot cannot be restored
+        result.failed.extend(tagged.failed)
+        return result, snapshot_ids
+
+    def _attachment_devices(self, volume_ids: list[str]) -> dict[str, str]:
+        """Device names of volumes that are not in the inventory.
+
+        Called once the snapshots exist, so a failed lookup is logged rather
+        than raised.
+
+        Returns:
+            dict: volume ID -> device name, for the volumes still attached
+        """
+        try:
+            volumes = self._ec2_client.describe_volumes(VolumeIds=volume_ids)["Volumes"]
+        except Exception as e:
+            self._logger.warning(f"Could not look up the devices of {', '.join(volume_ids)}: {e}")
+            return {}
+        return {
+            volume["VolumeId"]: volume["Attachments"][0]["Device"]
+            for volume in volumes
+            if volume.get("Attachments")
+        }
+
+    def backup_pipelined(
+        self,
+        label: str,
+        inventory: ClusterInventory | None = None,
+        restart: bool = False,
+        policy: DevicePolicy = ALL_DEVICES,
+    ) -> None:
+        """
+        Stop the cluster and snapshot each instance as soon as it has stopped.
+
+        A snapshot is point-in-time when it is initiated, so an instance's
+        volumes are snapshotted the moment that instance reports stopped,
+        without waiting for the rest of the cluster. With restart, each
+        instance this call stopped is started again right after its snapshots
+        were initiated; instances that were already stopped stay stopped.
+        The method returns once every snapshot has completed.
+
+        Args:
+            - label: label to apply to each snapshot
+            - inventory: shared cluster inventory (optional)
+            - restart: start each instance this call stopped again once its
+                      snapshots are initiated
+            - policy: devices to snapshot (optional). Defaults to all of them.
+        Returns:
+            none
+        """
+        self._logger.debug("method_call: backup_pipelined")
+        with log_duration(self._logger, "backup_pipelined"):
+            inv = self._inventory(inventory)
+            # Only one set of snapshots with a given label may exist at a
+            # time. As in create_snapshots, the new set is taken under the
+            # pending label and replaces the current one once complete.
+            superseded = self._superseded_snapshots(inv, label)
+            # Plan every instance's snapshots up front, in this thread
+            requests = {
+                i["InstanceId"]: self._snapshot_requests(inv, i, pending_label(label), policy)
+                for i in inv.instances
+            }
+            snapshot_ids: list[str] = []
+            failures: list[tuple[str, BaseException]] = []
+            restarted: list[str] = []
+            stopped = [i["InstanceId"] for i in inv.instances_in_state("stopped")]
+            running = [i["InstanceId"] for i in inv.instances if i["State"]["Name"] != "stopped"]
+
+            def snapshot_instance(instance_id: str, _item: dict[str, Any] | None = None) -> None:
+                instance_requests = requests[instance_id]
+                result = self._executor.run(
+                    "create_snapshot",
+                    lambda volume_id: self._ec2_client.create_snapshot(
+                        VolumeId=volume_id, **instance_requests[volume_id]
+                    ),
+                    list(instance_requests),
+                )
+                snapshot_ids.extend(snapshot["SnapshotId"] for snapshot in result.results)
+                failures.extend(result.failed)
+                # Only restart an instance this call stopped, once its volumes
+                # were all captured. Instances that were already stopped stay so.
+                if restart and result.ok and instance_id in running:
+                    try:
+                        self._ec2_client.start_instances(InstanceIds=[instance_id])
+                        restarted.append(instance_id)
+                    except Exception as e:
+                        failures.append((instance_id, e))
+
+            for instance_id in stopped:
+                snapshot_instance(instance_id)
+            waiter = self.get_waiter()
+            if running:
+                for instance_id in running:
+                    print(f"Stopping instance {instance_id}")
+                changed, retried = self._send_instance_state_calls(
+                    self._ec2_client.stop_instances, "stop_instances", running
+                )
+                failures.extend(retried.failed)
+                waiter.add_many("instance", changed, "stopped", callback=snapshot_instance)
+                print(f"Waiting for {len(changed)} instances to stop...")
+                try:
+                    waiter.wait(INSTANCE_WAIT_TIMEOUT)
+                except Exception as e:
+                    failures.append(("wait", e))
+            inv.mark_state(list(waiter.completed), "stopped")
+            if restarted:
+                # Not waited on: the snapshots below do not depend on it
+                print(f"Restarted {len(restarted)} instances.")
+                inv.invalidate("instances")
+            # Wait for snapshots to complete
+            if snapshot_ids:
+                print(f"Waiting for {len(snapshot_ids)} snapshots to complete...")
+                self._wait("snapshot", snapshot_ids, "completed", SNAPSHOT_WAIT_TIMEOUT)
+            inv.invalidate("snapshots")
+            if failures:
+                for item, error in failures:
+                    print(f"Error: backup failed for {item}: {error}")
+                raise Exception(f"Error: backup_pipelined: {len(failures)} operations failed.")
+            self._promote_snapshots(inv, label, snapshot_ids, superseded)
+
+    def delete_snapshots(self, label: str, inventory: ClusterInventory | None = None) -> None:
         """
         Delete cluster snapshots that have the given label.
 
+        The snapshots are deleted in the background by self.deletions.
+
         Args:
             label - label of snapshots to be deleted
+            inventory - shared cluster inventory (optional)
         Returns:
             none
         """
         self._logger.debug("method_call: delete_snapshots")
         with log_duration(self._logger, "delete_snapshots"):
-            snapshots = self.get_snapshots(label)
+            inv = self._inventory(inventory)
+            snapshots = inv.snapshots(label)
             # Delete each snapshot
-            print(f"Deleting {len(snapshots)} snapshots...")
+            print(f"Deleting {len(snapshots)} snapshots in the background...")
             for snapshot in snapshots:
-                print(f"Deleting snapshot {snapshot.id}")
-                snapshot.delete()
-            # There is no waiter for snapshot deletion. Add a small delay to guard
-            # against any possible timing issues.
-            time.sleep(2)
+                print(f"Deleting snapshot {snapshot['SnapshotId']}")
+            self.deletions.submit("snapshot", [snapshot["SnapshotId"] for snapshot in snapshots])
+            inv.invalidate("snapshots")
 
     def tag_snapshots(self, tags: list[dict[str, str]]) -> None:
-        snapshots = self.get_snapshots()
-        for snapshot in snapshots:
-            print(f"Tagging snapshot {snapshot.id}")
-            snapshot.create_tags(Tags=tags)
+        self._bulk_tag("create_tags", {"snapshots": [s.data for s in self.iter_snapshots()]}, tags)
 
     def untag_snapshots(self, tags: list[dict[str, str]]) -> None:
-        snapshots = self.get_snapshots()
-        snapshot_ids = []
-        for snapshot in snapshots:
-            print(f"Un-tagging snapshot {snapshot.id}")
-            snapshot_ids.append(snapshot.id)
-        # Might as well un-tag on one big batch since snapshot objects don't
-        # have direct support for un-tagging.
-        self._ec2_client.delete_tags(Resources=snapshot_ids, Tags=tags)  # type: ignore[arg-type]
+        self._bulk_tag("delete_tags", {"snapshots": [s.data for s in self.iter_snapshots()]}, tags)
 
     def get_subnet(self) -> Any:
         """
@@ -880,30 +1845,140 @@ class ClusterSet:
         """
         self._logger.debug("method_call: get_subnet")
         fs = FilterSet(self.get_cluster_filter())
-        filters = fs.to_list()
-        subnets = self._ec2.subnets.filter(Filters=filters)
-        subnet_list = list(subnets.limit(self._MAX_ITEMS))
+        subnet_list = [
+            self._hydrate(self._ec2.Subnet, data["SubnetId"], data)
+            for data in self._iter_describe("describe_subnets", "Subnets", fs.to_list())
+        ]
         # There should only be one subnet per cluster
         if len(subnet_list) > 1:
             raise Exception("Error (get_subnet): more than one subnet returned.")
         return subnet_list[0]
 
     def tag_subnet(self, tags: list[dict[str, str]]) -> None:
-        subnet = self.get_subnet()
-        print(f"Tagging subnet {subnet.id}")
-        subnet.create_tags(Tags=tags)
+        self._bulk_tag("create_tags", {"subnets": [self.get_subnet().meta.data]}, tags)
 
     def untag_subnet(self, tags: list[dict[str, str]]) -> None:
-        subnet = self.get_subnet()
-        print(f"Un-tagging subnet {subnet.id}")
-        self._ec2_client.delete_tags(Resources=[subnet.id], Tags=tags)  # type: ignore[arg-type]
+        self._bulk_tag("delete_tags", {"subnets": [self.get_subnet().meta.data]}, tags)
+
+    def get_taggable_resources(
+        self, include_subnet: bool = False
+    ) -> dict[str, list[dict[str, Any]]]:
+        """
+        Collect every cluster resource that the tag manager tags.
+
+        Args:
+            - include_subnet: also collect the cluster's subnets (optional)
+        Returns:
+            dictionary of resource kind ('instances', 'volumes', 'snapshots',
+            'subnets') to list of describe dicts, including current tags
+        """
+        resources = {
+            "instances": [i.data for i in self.iter_instances()],
+            "volumes": [v.data for v in self.iter_volumes()],
+            "snapshots": [s.data for s in self.iter_snapshots()],
+        }
+        if include_subnet:
+            subnets = self._iter_describe("describe_subnets", "Subnets", self.get_cluster_filter())
+            resources["subnets"] = list(subnets)
+        return resources
+
+    def tag_resources(self, tags: list[dict[str, str]], include_subnet: bool = False) -> None:
+        """
+        Add tags to the instances, volumes and snapshots of this cluster in bulk.
+
+        Resources that already carry every tag with the desired value are
+        skipped.
+
+        Args:
+            - tags: list of {'Key': ..., 'Value': ...} tags to add
+            - include_subnet: also tag the cluster's subnet (optional)
+        Returns:
+            none
+        """
+        self._logger.debug("method_call: tag_resources")
+        self._bulk_tag("create_tags", self.get_taggable_resources(include_subnet), tags)
+
+    def untag_resources(self, tags: list[dict[str, str]], include_subnet: bool = False) -> None:
+        """
+        Remove tags from the instances, volumes and snapshots of this cluster in bulk.
+
+        Only keys a resource actually carries are deleted from it.
+
+        Args:
+            - tags: list of {'Key': ...} tags to remove
+            - include_subnet: also un-tag the cluster's subnet (optional)
+        Returns:
+            none
+        """
+        self._logger.debug("method_call: untag_resources")
+        self._bulk_tag("delete_tags", self.get_taggable_resources(include_subnet), tags)
+
+    @staticmethod
+    def _pending_tags(
+        operation: str, current: TagSet, tags: list[dict[str, str]]
+    ) -> tuple[tuple[str, str | None], ...]:
+        """Return the (key, value) pairs of ``tags`` that would change a resource.
+
+        For create_tags these are ``TagSet.diff``: the tags missing or with
+        another value. For delete_tags these are ``TagSet.removable``: the keys
+        the resource carries (and, if a value is given, carries with that
+        value). The value is None for key-only deletes.
+        """
+        if operation == "create_tags":
+            return tuple(current.diff(TagSet(tags)).to_dict().items())
+        return tuple((t["Key"], t.get("Value")) for t in current.removable(tags))
+
+    def _bulk_tag(
+        self,
+        operation: str,
+        resources: dict[str, list[dict[str, Any]]],
+        tags: list[dict[str, str]],
+    ) -> None:
+        """Apply create_tags or delete_tags where it changes something.
+
+        Resources are compared with their describe-time tags and grouped by
+        the exact change they need. Each group is sent in calls of up to
+        TAG_BATCH_SIZE resources of any kind, and the calls run concurrently.
+        """
+        verb = "Tagging" if operation == "create_tags" else "Un-tagging"
+        groups: dict[tuple[tuple[str, str | None], ...], list[str]] = {}
+        changed = unchanged = 0
+        for kind, items in resources.items():
+            kind_changed = 0
+            for resource_id, current in TagSet.bulk(items, _ID_KEYS[kind]).items():
+                pending = self._pending_tags(operation, current, tags)
+                if pending:
+                    groups.setdefault(pending, []).append(resource_id)
+                    kind_changed += 1
+            print(f"{verb} {kind_changed} of {len(items)} {kind}")
+            changed += kind_changed
+            unchanged += len(items) - kind_changed
+        print(f"{verb}: {changed} resources changed, {unchanged} already up to date.")
+        # (name, resource IDs, tags) per call. Calls are named after their
+        # first and last ID for error reports.
+        calls: dict[str, tuple[list[str], list[dict[str, str]]]] = {}
+        for pending, ids in groups.items():
+            call_tags = [
+                {"Key": key} if value is None else {"Key": key, "Value": value}
+                for key, value in pending
+            ]
+            for n in range(0, len(ids), TAG_BATCH_SIZE):
+                chunk = ids[n : n + TAG_BATCH_SIZE]
+                calls[f"{chunk[0]}..{chunk[-1]}"] = (chunk, call_tags)
+        api = getattr(self._ec2_client, operation)
+        result = self._executor.run(
+            operation,
+            lambda name: api(Resources=calls[name][0], Tags=calls[name][1]),
+            list(calls),
+        )
+        result.raise_for_failures()
 
     def _filter_instances_by_name_regex(self, instances: list[Any], name_pattern: str) -> list[Any]:
         """
         Filter instances by matching their Name tag against a regex pattern.
 
         Args:
-            instances: list of EC2 instance objects
+            instances: list of EC2 instance objects or inventory instance dicts
             name_pattern: regex pattern to match against Name tags
         Returns:
             list of filtered instances
@@ -918,151 +1993,123 @@ class ClusterSet:
 
         filtered_instances = []
         for instance in instances:
-            name_tag = None
-            if instance.tags:
-                for tag in instance.tags:
-                    if tag["Key"] == "Name":
-                        name_tag = tag["Value"]
-                        break
+            tags = instance.get("Tags") if isinstance(instance, dict) else instance.tags
+            name_tag = TagSet(tags or []).get("Name")
 
             if name_tag and pattern.search(name_tag):
                 filtered_instances.append(instance)
 
         return filtered_instances
 
-    def stop_instances_targeted(self, name_pattern: str) -> None:
+    def stop_instances_targeted(
+        self, name_pattern: str, inventory: ClusterInventory | None = None
+    ) -> None:
         """
         Stop instances that match the given Name tag regex pattern.
 
         Args:
             name_pattern: regex pattern to match instance Name tags
+            inventory: shared cluster inventory (optional)
         Returns:
             none
         """
         self._logger.debug("method_call: stop_instances_targeted")
-        all_instances = self.get_running_instances()
+        inv = self._inventory(inventory)
+        all_instances = inv.instances_in_state("pending", "running", "stopping")
         instances = self._filter_instances_by_name_regex(all_instances, name_pattern)
 
         if len(instances) == 0:
             print(f"No running instances found matching pattern '{name_pattern}'.")
         else:
-            # Stop instances
-            for i in instances:
-                name = TagSet(i.tags).get("Name")
-                print(f"Stopping {name} ({i.id})")
-                i.stop()
-            # Wait for all instances in one batch call with 5s polling
-            print(f"Waiting for {len(instances)} instances to stop...")
-            self._wait_instances_stopped([i.id for i in instances])
+            self._change_instance_states(inv, instances, "stop")
 
-    def start_instances_targeted(self, name_pattern: str) -> None:
+    def start_instances_targeted(
+        self, name_pattern: str, inventory: ClusterInventory | None = None
+    ) -> None:
         """
         Start instances that match the given Name tag regex pattern.
 
         Args:
             name_pattern: regex pattern to match instance Name tags
+            inventory: shared cluster inventory (optional)
         Returns:
             none
         """
         self._logger.debug("method_call: start_instances_targeted")
-        all_instances = self.get_stopped_instances()
+        inv = self._inventory(inventory)
+        all_instances = inv.instances_in_state("stopped")
         instances = self._filter_instances_by_name_regex(all_instances, name_pattern)
 
         if len(instances) == 0:
             print(f"No stopped instances found matching pattern '{name_pattern}'.")
         else:
-            # Start instances
-            for i in instances:
-                name = TagSet(i.tags).get("Name")
-                print(f"Starting {name} ({i.id})")
-                i.start()
-            # Wait for all instances in one batch call with 5s polling
-            print(f"Waiting for {len(instances)} instances to start...")
-            self._wait_instances_running([i.id for i in instances])
+            self._change_instance_states(inv, instances, "start")
 
-    def detach_volumes_targeted(self, name_pattern: str) -> None:
+    def detach_volumes_targeted(
+        self, name_pattern: str, inventory: ClusterInventory | None = None
+    ) -> None:
         """
         Detach volumes from instances that match the given Name tag regex pattern.
 
         Args:
             name_pattern: regex pattern to match instance Name tags
+            inventory: shared cluster inventory (optional)
         Returns:
             none
         """
         self._logger.debug("method_call: detach_volumes_targeted")
-        all_instances = self.get_instances()
-        instances = self._filter_instances_by_name_regex(all_instances, name_pattern)
+        inv = self._inventory(inventory)
+        instances = self._filter_instances_by_name_regex(inv.instances, name_pattern)
 
         if len(instances) == 0:
             print(f"No instances found matching pattern '{name_pattern}'.")
             return
 
-        # Build list of volume_ids so to pass to waiter in one big batch
-        volume_ids = []
-        # For each matching instance, detach all volumes
-        for i in instances:
-            volumes = i.volumes.all()
-            for volume in volumes:
-                device = volume.attachments[0]["Device"]
-                instance_name = TagSet(i.tags).get("Name") or ""
-                shortname = instance_name.split(".")[0]
-                print(f"Detaching {device} ({volume.id}) from {shortname} ({i.id})")
-                volume.detach_from_instance(Device=device, InstanceId=i.id)
-                volume_ids.append(volume.id)
-        # Wait for volumes to detach
-        if len(volume_ids) > 0:
-            print(f"Waiting for {len(volume_ids)} volumes to be detached...")
-            self.wait_for_volumes(volume_ids, "volume_available")
+        self._detach_instance_volumes(inv, instances)
 
-    def delete_volumes_targeted(self, name_pattern: str) -> None:
+    def delete_volumes_targeted(
+        self, name_pattern: str, inventory: ClusterInventory | None = None
+    ) -> None:
         """
         Delete volumes associated with instances that match the given Name tag regex pattern.
 
+        The volumes are deleted in the background by self.deletions.
+
         Args:
             name_pattern: regex pattern to match instance Name tags
+            inventory: shared cluster inventory (optional)
         Returns:
             none
         """
         self._logger.debug("method_call: delete_volumes_targeted")
+        try:
+            pattern = re.compile(name_pattern)
+        except re.error as e:
+            raise ValueError(f"Invalid regex pattern '{name_pattern}': {e}") from e
+
         # Get all volumes and filter by instance name pattern
-        all_volumes = self.get_volumes()
+        inv = self._inventory(inventory)
         targeted_volumes = []
-
-        for volume in all_volumes:
-            volume_instance_tag = None
-            if volume.tags:
-                for tag in volume.tags:
-                    if tag["Key"] == "Instance":
-                        volume_instance_tag = tag["Value"]
-                        break
-
-            if volume_instance_tag:
-                try:
-                    pattern = re.compile(name_pattern)
-                    if pattern.search(volume_instance_tag):
-                        targeted_volumes.append(volume)
-                except re.error as e:
-                    raise ValueError(f"Invalid regex pattern '{name_pattern}': {e}") from e
+        for volume in inv.volumes:
+            volume_instance_tag = inv.tags_of(volume).get("Instance")
+            if volume_instance_tag and pattern.search(volume_instance_tag):
+                targeted_volumes.append(volume)
 
         if len(targeted_volumes) == 0:
             print(f"No volumes found for instances matching pattern '{name_pattern}'.")
         else:
-            volume_ids = []
-            for volume in targeted_volumes:
-                print(f"Deleting volume {volume.id}")
-                volume.delete()
-                volume_ids.append(volume.id)
-            # Wait for the volumes to be deleted
-            print(f"Waiting for {len(volume_ids)} volumes to be deleted...")
-            self.wait_for_volumes(volume_ids, "volume_deleted")
+            self._delete_volume_ids([v["VolumeId"] for v in targeted_volumes], inv)
 
-    def create_volumes_targeted(self, label: str, name_pattern: str) -> None:
+    def create_volumes_targeted(
+        self, label: str, name_pattern: str, inventory: ClusterInventory | None = None
+    ) -> None:
         """
         Create new volumes from snapshots for instances matching the given Name tag regex pattern.
 
         Args:
             label: label of snapshots to restore
             name_pattern: regex pattern to match instance Name tags
+            inventory: shared cluster inventory (optional)
         Returns:
             none
         """
@@ -1074,7 +2121,8 @@ class ClusterSet:
             except re.error as e:
                 raise ValueError(f"Invalid regex pattern '{name_pattern}': {e}") from e
 
-            snapshots = self.get_snapshots(label)
+            inv = self._inventory(inventory)
+            snapshots = inv.snapshots(label)
 
             # Check if snapshot list is empty
             if len(snapshots) == 0:
@@ -1085,7 +2133,7 @@ class ClusterSet:
             targeted_snapshots = []
 
             for snapshot in snapshots:
-                ts = TagSet(snapshot.tags)
+                ts = inv.tags_of(snapshot)
                 instance = ts.get("Instance")
                 if instance and pattern.search(instance):
                     targeted_snapshots.append(snapshot)
@@ -1094,87 +2142,532 @@ class ClusterSet:
                 print(f"No snapshots found for instances matching pattern '{name_pattern}'.")
                 return
 
-            # Create volumes
-            volume_ids = []
-            for snapshot in targeted_snapshots:
-                ts = TagSet(snapshot.tags)
-                device = ts.get("Device")
-                instance = ts.get("Instance")
-                if not device:
-                    raise Exception(
-                        f"Error: create_volume: Can't find device tag for snapshot {snapshot.id}."
-                    )
-                if not instance:
-                    raise Exception(
-                        f"Error: create_volume: Can't find instance tag for snapshot {snapshot.id}."
-                    )
-
-                # Determine availability zone from one of the cluster instances
-                avail_zone = self.get_instances()[0].placement["AvailabilityZone"]
-                # Make tags
-                ts = TagSet()
-                ts.add("Cluster", self._cluster_name_str)
-                ts.add("Device", device)
-                ts.add("Instance", instance)
-                ts.add("Label", label)
-                ts.add("Name", f"{instance} - {device}")
-                ts.add("automation_key", self.AUTOMATION_KEY)
-                tags = ts.to_list()
-                # Create volume
-                print(f"Creating volume from snapshot {snapshot.id} for {instance}")
-                volume = self._ec2.create_volume(
-                    SnapshotId=snapshot.id,
-                    AvailabilityZone=avail_zone,
-                    VolumeInitializationRate=300,
-                    TagSpecifications=[{"ResourceType": "volume", "Tags": tags}],
-                )
-                volume_ids.append(volume.id)
+            self._create_volumes_from_snapshots(inv, targeted_snapshots, label, show_instance=True)
 
-            # Wait for the volumes to be created
-            if len(volume_ids) > 0:
-                print(f"Waiting for {len(volume_ids)} volumes to be created...")
-                self.wait_for_volumes(volume_ids, "volume_available")
-                self._wait_for_volume_tags(volume_ids)
-
-    def attach_volumes_targeted(self, label: str, name_pattern: str) -> None:
+    def attach_volumes_targeted(
+        self, label: str, name_pattern: str, inventory: ClusterInventory | None = None
+    ) -> None:
         """
         Attach volumes to instances that match the given Name tag regex pattern.
 
         Args:
             label: label of volumes to attach
             name_pattern: regex pattern to match instance Name tags
+            inventory: shared cluster inventory (optional)
         Returns:
             none
         """
         self._logger.debug("method_call: attach_volumes_targeted")
-        all_instances = self.get_instances()
-        instances = self._filter_instances_by_name_regex(all_instances, name_pattern)
+        inv = self._inventory(inventory)
+        instances = self._filter_instances_by_name_regex(inv.instances, name_pattern)
 
         if len(instances) == 0:
             print(f"No instances found matching pattern '{name_pattern}'.")
             return
 
-        volumes = self.get_restored_volumes(label)
-
         # Note: regex pattern already validated in _filter_instances_by_name_regex
+        plan = self.plan_attachments(label, name_pattern, inventory=inv)
+        if len(self._attach_planned(plan, inv)) == 0:
+            print(f"Error: No volumes to attach for instances matching pattern '{name_pattern}'.")
+
+    def restore_pipelined(
+        self,
+        label: str,
+        name_pattern: str | None = None,
+        inventory: ClusterInventory | None = None,
+        max_parallel: int | None = None,
+        policy: DevicePolicy = ALL_DEVICES,
+        fast_restore: bool = False,
+        profile: RestoreProfile = DEFAULT_PROFILE,
+        keep_rollback: bool = False,
+    ) -> None:
+        """
+        Restore instances from snapshots, pipelining the steps per instance.
+
+        Each instance runs stop -> detach -> delete -> create -> attach on its
+        own, starting each step as soon as its previous step has finished for
+        that instance, instead of waiting for the whole cluster at every step.
+        Everything is planned and checked before the first change is made.
+        Managed volumes that belong to no restored instance are deleted at the
+        end, as delete_volumes would.
+
+        Args:
+            label: label of snapshots to restore
+            name_pattern: regex pattern limiting the instances (optional)
+            inventory: shared cluster inventory (optional)
+            max_parallel: instances restored at the same time (optional).
+                         Defaults to self.concurrency.
+            policy: devices to restore (optional). Devices it skips keep their
+                   current volumes.
+            fast_restore: enable Fast Snapshot Restore on the snapshots in the
+                         zones they are restored to, wait for it before
+                         stopping any instance, and disable it afterwards.
+                         Restored volumes are then fully initialized at
+                         creation, at an extra cost.
+            profile: initialization rate and volume settings of the restored
+                    volumes (optional)
+            keep_rollback: tag the detached volumes 'rollback-<label>' and keep
+                          them, so rollback() can reattach them and
+                          commit_restore() deletes them later
+        Returns:
+            none
+        Raises:
+            Exception: If a snapshot is missing a tag or two snapshots claim the
+                      same device (nothing is changed), or if any instance
+                      failed (the others are restored first)
+        """
+        self._logger.debug("method_call: restore_pipelined")
+        with log_duration(self._logger, "restore_pipelined"):
+            inv = self._inventory(inventory)
+            instances = inv.instances
+            if name_pattern:
+                instances = self._filter_instances_by_name_regex(instances, name_pattern)
+            if len(instances) == 0:
+                print("No instances to restore.")
+                return
+            snapshots = inv.snapshots(label)
+            if len(snapshots) == 0:
+                print(f"Error: No snapshots found with label '{label}'.")
+                return
+            snapshots = [
+                s for s in snapshots if self._selects_tagged(inv, policy, s, s.get("VolumeSize"))
+            ]
+            nodes = self._plan_restore(inv, instances, snapshots, label, policy, profile)
+            if keep_rollback:
+                for node in nodes.values():
+                    node.keep_for_rollback(rollback_label(label))
+            # Managed volumes not tied to a restored instance are swept at the end
+            handled = {vid for node in nodes.values() for vid in node.delete_ids}
+            handled.update(vid for node in nodes.values() for vid, _device in node.detachments)
+            pattern = re.compile(name_pattern) if name_pattern else None
+            attached = self._attached_volume_ids(inv)
+            leftover = [
+                v["VolumeId"]
+                for v in inv.volumes
+                if v["VolumeId"] not in handled
+                and v["VolumeId"] not in attached
+                and (pattern is None or pattern.search(inv.tags_of(v).get("Instance") or ""))
+                and self._selects_tagged(inv, policy, v, v.get("Size"))
+            ]
+            fast = FastRestore(self._ec2_client, self.get_waiter) if fast_restore else None
+            try:
+                if fast is not None:
+                    # The cluster keeps running while the snapshots are optimized
+                    self._enable_fast_restore(fast, nodes)
+                result = self._run_nodes("restore", nodes, max_parallel)
+            finally:
+                if fast is not None:
+                    fast.disable()
+                    print(fast.summary())
+            if leftover:
+                self._delete_volume_ids(leftover)
+            inv.invalidate()
+            print(result.summary())
+            result.raise_for_failures()
+
+    def stage_restore(
+        self,
+        label: str,
+        name_pattern: str | None = None,
+        inventory: ClusterInventory | None = None,
+        policy: DevicePolicy = ALL_DEVICES,
+        profile: RestoreProfile = DEFAULT_PROFILE,
+    ) -> None:
+        """
+        Create the volumes of a restore while the instances keep running.
+
+        The volumes are created in each instance's availability zone and left
+        unattached until cutover swaps them in. Volumes staged earlier for the
+        same label and instances are replaced.
+
+        Args:
+            label: label of snapshots to restore
+            name_pattern: regex pattern limiting the instances (optional)
+            inventory: shared cluster inventory (optional)
+            policy: devices to restore (optional). Defaults to all of them.
+            profile: initialization rate and volume settings of the staged
+                    volumes (optional)
+        Returns:
+            none
+        Raises:
+            Exception: If a snapshot is missing a tag or two snapshots claim the
+                      same device (nothing is changed)
+        """
+        self._logger.debug("method_call: stage_restore")
+        with log_duration(self._logger, "stage_restore"):
+            inv = self._inventory(inventory)
+            instances = inv.instances
+            if name_pattern:
+                instances = self._filter_instances_by_name_regex(instances, name_pattern)
+            if len(instances) == 0:
+                print("No instances to restore.")
+                return
+            names = {inv.tags_of(i).get("Name") for i in instances}
+            snapshots = [
+                s
+                for s in inv.snapshots(label)
+                if inv.tags_of(s).get("Instance") in names
+                and self._selects_tagged(inv, policy, s, s.get("VolumeSize"))
+            ]
+            if len(snapshots) == 0:
+                print(f"Error: No snapshots found with label '{label}'.")
+                return
+            # Checks the Device and Instance tags before anything is changed
+            self._snapshots_by_instance(inv, snapshots)
+            stale = [v["VolumeId"] for v in self._unattached_volumes(inv, label, instances, policy)]
+            if stale:
+                print(f"Replacing {len(stale)} previously staged volumes.")
+                self._delete_volume_ids(stale, inv)
+            self._create_volumes_from_snapshots(
+                inv, snapshots, label, show_instance=True, profile=profile
+            )
+            print(f"Staged {len(snapshots)} volumes. Run a cutover to swap them in.")
+
+    def _unattached_volumes(
+        self,
+        inv: ClusterInventory,
+        label: str,
+        instances: list[Any],
+        policy: DevicePolicy = ALL_DEVICES,
+    ) -> list[dict[str, Any]]:
+        """Unattached restored volumes with the label that belong to the instances."""
+        names = {inv.tags_of(i).get("Name") for i in instances}
+        return [
+            v
+            for v in inv.restored_volumes(label)
+            if v["State"] == "available"
+            and not v.get("Attachments")
+            and inv.tags_of(v).get("Instance") in names
+            and self._selects_tagged(inv, policy, v, v.get("Size"))
+        ]
+
+    def cutover(
+        self,
+        label: str,
+        name_pattern: str | None = None,
+        inventory: ClusterInventory | None = None,
+        policy: DevicePolicy = ALL_DEVICES,
+        max_parallel: int | None = None,
+        keep_rollback: bool = False,
+    ) -> None:
+        """
+        Swap staged volumes in, pipelining the steps per instance.
+
+        Each instance with staged volumes runs stop -> detach -> attach ->
+        start on its own, so its downtime is only the swap itself. The volumes
+        it replaces are deleted once the instance is back up; if the swap of
+        an instance fails, its replaced volumes are kept. Instances that were
+        stopped before the cutover are left stopped.
 
-        volume_ids = []
+        Args:
+            label: label of the staged volumes
+            name_pattern: regex pattern limiting the instances (optional)
+            inventory: shared cluster inventory (optional)
+            policy: devices to swap (optional). Defaults to all of them.
+            max_parallel: instances swapped at the same time (optional).
+                         Defaults to self.concurrency.
+            keep_rollback: tag the replaced volumes 'rollback-<label>' and keep
+                          them instead of deleting them (optional)
+        Returns:
+            none
+        Raises:
+            Exception: If two staged volumes claim the same device (nothing is
+                      changed), or if any instance failed (the others are
+                      swapped first)
+        """
+        self._logger.debug("method_call: cutover")
+        with log_duration(self._logger, "cutover"):
+            inv = self._inventory(inventory)
+            instances = inv.instances
+            if name_pattern:
+                instances = self._filter_instances_by_name_regex(instances, name_pattern)
+            staged = self._unattached_volumes(inv, label, instances, policy)
+            if len(staged) == 0:
+                print(f"Error: No staged volumes found with label '{label}'.")
+                return
+            keep = rollback_label(label) if keep_rollback else None
+            self._swap_volumes("cutover", inv, instances, staged, max_parallel, keep)
+
+    def rollback(
+        self,
+        label: str,
+        name_pattern: str | None = None,
+        inventory: ClusterInventory | None = None,
+        policy: DevicePolicy = ALL_DEVICES,
+        max_parallel: int | None = None,
+    ) -> None:
+        """
+        Reattach the volumes a restore of ``label`` kept for rollback.
+
+        The volumes attached by the restore are swapped out and deleted, the
+        same way a cutover swaps staged volumes in. Instances that were running
+        are started again.
+
+        Args:
+            label: label the restore was run with
+            name_pattern: regex pattern limiting the instances (optional)
+            inventory: shared cluster inventory (optional)
+            policy: devices to roll back (optional). Defaults to all of them.
+            max_parallel: instances rolled back at the same time (optional).
+                         Defaults to self.concurrency.
+        Returns:
+            none
+        Raises:
+            Exception: If two kept volumes claim the same device (nothing is
+                      changed), or if any instance failed
+        """
+        self._logger.debug("method_call: rollback")
+        with log_duration(self._logger, "rollback"):
+            inv = self._inventory(inventory)
+            instances = inv.instances
+            if name_pattern:
+                instances = self._filter_instances_by_name_regex(instances, name_pattern)
+            kept = self._unattached_volumes(inv, rollback_label(label), instances, policy)
+            if len(kept) == 0:
+                print(f"Error: No rollback volumes found for label '{label}'.")
+                return
+            self._swap_volumes("rollback", inv, instances, kept, max_parallel)
+
+    def commit_restore(
+        self,
+        label: str,
+        name_pattern: str | None = None,
+        inventory: ClusterInventory | None = None,
+        policy: DevicePolicy = ALL_DEVICES,
+    ) -> None:
+        """
+        Delete the volumes a restore of ``label`` kept for rollback.
+
+        The delete calls are made, but their completion is not waited on.
+
+        Args:
+            label: label the restore was run with
+            name_pattern: regex pattern limiting the instances (optional)
+            inventory: shared cluster inventory (optional)
+            policy: devices to commit (optional). Defaults to all of them.
+        Returns:
+            none
+        """
+        self._logger.debug("method_call: commit_restore")
+        inv = self._inventory(inventory)
+        instances = inv.instances
+        if name_pattern:
+            instances = self._filter_instances_by_name_regex(instances, name_pattern)
+        kept = self._unattached_volumes(inv, rollback_label(label), instances, policy)
+        if len(kept) == 0:
+            print(f"No rollback volumes found for label '{label}'.")
+            return
+        print(f"Deleting {len(kept)} rollback volumes in the background.")
+        self._delete_volume_ids([v["VolumeId"] for v in kept], inv)
+
+    def _swap_volumes(
+        self,
+        operation: str,
+        inv: ClusterInventory,
+        instances: list[Any],
+        volumes: list[dict[str, Any]],
+        max_parallel: int | None,
+        keep_label: str | None = None,
+    ) -> None:
+        """Swap detached volumes in for the ones on their devices, per instance.
+
+        Raises:
+            Exception: If two volumes claim the same device (nothing is
+                      changed), or if any instance failed
+        """
+        plan = plan_attachments(instances, volumes, inv.tags_of)
+        for volume_id in plan.unmatched:
+            print(f"Warning: No matching instance or device for volume {volume_id}.")
+        if plan.conflicts:
+            for conflict in plan.conflicts:
+                print(
+                    f"Error: Volumes {', '.join(conflict.volume_ids)} all claim "
+                    f"{conflict.device} on {conflict.instance_id}."
+                )
+            raise Exception(f"Error: {operation}: conflicting volumes, nothing was changed.")
+        by_id = {i["InstanceId"]: i for i in instances}
+        managed = {v["VolumeId"] for v in inv.volumes}
+        nodes: dict[str, _NodeRestore] = {}
+        for attachment in plan.attachments:
+            key = f"{attachment.instance_name} ({attachment.instance_id})"
+            node = nodes.get(key)
+            if node is None:
+                state = by_id[attachment.instance_id]["State"]["Name"]
+                node = _NodeRestore(
+                    attachment.instance_id,
+                    attachment.instance_name,
+                    state in ("pending", "running", "stopping"),
+                    start=state in ("pending", "running"),
+                )
+                nodes[key] = node
+            current = inv.attached_devices(attachment.instance_id).get(attachment.device)
+            if current is not None:
+                node.detachments.append((current["VolumeId"], attachment.device))
+                if current["VolumeId"] in managed:
+                    node.delete_ids.append(current["VolumeId"])
+            node.staged.append((attachment.volume_id, attachment.device))
+        if keep_label is not None:
+            for node in nodes.values():
+                node.keep_for_rollback(keep_label)
+        result = self._run_nodes(operation, nodes, max_parallel)
+        inv.invalidate()
+        print(result.summary())
+        result.raise_for_failures()
+
+    @staticmethod
+    def _enable_fast_restore(fast: FastRestore, nodes: dict[str, _NodeRestore]) -> None:
+        """Enable FSR for every planned volume's snapshot in its zone and wait for it."""
+        snapshot_zones: dict[str, set[str]] = {}
+        for node in nodes.values():
+            for snapshot_id, (_device, request) in node.creates.items():
+                snapshot_zones.setdefault(snapshot_id, set()).add(request["AvailabilityZone"])
+        if not snapshot_zones:
+            return
+        fast.enable(snapshot_zones)
+        fast.wait(FAST_RESTORE_WAIT_TIMEOUT)
+        ready = fast.ready
+        for node in nodes.values():
+            for snapshot_id, (_device, request) in node.creates.items():
+                if snapshot_id in ready:
+                    # Volumes from FSR snapshots are fully initialized at creation
+                    request.pop("VolumeInitializationRate", None)
+
+    def _plan_restore(
+        self,
+        inv: ClusterInventory,
+        instances: list[Any],
+        snapshots: list[dict[str, Any]],
+        label: str,
+        policy: DevicePolicy = ALL_DEVICES,
+        profile: RestoreProfile = DEFAULT_PROFILE,
+    ) -> dict[str, _NodeRestore]:
+        """Work out each instance's restore steps, keyed by 'name (instance_id)'.
+
+        Raises:
+            Exception: If a snapshot lacks a tag or two snapshots claim the same
+                      device on one instance
+        """
+        by_instance = self._snapshots_by_instance(inv, snapshots)
+        managed = {v["VolumeId"] for v in inv.volumes}
+        # Volumes the policy leaves attached are never detached, so they must
+        # not be deleted either
+        attached = self._attached_volume_ids(inv)
+        nodes: dict[str, _NodeRestore] = {}
         for i in instances:
-            instance_name = TagSet(i.tags).get("Name") or ""
-            for volume in volumes:
-                ts = TagSet(volume.tags)
-                volume_instance = ts.get("Instance")
-                device = ts.get("Device")
-                if volume_instance == instance_name:
-                    # Attach volume
-                    shortname = instance_name.split(".")[0]
-                    print(f"Attaching {device} ({volume.id}) to {shortname} ({i.id})")
-                    volume.attach_to_instance(Device=device, InstanceId=i.id)
-                    volume_ids.append(volume.id)
-
-        if len(volume_ids) == 0:
-            print(f"Error: No volumes to attach for instances matching pattern '{name_pattern}'.")
-        else:
-            # Wait for the volumes to be attached
-            print(f"Waiting for {len(volume_ids)} volumes to be attached...")
-            self.wait_for_volumes(volume_ids, "volume_in_use")
+            name = inv.tags_of(i).get("Name") or ""
+            node = _NodeRestore(
+                i["InstanceId"], name, i["State"]["Name"] in ("pending", "running", "stopping")
+            )
+            for device, volume in self._selected_devices(inv, i, policy).items():
+                node.detachments.append((volume["VolumeId"], device))
+                if volume["VolumeId"] in managed:
+                    node.delete_ids.append(volume["VolumeId"])
+            for volume in inv.volumes:
+                if (
+                    inv.tags_of(volume).get("Instance") == name
+                    and volume["VolumeId"] not in node.delete_ids
+                    and volume["VolumeId"] not in attached
+                    and self._selects_tagged(inv, policy, volume, volume.get("Size"))
+                ):
+                    node.delete_ids.append(volume["VolumeId"])
+            avail_zone = i["Placement"]["AvailabilityZone"]
+            for device, snapshot in by_instance.pop(name, {}).items():
+                node.creates[snapshot["SnapshotId"]] = (
+                    device,
+                    self._volume_request(
+                        device, name, label, avail_zone, profile, snapshot.get("VolumeSize")
+                    ),
+                )
+            if not node.creates:
+                print(f"Warning: No '{label}' snapshots for {name} ({i['InstanceId']}).")
+            nodes[f"{name} ({i['InstanceId']})"] = node
+        for instance in by_instance:
+            self._logger.debug(f"restore: no selected instance named '{instance}', skipping.")
+        return nodes
+
+    def _snapshots_by_instance(
+        self, inv: ClusterInventory, snapshots: list[dict[str, Any]]
+    ) -> dict[str, dict[str, dict[str, Any]]]:
+        """Group snapshots as instance name -> device -> snapshot.
+
+        Raises:
+            Exception: If a snapshot lacks a tag or two snapshots claim the same
+                      device on one instance
+        """
+        by_instance: dict[str, dict[str, dict[str, Any]]] = {}
+        for snapshot in snapshots:
+            device, instance = self._snapshot_target(inv, snapshot)
+            claimed = by_instance.setdefault(instance, {})
+            if device in claimed:
+                raise Exception(
+                    f"Error: restore: snapshots {claimed[device]['SnapshotId']} and "
+                    f"{snapshot['SnapshotId']} both claim {device} on {instance}."
+                )
+            claimed[device] = snapshot
+        return by_instance
+
+    def _run_nodes(
+        self, operation: str, nodes: dict[str, _NodeRestore], max_parallel: int | None
+    ) -> BatchResult:
+        """Run each node's restore steps, up to max_parallel nodes at a time."""
+        # A dedicated pool: node chains must not wait on the shared executor
+        pipeline = BatchExecutor(max_parallel or self.concurrency)
+        try:
+            return pipeline.run(operation, lambda key: self._restore_node(nodes[key]), list(nodes))
+        finally:
+            pipeline.shutdown()
+
+    def _restore_node(self, node: _NodeRestore) -> None:
+        """Run the restore steps of one instance, waiting only on its own resources."""
+        instance_id = node.instance_id
+        shortname = node.name.split(".")[0]
+        stopped_at = time.monotonic()
+        if node.running:
+            print(f"Stopping {node.name} ({instance_id})")
+            self._ec2_client.stop_instances(InstanceIds=[instance_id])
+            self._wait_instances_stopped([instance_id])
+        for volume_id, device in node.detachments:
+            print(f"Detaching {device} ({volume_id}) from {shortname} ({instance_id})")
+            self._ec2_client.detach_volume(
+                VolumeId=volume_id, InstanceId=instance_id, Device=device
+            )
+        if node.detachments:
+            self.wait_for_volumes([vid for vid, _device in node.detachments], "volume_available")
+        if node.rollback_label is not None:
+            for volume_id, device in node.detachments:
+                print(f"Keeping {device} ({volume_id}) of {shortname} as {node.rollback_label}")
+                self._ec2_client.create_tags(
+                    Resources=[volume_id],
+                    Tags=self._volume_tags(device, node.name, node.rollback_label).to_list(),
+                )
+        attachments = list(node.staged)
+        for snapshot_id, (device, request) in node.creates.items():
+            print(f"Creating volume from snapshot {snapshot_id} for {node.name}")
+            volume = self._ec2_client.create_volume(SnapshotId=snapshot_id, **request)
+            attachments.append((volume["VolumeId"], device))
+        created = attachments[len(node.staged) :]
+        if created:
+            self._wait(
+                "volume",
+                [vid for vid, _device in created],
+                self._available_and_tagged,
+                VOLUME_WAIT_TIMEOUT,
+            )
+        for volume_id, device in attachments:
+            print(f"Attaching {device} ({volume_id}) to {shortname} ({instance_id})")
+            self._ec2_client.attach_volume(
+                Device=device, InstanceId=instance_id, VolumeId=volume_id
+            )
+        if attachments:
+            self.wait_for_volumes([vid for vid, _device in attachments], "volume_in_use")
+        if node.start:
+            print(f"Starting {node.name} ({instance_id})")
+            self._ec2_client.start_instances(InstanceIds=[instance_id])
+            self._wait_instances_running([instance_id])
+            print(f"{shortname} was down for {time.monotonic() - stopped_at:.0f}s")
+        # The replaced volumes are only queued once their replacements are
+        # attached (and the instance is back up), so a failed swap leaves
+        # them in place. Deletion only has to finish eventually.
+        for volume_id in node.delete_ids:
+            print(f"Deleting volume {volume_id}")
+        self.deletions.submit("volume", node.delete_ids)
@@ -0,0 +1,208 @@
+"""DeletionQueue - Delete volumes and snapshots in the background.
+
+Nothing in a backup or restore depends on the old volumes and snapshots being
+gone, yet deleting them used to block until EC2 confirmed it. This module
+issues the delete calls on background threads instead, so the caller can go
+on as soon as the user-visible work is done:
+
+- Calls that EC2 refuses for the moment (a volume that is still detaching, a
+  snapshot still used by an AMI being registered, throttling) are retried
+  with a growing delay.
+- A resource that is already gone counts as deleted.
+- ``status()`` reports progress, and ``drain()`` waits for everything that
+  was submitted and raises if any deletion failed for good.
+
+Example:
+    Deleting in the background and waiting at the very end:
+
+    ```python
+    queue = DeletionQueue(ec2_client)
+    queue.submit('volume', ['vol-0abc', 'vol-0def'])
+    queue.submit('snapshot', ['snap-0123'])
+    ...  # carry on with the restore
+    print(queue.status())
+    queue.drain(timeout=600)
+    ```
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from typing import Any
+
+from botocore.exceptions import ClientError
+
+from .executor import DEFAULT_CONCURRENCY
+
+# Kind -> (client method, ID argument, error code of a resource that is gone)
+_DELETE_CALLS = {
+    "volume": ("delete_volume", "VolumeId", "InvalidVolume.NotFound"),
+    "snapshot": ("delete_snapshot", "SnapshotId", "InvalidSnapshot.NotFound"),
+}
+
+# Error codes worth retrying: the resource can be deleted a little later
+RETRYABLE_ERRORS = {
+    "VolumeInUse",
+    "IncorrectState",
+    "InvalidSnapshot.InUse",
+    "RequestLimitExceeded",
+    "Throttling",
+}
+
+# Attempts per resource. The delay between attempts starts at
+# DELETE_RETRY_DELAY seconds and doubles.
+DELETE_RETRY_ATTEMPTS = 5
+DELETE_RETRY_DELAY = 5.0
+
+
+class DeletionQueue:
+    """Background deletion of volumes and snapshots with retries.
+
+    Attributes:
+        deleted: (kind, resource ID) of each resource deleted so far
+        failed: (kind, resource ID) -> error of each deletion that gave up
+    """
+
+    def __init__(
+        self,
+        ec2_client: Any,
+        max_workers: int = DEFAULT_CONCURRENCY,
+        attempts: int = DELETE_RETRY_ATTEMPTS,
+        retry_delay: float = DELETE_RETRY_DELAY,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Initialize an empty queue without starting any threads.
+
+        Args:
+            ec2_client: boto3 EC2 client used for the delete calls
+            max_workers: Maximum number of delete calls in flight at once
+            attempts: Attempts per resource before giving up
+            retry_delay: Seconds before the first retry
+            sleep: Sleep function (optional, for tests)
+
+        Raises:
+            ValueError: If max_workers or attempts is less than 1
+        """
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}.")
+        if attempts < 1:
+            raise ValueError(f"attempts must be at least 1, got {attempts}.")
+        self._ec2_client = ec2_client
+        self.max_workers = max_workers
+        self.attempts = attempts
+        self.retry_delay = retry_delay
+        self._sleep = sleep
+        self._logger = logging.getLogger("tagmania")
+        self._lock = threading.Lock()
+        self._pool: ThreadPoolExecutor | None = None
+        self._futures: dict[tuple[str, str], Future[None]] = {}
+        self.deleted: list[tuple[str, str]] = []
+        self.failed: dict[tuple[str, str], str] = {}
+
+    def submit(self, kind: str, resource_ids: Iterable[str]) -> None:
+        """Queue resources for deletion and return right away.
+
+        A resource that is already queued and not finished is not queued
+        again.
+
+        Args:
+            kind: 'volume' or 'snapshot'
+            resource_ids: IDs of the resources to delete
+
+        Raises:
+            ValueError: If the kind is unknown
+        """
+        if kind not in _DELETE_CALLS:
+            raise ValueError(f"Unknown resource kind '{kind}'.")
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="tagmania-delete"
+                )
+            for resource_id in resource_ids:
+                key = (kind, resource_id)
+                future = self._futures.get(key)
+                if future is not None and not future.done():
+                    continue
+                self.failed.pop(key, None)
+                self._futures[key] = self._pool.submit(self._delete, kind, resource_id)
+
+    @property
+    def pending(self) -> list[tuple[str, str]]:
+        """(kind, resource ID) of each deletion that has not finished yet."""
+        with self._lock:
+            return [key for key, future in self._futures.items() if not future.done()]
+
+    def status(self) -> str:
+        """One-line description of the queue."""
+        pending = len(self.pending)
+        return (
+            f"Deletions: {pending} pending, {len(self.deleted)} deleted, {len(self.failed)} failed."
+        )
+
+    def drain(self, timeout: float | None = None) -> None:
+        """Wait until every queued deletion has finished.
+
+        Args:
+            timeout: Seconds to wait at most (optional). None waits as long
+                    as it takes.
+
+        Raises:
+            Exception: If deletions are still pending after the timeout, or
+                      if any deletion failed. The failures stay in ``failed``.
+        """
+        with self._lock:
+            futures = list(self._futures.values())
+        _done, not_done = wait_futures(futures, timeout=timeout)
+        if not_done:
+            raise Exception(f"Error: deletions: {len(not_done)} still pending after {timeout}s.")
+        if self.failed:
+            for (kind, resource_id), error in self.failed.items():
+                print(f"Error: Failed to delete {kind} {resource_id}: {error}")
+            raise Exception(
+                f"Error: deletions: {len(self.failed)} of {len(futures)} deletions failed."
+            )
+
+    def shutdown(self) -> None:
+        """Wait for the queued deletions and stop the worker threads."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def _delete(self, kind: str, resource_id: str) -> None:
+        """Delete one resource, retrying errors that may clear up."""
+        method, id_arg, gone = _DELETE_CALLS[kind]
+        call = getattr(self._ec2_client, method)
+        delay = self.retry_delay
+        for attempt in range(1, self.attempts + 1):
+            try:
+                call(**{id_arg: resource_id})
+                break
+            except ClientError as e:
+                code = e.response.get("Error", {}).get("Code")
+                if code == gone:
+                    break
+                if code not in RETRYABLE_ERRORS or attempt == self.attempts:
+                    self._record_failure(kind, resource_id, e)
+                    return
+                self._logger.debug(
+                    f"delete {kind} {resource_id}: {code}, retrying in {delay:.0f}s "
+                    f"(attempt {attempt} of {self.attempts})."
+                )
+            except Exception as e:
+                self._record_failure(kind, resource_id, e)
+                return
+            self._sleep(delay)
+            delay *= 2
+        with self._lock:
+            self.deleted.append((kind, resource_id))
+
+    def _record_failure(self, kind: str, resource_id: str, error: BaseException) -> None:
+        with self._lock:
+            self.failed[(kind, resource_id)] = str(error)
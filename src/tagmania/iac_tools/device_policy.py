@@ -0,0 +1,103 @@
+"""DevicePolicy - Choose which attached devices a backup or restore touches.
+
+By default every volume attached to an instance is snapshotted, detached,
+recreated and reattached. Most root disks are rebuilt from the AMI, so only
+the data disks need to be carried over. A DevicePolicy narrows the devices
+by:
+
+- excluding the root device (the instance's ``RootDeviceName``)
+- a regex the device name must match, and one it must not match
+- a minimum volume size in GiB
+
+The same policy is applied when backing up and when restoring, so a restore
+only replaces the devices that the backup captured.
+
+Example:
+    Backing up data disks of at least 10 GiB:
+
+    ```python
+    policy = DevicePolicy(exclude_root=True, min_size=10)
+    cluster.create_snapshots('nightly', policy=policy)
+    cluster.restore_pipelined('nightly', policy=policy)
+    ```
+"""
+
+from __future__ import annotations
+
+import re
+
+
+class DevicePolicy:
+    """Select devices by root status, name and size.
+
+    Attributes:
+        exclude_root: Skip the instance's root device
+        include: Regex a device name must match, or None for any
+        exclude: Regex a device name must not match, or None
+        min_size: Smallest volume size in GiB to select, or None
+    """
+
+    def __init__(
+        self,
+        exclude_root: bool = False,
+        include: str | None = None,
+        exclude: str | None = None,
+        min_size: int | None = None,
+    ) -> None:
+        """Initialize a policy. With no arguments every device is selected.
+
+        Args:
+            exclude_root: Skip the instance's root device
+            include: Regex searched in the device name (e.g. '^/dev/sd[f-p]')
+            exclude: Regex searched in the device name to skip it
+            min_size: Smallest volume size in GiB
+
+        Raises:
+            re.error: If either regex is invalid
+        """
+        self.exclude_root = exclude_root
+        self.include = include
+        self.exclude = exclude
+        self.min_size = min_size
+        self._include = re.compile(include) if include else None
+        self._exclude = re.compile(exclude) if exclude else None
+
+    def __repr__(self) -> str:
+        return (
+            f"DevicePolicy(exclude_root={self.exclude_root}, include={self.include!r}, "
+            f"exclude={self.exclude!r}, min_size={self.min_size})"
+        )
+
+    @property
+    def selects_all(self) -> bool:
+        """True if the policy selects every device."""
+        return (
+            not self.exclude_root
+            and self._include is None
+            and self._exclude is None
+            and self.min_size is None
+        )
+
+    def selects(self, device: str, size: int | None = None, root_device: str | None = None) -> bool:
+        """Decide whether a device is part of the backup or restore.
+
+        Args:
+            device: Device name (e.g. '/dev/sdf')
+            size: Volume size in GiB, if known. An unknown size is not
+                 filtered on.
+            root_device: The instance's root device name, if known
+
+        Returns:
+            bool: True if the device is selected
+        """
+        if self.exclude_root and root_device is not None and device == root_device:
+            return False
+        if self._include is not None and not self._include.search(device):
+            return False
+        if self._exclude is not None and self._exclude.search(device):
+            return False
+        return self.min_size is None or size is None or size >= self.min_size
+
+
+# Selects every device; the default everywhere a policy is optional
+ALL_DEVICES = DevicePolicy()
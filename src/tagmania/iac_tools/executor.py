@@ -0,0 +1,152 @@
+"""BatchExecutor - Run one API call per item concurrently.
+
+Cluster operations issue the same mutating call (create_volume, detach_volume,
+delete_snapshot, ...) once per resource. Run one after the other, a large
+cluster spends most of its time waiting on round trips. This module provides a
+bounded thread pool that runs those calls side by side.
+
+A failing item does not stop the batch. Every item is attempted, and its
+outcome is recorded in a BatchResult so the caller can wait on the items that
+succeeded before reporting the ones that did not.
+
+boto3 clients are thread-safe and can be shared by the workers. Resource
+objects are not and should not be used inside submitted callables.
+
+Example:
+    Deleting many volumes at once:
+
+    ```python
+    executor = BatchExecutor(max_workers=16)
+    result = executor.run(
+        "delete_volume",
+        lambda volume_id: ec2_client.delete_volume(VolumeId=volume_id),
+        volume_ids,
+    )
+    print(result.summary())
+    result.raise_for_failures()
+    ```
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+# Concurrent API calls per batch. High enough to hide round-trip latency,
+# low enough to stay clear of EC2 request throttling.
+DEFAULT_CONCURRENCY = 16
+
+
+class BatchResult:
+    """Outcome of one operation run over many items.
+
+    Attributes:
+        operation: Name of the operation, used in messages
+        succeeded: (item, return value) pairs, in submission order
+        failed: (item, exception) pairs, in submission order
+    """
+
+    def __init__(self, operation: str) -> None:
+        self.operation = operation
+        self.succeeded: list[tuple[Any, Any]] = []
+        self.failed: list[tuple[Any, BaseException]] = []
+
+    def __len__(self) -> int:
+        return len(self.succeeded) + len(self.failed)
+
+    @property
+    def ok(self) -> bool:
+        """True if every item succeeded."""
+        return not self.failed
+
+    @property
+    def succeeded_items(self) -> list[Any]:
+        """Items whose call succeeded."""
+        return [item for item, _result in self.succeeded]
+
+    @property
+    def results(self) -> list[Any]:
+        """Return values of the items that succeeded."""
+        return [result for _item, result in self.succeeded]
+
+    def summary(self) -> str:
+        """One-line description of the batch outcome."""
+        return f"{self.operation}: {len(self.succeeded)} succeeded, {len(self.failed)} failed."
+
+    def raise_for_failures(self) -> None:
+        """Report each failed item and raise if there were any.
+
+        Raises:
+            Exception: If one or more items failed
+        """
+        if self.ok:
+            return
+        for item, error in self.failed:
+            print(f"Error: {self.operation} failed for {item}: {error}")
+        raise Exception(
+            f"Error: {self.operation}: {len(self.failed)} of {len(self)} operations failed."
+        )
+
+
+class BatchExecutor:
+    """Bounded thread pool shared by the mutating ClusterSet methods.
+
+    The worker threads are created on first use and reused for every batch
+    run through the executor.
+
+    Attributes:
+        max_workers: Maximum number of calls in flight at once
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_CONCURRENCY) -> None:
+        """Initialize the executor without starting any threads.
+
+        Args:
+            max_workers: Maximum number of concurrent calls. Must be at least 1.
+
+        Raises:
+            ValueError: If max_workers is less than 1
+        """
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}.")
+        self.max_workers = max_workers
+        self._pool: ThreadPoolExecutor | None = None
+        self._logger = logging.getLogger("tagmania")
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="tagmania"
+            )
+        return self._pool
+
+    def run(self, operation: str, fn: Callable[[Any], Any], items: Iterable[Any]) -> BatchResult:
+        """Call ``fn`` on every item and collect the outcomes.
+
+        Args:
+            operation: Name of the operation, used in messages
+            fn: Callable run once per item in a worker thread
+            items: Items to process
+
+        Returns:
+            BatchResult: Successes and failures, each in submission order
+        """
+        pool = self._get_pool()
+        futures: list[tuple[Any, Future[Any]]] = [(item, pool.submit(fn, item)) for item in items]
+        result = BatchResult(operation)
+        for item, future in futures:
+            error = future.exception()
+            if error is None:
+                result.succeeded.append((item, future.result()))
+            else:
+                result.failed.append((item, error))
+        self._logger.debug(result.summary())
+        return result
+
+    def shutdown(self) -> None:
+        """Stop the worker threads. The executor can still be used afterwards."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
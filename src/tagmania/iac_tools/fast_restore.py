@@ -0,0 +1,221 @@
+"""FastRestore - Enable Fast Snapshot Restore for the duration of a restore.
+
+A volume created from a snapshot is hydrated lazily: each block is fetched
+from S3 the first time it is read, so a freshly restored database runs slowly
+for hours. With Fast Snapshot Restore (FSR) enabled on a snapshot in an
+availability zone, volumes created from it there are fully initialized at
+creation.
+
+FSR is billed per snapshot and zone for every hour it is enabled (one hour
+minimum), and it takes a while to become ``enabled``. This module enables it
+only for the (snapshot, zone) pairs a restore needs, waits for them, and
+disables them again afterwards. Pairs that were already enabled before the
+restore are used as they are and left enabled.
+
+Example:
+    Restoring with FSR:
+
+    ```python
+    fast = FastRestore(ec2_client, cluster.get_waiter)
+    fast.enable({'snap-0abc': {'us-east-1a'}, 'snap-0def': {'us-east-1b'}})
+    try:
+        fast.wait(timeout=3600)
+        ...  # create the volumes
+    finally:
+        fast.disable()
+    print(fast.summary())
+    ```
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable
+from typing import Any
+
+from .paging import iter_items
+from .waiter import ResourceWaiter
+
+# On-demand price of one FSR data services unit-hour (one snapshot enabled in
+# one zone for one hour) in us-east-1. Used for the cost estimate only.
+FSR_DSU_HOUR_PRICE = 0.75
+# FSR is billed for at least one hour each time it is enabled
+FSR_MINIMUM_HOURS = 1.0
+
+_ACTIVE_STATES = ("enabling", "optimizing", "enabled")
+
+
+def pair_id(snapshot_id: str, zone: str) -> str:
+    """ResourceWaiter ID of a fast snapshot restore: 'snap-id/zone'."""
+    return f"{snapshot_id}/{zone}"
+
+
+class FastRestore:
+    """Enable, wait on and disable Fast Snapshot Restore for one restore.
+
+    Attributes:
+        enabled: (snapshot_id, zone) pairs enabled by this object, which
+                disable() turns off again
+        confirmed: Pairs of ``enabled`` the waiter saw reach ``enabled``,
+                  the ones the cost estimate counts
+        reused: Pairs that were already enabled and are left alone
+        failed: (snapshot_id, zone, reason) of pairs that could not be enabled.
+               Volumes from those snapshots are hydrated lazily as usual.
+    """
+
+    def __init__(
+        self,
+        ec2_client: Any,
+        get_waiter: Callable[[], ResourceWaiter],
+        price: float = FSR_DSU_HOUR_PRICE,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize without enabling anything.
+
+        Args:
+            ec2_client: boto3 EC2 client
+            get_waiter: Returns a new ResourceWaiter (e.g. ClusterSet.get_waiter)
+            price: Price of one snapshot enabled in one zone for one hour
+            clock: Monotonic clock (optional, for tests)
+        """
+        self._ec2_client = ec2_client
+        self._get_waiter = get_waiter
+        self.price = price
+        self._clock = clock
+        self._logger = logging.getLogger("tagmania")
+        self.enabled: list[tuple[str, str]] = []
+        self.confirmed: list[tuple[str, str]] = []
+        self.reused: list[tuple[str, str]] = []
+        self.failed: list[tuple[str, str, str]] = []
+        self._enabled_at: float | None = None
+        self._ready_at: float | None = None
+        self._disabled_at: float | None = None
+
+    @property
+    def ready(self) -> set[str]:
+        """Snapshot IDs that have FSR in every zone they were requested in."""
+        failed = {snapshot_id for snapshot_id, _zone, _reason in self.failed}
+        return {s for s, _zone in self.enabled + self.reused if s not in failed}
+
+    def enable(self, snapshot_zones: dict[str, set[str]]) -> None:
+        """Enable FSR for every snapshot in each zone it is needed in.
+
+        Failures are recorded in ``failed`` instead of raised, so the restore
+        can go on without FSR for those snapshots.
+
+        Args:
+            snapshot_zones: snapshot ID -> zones its volumes are created in
+        """
+        active = {
+            (f["SnapshotId"], f["AvailabilityZone"])
+            for f in iter_items(
+                self._ec2_client,
+                "describe_fast_snapshot_restores",
+                "FastSnapshotRestores",
+                Filters=[
+                    {"Name": "snapshot-id", "Values": list(snapshot_zones)},
+                    {"Name": "state", "Values": list(_ACTIVE_STATES)},
+                ],
+            )
+        }
+        # zone -> snapshots to enable there, one call per zone
+        by_zone: dict[str, list[str]] = {}
+        for snapshot_id, zones in snapshot_zones.items():
+            for zone in sorted(zones):
+                if (snapshot_id, zone) in active:
+                    self.reused.append((snapshot_id, zone))
+                else:
+                    by_zone.setdefault(zone, []).append(snapshot_id)
+        self._enabled_at = self._clock()
+        for zone, snapshot_ids in by_zone.items():
+            print(f"Enabling fast snapshot restore for {len(snapshot_ids)} snapshots in {zone}")
+            try:
+                response = self._ec2_client.enable_fast_snapshot_restores(
+                    AvailabilityZones=[zone], SourceSnapshotIds=snapshot_ids
+                )
+            except Exception as e:
+                self.failed.extend((snapshot_id, zone, str(e)) for snapshot_id in snapshot_ids)
+                continue
+            for item in response.get("Successful", []):
+                self.enabled.append((item["SnapshotId"], item["AvailabilityZone"]))
+            for item in response.get("Unsuccessful", []):
+                for error in item.get("FastSnapshotRestoreStateErrors", []):
+                    self.failed.append(
+                        (
+                            item["SnapshotId"],
+                            error.get("AvailabilityZone", zone),
+                            error.get("Error", {}).get("Message", "unknown error"),
+                        )
+                    )
+        for snapshot_id, zone, reason in self.failed:
+            print(
+                f"Warning: Fast snapshot restore not enabled for {snapshot_id} in {zone}: {reason}"
+            )
+
+    def wait(self, timeout: float) -> None:
+        """Wait until every requested pair is ``enabled``.
+
+        Pairs that fail or time out are moved to ``failed`` and reported; the
+        others are ready when this returns.
+        """
+        pending = self.enabled + self.reused
+        if not pending:
+            return
+        print(f"Waiting for fast snapshot restore on {len(pending)} snapshot/zone pairs...")
+        waiter = self._get_waiter()
+        waiter.add_many(
+            "fast_snapshot_restore",
+            [pair_id(snapshot_id, zone) for snapshot_id, zone in pending],
+            "enabled",
+        )
+        try:
+            waiter.wait(timeout)
+        except Exception as e:
+            self._logger.debug(f"fast_snapshot_restore: {e}")
+        for resource_id, state in waiter.failed.items():
+            snapshot_id, zone = resource_id.split("/")
+            self.failed.append((snapshot_id, zone, state))
+            print(f"Warning: Fast snapshot restore for {snapshot_id} in {zone} is {state}.")
+        self.confirmed = [pair for pair in self.enabled if pair_id(*pair) in waiter.completed]
+        self._ready_at = self._clock()
+
+    def disable(self) -> None:
+        """Turn FSR off again for the pairs this object enabled.
+
+        Failures are reported but not raised, since the restore itself is
+        already done by then.
+        """
+        by_zone: dict[str, list[str]] = {}
+        for snapshot_id, zone in self.enabled:
+            by_zone.setdefault(zone, []).append(snapshot_id)
+        for zone, snapshot_ids in by_zone.items():
+            print(f"Disabling fast snapshot restore for {len(snapshot_ids)} snapshots in {zone}")
+            try:
+                self._ec2_client.disable_fast_snapshot_restores(
+                    AvailabilityZones=[zone], SourceSnapshotIds=snapshot_ids
+                )
+            except Exception as e:
+                print(
+                    f"Error: Failed to disable fast snapshot restore in {zone} for "
+                    f"{', '.join(snapshot_ids)}: {e}. Disable it manually to stop charges."
+                )
+        if self._enabled_at is not None:
+            self._disabled_at = self._clock()
+
+    def summary(self) -> str:
+        """Time spent waiting for FSR and the estimated cost of enabling it.
+
+        Only the pairs confirmed as ``enabled`` are counted in the cost.
+        """
+        if self._enabled_at is None:
+            return "Fast snapshot restore: not used."
+        waited = (self._ready_at or self._enabled_at) - self._enabled_at
+        end = self._disabled_at if self._disabled_at is not None else self._clock()
+        hours = max((end - self._enabled_at) / 3600, FSR_MINIMUM_HOURS)
+        cost = len(self.confirmed) * hours * self.price
+        return (
+            f"Fast snapshot restore: {len(self.confirmed)} snapshot/zone pairs enabled "
+            f"({len(self.reused)} already enabled, {len(self.failed)} failed), "
+            f"{waited / 60:.1f} min spent waiting, estimated cost ${cost:.2f}."
+        )
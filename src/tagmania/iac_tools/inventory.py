@@ -0,0 +1,306 @@
+"""ClusterInventory - Point-in-time view of a cluster's EC2 resources.
+
+This module provides the ClusterInventory class, which fetches the instances,
+attached volumes, managed volumes and managed snapshots of a cluster with a
+handful of paginated ``describe_*`` calls and indexes them in memory.
+
+ClusterSet methods accept an optional inventory so that a multi-step operation
+(e.g. a full restore) can share one set of describe results instead of
+re-querying EC2 at every step. Each section is fetched lazily on first access
+and cached until it is invalidated, so an inventory only costs the calls that
+are actually needed.
+
+Example:
+    Sharing an inventory across a restore:
+
+    ```python
+    cluster = ClusterSet('production-web')
+    inventory = cluster.get_inventory()
+
+    cluster.stop_instances(inventory=inventory)
+    cluster.detach_volumes(inventory=inventory)
+    cluster.delete_volumes(inventory=inventory)
+    cluster.create_volumes('daily-backup', inventory=inventory)
+    cluster.attach_volumes('daily-backup', inventory=inventory)
+    ```
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import logging
+from collections import defaultdict
+from typing import Any
+
+from .filterset import FilterSet
+from .paging import DEFAULT_PAGE_SIZE, iter_items
+from .tagset import TagSet
+
+ResourceDict = dict[str, Any]
+
+# Every state except "terminated".
+LIVE_INSTANCE_STATES = ["pending", "running", "shutting-down", "stopped", "stopping"]
+
+# EC2 accepts at most 200 values per describe filter.
+MAX_FILTER_VALUES = 200
+
+
+def _label_matches(tags: TagSet, label: str | None) -> bool:
+    """Match a resource's Label tag the way an EC2 ``tag:Label`` filter would."""
+    if label is None:
+        return True
+    value = tags.get("Label")
+    return value is not None and fnmatch.fnmatchcase(value, label)
+
+
+class ClusterInventory:
+    """Cached, indexed describe results for one ClusterSet.
+
+    The inventory is split into four sections that are fetched independently:
+
+    - ``instances``: non-terminated instances carrying the cluster tag
+    - ``attached_volumes``: volumes attached to those instances
+    - ``volumes``: managed volumes (PROVISIONER or snapshot manager)
+    - ``snapshots``: completed snapshots created by the snapshot manager
+
+    Mutating ClusterSet methods call :meth:`invalidate` for the sections they
+    change, so the next access re-fetches only what is stale.
+
+    Attributes:
+        SECTIONS: Names accepted by :meth:`invalidate`
+    """
+
+    SECTIONS = ("instances", "attached_volumes", "volumes", "snapshots")
+
+    def __init__(
+        self,
+        ec2_client: Any,
+        cluster_filter: list[dict[str, Any]],
+        automation_key: str,
+        page_size: int | None = DEFAULT_PAGE_SIZE,
+    ) -> None:
+        """Initialize an empty inventory.
+
+        Args:
+            ec2_client: boto3 EC2 client used for the describe calls
+            cluster_filter: Filter list selecting the cluster's resources
+            automation_key: Value of the automation_key tag on managed resources
+            page_size: Items requested per describe call
+        """
+        self._ec2_client = ec2_client
+        self._page_size = page_size
+        self._cluster_filter = cluster_filter
+        self._automation_key = automation_key
+        self._logger = logging.getLogger("tagmania")
+
+        self._instances: list[ResourceDict] | None = None
+        self._instances_by_id: dict[str, ResourceDict] = {}
+        self._instances_by_name: dict[str, ResourceDict] = {}
+        self._attached: dict[str, dict[str, ResourceDict]] | None = None
+        self._volumes: list[ResourceDict] | None = None
+        self._snapshots: list[ResourceDict] | None = None
+        # id(resource) -> (resource, TagSet). Holding the resource keeps its
+        # id() from being reused while the entry exists.
+        self._tag_cache: dict[int, tuple[ResourceDict, TagSet]] = {}
+
+    def invalidate(self, *sections: str) -> None:
+        """Drop cached sections so they are re-fetched on next access.
+
+        Args:
+            sections: Section names from SECTIONS. If none are given, the whole
+                inventory is invalidated.
+
+        Raises:
+            ValueError: If an unknown section name is given
+        """
+        for section in sections or self.SECTIONS:
+            if section not in self.SECTIONS:
+                raise ValueError(f"Unknown inventory section '{section}'.")
+            self._tag_cache.clear()
+            if section == "instances":
+                self._instances = None
+                # Attachments are keyed on the instance set
+                self._attached = None
+            elif section == "attached_volumes":
+                self._attached = None
+            elif section == "volumes":
+                self._volumes = None
+            else:
+                self._snapshots = None
+
+    def _describe(self, operation: str, result_path: str, filters: list[Any]) -> list[ResourceDict]:
+        """Run a paginated describe call and collect every item."""
+        return list(
+            iter_items(
+                self._ec2_client,
+                operation,
+                result_path,
+                page_size=self._page_size,
+                Filters=filters,
+            )
+        )
+
+    def tags_of(self, resource: ResourceDict) -> TagSet:
+        """Return the TagSet for an inventory item, building it only once.
+
+        Nested loops (e.g. matching volumes to instances) look up the same
+        resource's tags many times; this avoids re-wrapping the tag list on
+        every lookup.
+        """
+        entry = self._tag_cache.get(id(resource))
+        if entry is None or entry[0] is not resource:
+            entry = (resource, TagSet.from_resource(resource))
+            self._tag_cache[id(resource)] = entry
+        return entry[1]
+
+    # Instances
+
+    @property
+    def instances(self) -> list[ResourceDict]:
+        """All non-terminated instances in the cluster."""
+        if self._instances is None:
+            self._instances = self._load_instances()
+        return self._instances
+
+    def _load_instances(self) -> list[ResourceDict]:
+        fs = FilterSet([f.copy() for f in self._cluster_filter])
+        fs.add("instance-state-name", LIVE_INSTANCE_STATES)
+        instances = self._describe("describe_instances", "Reservations.Instances", fs.to_list())
+        self._instances_by_id = {i["InstanceId"]: i for i in instances}
+        self._instances_by_name = {}
+        for i in instances:
+            name = self.tags_of(i).get("Name")
+            if name is None:
+                continue
+            if name in self._instances_by_name:
+                self._logger.warning(f"Duplicate instance Name tag '{name}' ({i['InstanceId']}).")
+                continue
+            self._instances_by_name[name] = i
+        self._logger.debug(f"inventory: loaded {len(instances)} instances")
+        return instances
+
+    def instances_in_state(self, *states: str) -> list[ResourceDict]:
+        """Return instances whose current state is one of ``states``."""
+        return [i for i in self.instances if i["State"]["Name"] in states]
+
+    def mark_state(self, instance_ids: list[str], state: str) -> None:
+        """Record a state change that a waiter has already confirmed.
+
+        Avoids a re-fetch after start/stop, where only the state changes.
+        """
+        if self._instances is None:
+            return
+        for instance_id in instance_ids:
+            instance = self._instances_by_id.get(instance_id)
+            if instance is not None:
+                instance["State"] = {**instance.get("State", {}), "Name": state}
+
+    def instance(self, instance_id: str) -> ResourceDict | None:
+        """Look up an instance by ID."""
+        if self._instances is None:
+            self._instances = self._load_instances()
+        return self._instances_by_id.get(instance_id)
+
+    def instance_by_name(self, name: str) -> ResourceDict | None:
+        """Look up an instance by its Name tag."""
+        if self._instances is None:
+            self._instances = self._load_instances()
+        return self._instances_by_name.get(name)
+
+    # Volumes
+
+    def attached_volumes(self, instance_id: str) -> list[ResourceDict]:
+        """Return the volumes currently attached to an instance."""
+        return list(self.attached_devices(instance_id).values())
+
+    def attached_devices(self, instance_id: str) -> dict[str, ResourceDict]:
+        """Return the volumes attached to an instance, keyed by device name.
+
+        Attachments for every instance in the cluster are resolved together on
+        first access, see :func:`resolve_attachments`.
+        """
+        if self._attached is None:
+            instance_ids = [i["InstanceId"] for i in self.instances]
+            self._attached = resolve_attachments(
+                self._ec2_client, instance_ids, page_size=self._page_size
+            )
+        return self._attached.get(instance_id, {})
+
+    @property
+    def volumes(self) -> list[ResourceDict]:
+        """Managed volumes (created by the provisioner or the snapshot manager)."""
+        if self._volumes is None:
+            fs = FilterSet([f.copy() for f in self._cluster_filter])
+            fs.add("tag:automation_key", ["PROVISIONER", self._automation_key])
+            self._volumes = self._describe("describe_volumes", "Volumes", fs.to_list())
+        return self._volumes
+
+    def restored_volumes(self, label: str | None = None) -> list[ResourceDict]:
+        """Volumes created by the snapshot manager, optionally with a given label."""
+        return [
+            v
+            for v in self.volumes
+            if self.tags_of(v).get("automation_key") == self._automation_key
+            and _label_matches(self.tags_of(v), label)
+        ]
+
+    # Snapshots
+
+    def snapshots(self, label: str | None = None) -> list[ResourceDict]:
+        """Completed managed snapshots, optionally with a given label.
+
+        Args:
+            label: Label to match. Supports the same ``*``/``?`` wildcards as
+                an EC2 tag filter.
+        """
+        if self._snapshots is None:
+            fs = FilterSet([f.copy() for f in self._cluster_filter])
+            fs.add("status", "completed")
+            fs.add("tag:automation_key", self._automation_key)
+            self._snapshots = self._describe("describe_snapshots", "Snapshots", fs.to_list())
+        return [s for s in self._snapshots if _label_matches(self.tags_of(s), label)]
+
+
+def resolve_attachments(
+    ec2_client: Any,
+    instance_ids: list[str],
+    page_size: int | None = DEFAULT_PAGE_SIZE,
+) -> dict[str, dict[str, ResourceDict]]:
+    """Fetch the volumes attached to many instances in bulk.
+
+    Issues paginated ``describe_volumes`` calls filtered on
+    ``attachment.instance-id``, at most MAX_FILTER_VALUES instance IDs per
+    filter, and groups the results client-side. This replaces one
+    DescribeVolumes round trip per instance.
+
+    Args:
+        ec2_client: boto3 EC2 client used for the describe calls
+        instance_ids: Instances to resolve
+        page_size: Items requested per describe call (optional)
+
+    Returns:
+        dict: instance ID -> {device name -> volume describe dict}. Instances
+        without attached volumes are absent.
+
+    Example:
+        ```python
+        attached = resolve_attachments(ec2_client, ['i-0abc', 'i-0def'])
+        for device, volume in attached.get('i-0abc', {}).items():
+            print(device, volume['VolumeId'])
+        ```
+    """
+    wanted = set(instance_ids)
+    attached: dict[str, dict[str, ResourceDict]] = defaultdict(dict)
+    for start in range(0, len(instance_ids), MAX_FILTER_VALUES):
+        chunk = instance_ids[start : start + MAX_FILTER_VALUES]
+        for volume in iter_items(
+            ec2_client,
+            "describe_volumes",
+            "Volumes",
+            page_size=page_size,
+            Filters=[{"Name": "attachment.instance-id", "Values": chunk}],
+        ):
+            for attachment in volume.get("Attachments", []):
+                if attachment["InstanceId"] in wanted:
+                    attached[attachment["InstanceId"]][attachment["Device"]] = volume
+    return dict(attached)
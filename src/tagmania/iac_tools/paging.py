@@ -0,0 +1,85 @@
+"""Streaming helpers for paginated EC2 describe calls.
+
+This module wraps the boto3 client paginators so that describe results can be
+consumed one item at a time while pages are fetched on demand. Memory use stays
+bounded by the page size no matter how many resources a cluster has.
+
+There is no implicit limit on the number of items returned. Callers that want
+a cap must ask for one with ``max_items``; when the cap cuts a result set short
+a warning is logged instead of silently dropping resources.
+
+Example:
+    Streaming every volume attached to a set of instances:
+
+    ```python
+    for volume in iter_items(
+        ec2_client,
+        "describe_volumes",
+        "Volumes",
+        page_size=200,
+        Filters=[{"Name": "attachment.instance-id", "Values": instance_ids}],
+    ):
+        print(volume["VolumeId"])
+    ```
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterator
+from typing import Any
+
+# Items requested per describe call (MaxResults). EC2 accepts 5-1000 for
+# instances and snapshots and 5-500 for volumes.
+DEFAULT_PAGE_SIZE = 200
+
+
+def _extract(page: dict[str, Any], path: list[str]) -> Iterator[dict[str, Any]]:
+    """Yield the items found under a dotted key path such as Reservations.Instances."""
+    key, *rest = path
+    for item in page.get(key, []):
+        if rest:
+            yield from _extract(item, rest)
+        else:
+            yield item
+
+
+def iter_items(
+    client: Any,
+    operation: str,
+    result_path: str,
+    *,
+    page_size: int | None = DEFAULT_PAGE_SIZE,
+    max_items: int | None = None,
+    **kwargs: Any,
+) -> Iterator[dict[str, Any]]:
+    """Stream the items of a paginated describe call.
+
+    Args:
+        client: boto3 client that provides the paginator
+        operation: Paginated operation name (e.g. 'describe_volumes')
+        result_path: Dotted path to the items in each page. Nested lists are
+                    flattened, e.g. 'Reservations.Instances'.
+        page_size: Items requested per API call (optional). None uses the
+                  service default.
+        max_items: Stop after this many items (optional). None streams
+                  everything. Hitting the cap is logged as a warning.
+        **kwargs: Parameters passed to the describe call (e.g. Filters)
+
+    Yields:
+        dict: One describe result item at a time
+    """
+    paginator = client.get_paginator(operation)
+    if page_size is not None:
+        kwargs["PaginationConfig"] = {"PageSize": page_size}
+    path = result_path.split(".")
+    count = 0
+    for page in paginator.paginate(**kwargs):
+        for item in _extract(page, path):
+            if max_items is not None and count >= max_items:
+                logging.getLogger("tagmania").warning(
+                    f"{operation}: stopped after max_items={max_items}; more results exist."
+                )
+                return
+            count += 1
+            yield item
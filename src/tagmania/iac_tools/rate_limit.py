@@ -0,0 +1,294 @@
+"""RateLimiter - Keep API calls under the account's request rate limits.
+
+EC2 throttles API calls per account and region with token buckets, one per
+family of actions. Every caller in the account draws from the same buckets,
+so a restore that runs many calls in parallel can get other teams throttled
+as well as itself. This module keeps a matching set of buckets on the client
+side, shared by every boto3 client of the process that is attached to it:
+
+- Each call takes a token from the bucket of its action family before it is
+  sent, and waits for one if the bucket is empty. Retries take a token too.
+- A throttling error halves the refill rate of that family, and each call
+  that goes through raises it again a little, up to its configured rate.
+- Calls, throttles and time spent waiting are counted per family.
+
+Clients are created with botocore's ``adaptive`` retry mode (see
+``retry_config``), which retries throttled calls with backoff on top of this.
+
+Example:
+    Limiting the calls of a client and reporting throttles:
+
+    ```python
+    client = boto3.client('ec2', config=retry_config())
+    get_rate_limiter().attach(client)
+    ...
+    print(get_rate_limiter().summary())
+    ```
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from botocore.config import Config
+
+# Error codes of a throttled call
+THROTTLE_ERRORS = {"RequestLimitExceeded", "Throttling", "ThrottlingException"}
+
+# Action family -> (refill rate in calls per second, bucket size). Set at the
+# EC2 request rate limits, minus headroom for whoever else uses the account.
+DEFAULT_RATES = {
+    "describe": (16.0, 80),
+    "mutate": (4.0, 150),
+    "tags": (4.0, 150),
+    "instances": (2.0, 50),
+}
+
+# Attempts per call in adaptive retry mode, including the first one
+RETRY_MAX_ATTEMPTS = 10
+
+# Instance lifecycle actions have their own, lower limits
+_INSTANCE_ACTIONS = {"RunInstances", "StartInstances", "StopInstances", "TerminateInstances"}
+
+
+def action_family(operation: str) -> str:
+    """Rate limit family of an API operation name (e.g. 'DescribeVolumes').
+
+    Returns:
+        str: 'describe', 'tags', 'instances' or 'mutate'
+    """
+    if operation.startswith(("Describe", "Get", "List")):
+        return "describe"
+    if operation in ("CreateTags", "DeleteTags", "TagResource", "UntagResource"):
+        return "tags"
+    if operation in _INSTANCE_ACTIONS:
+        return "instances"
+    return "mutate"
+
+
+def retry_config() -> Config:
+    """botocore Config for clients that go through the rate limiter."""
+    from botocore.config import Config
+
+    return Config(retries={"mode": "adaptive", "max_attempts": RETRY_MAX_ATTEMPTS})
+
+
+class TokenBucket:
+    """Token bucket whose refill rate adapts to throttling.
+
+    Attributes:
+        max_rate: Configured refill rate in tokens per second
+        rate: Current refill rate, between min_rate and max_rate
+        capacity: Tokens the bucket holds at most
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: int,
+        min_rate: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Initialize a full bucket.
+
+        Args:
+            rate: Refill rate in tokens per second
+            capacity: Bucket size, i.e. the largest burst
+            min_rate: Lowest rate throttling can bring the refill rate down to
+            clock: Monotonic clock (optional, for tests)
+            sleep: Sleep function (optional, for tests)
+
+        Raises:
+            ValueError: If the rate or capacity is not positive
+        """
+        if rate <= 0 or capacity < 1:
+            raise ValueError(f"Expected a positive rate and capacity, got {rate} and {capacity}.")
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(capacity)
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Take a token, waiting until one is available.
+
+        The token is reserved right away, so concurrent callers wait in turn
+        rather than all waking up for the same token.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    def throttled(self) -> None:
+        """Halve the refill rate and drop the tokens left for a burst."""
+        with self._lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = min(self._tokens, 0.0)
+
+    def succeeded(self) -> None:
+        """Raise the refill rate a step back towards max_rate."""
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill()
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 50)
+
+
+class _FamilyStats:
+    """Counters of one action family."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.throttled = 0
+        self.waited = 0.0
+
+
+class RateLimiter:
+    """Token buckets per service and action family, shared by attached clients."""
+
+    def __init__(
+        self,
+        rates: dict[str, tuple[float, int]] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Initialize a limiter with no buckets yet.
+
+        Args:
+            rates: Action family -> (calls per second, bucket size) (optional).
+                  Defaults to DEFAULT_RATES.
+            clock: Monotonic clock (optional, for tests)
+            sleep: Sleep function (optional, for tests)
+        """
+        self.rates = dict(rates if rates is not None else DEFAULT_RATES)
+        self._clock = clock
+        self._sleep = sleep
+        self._logger = logging.getLogger("tagmania")
+        self._lock = threading.Lock()
+        self._buckets: dict[str, TokenBucket] = {}
+        self._stats: dict[str, _FamilyStats] = {}
+
+    def _bucket(self, key: str) -> tuple[TokenBucket, _FamilyStats]:
+        with self._lock:
+            if key not in self._buckets:
+                rate, capacity = self.rates.get(key.split("/")[-1], self.rates["mutate"])
+                self._buckets[key] = TokenBucket(
+                    rate, capacity, clock=self._clock, sleep=self._sleep
+                )
+                self._stats[key] = _FamilyStats()
+            return self._buckets[key], self._stats[key]
+
+    @staticmethod
+    def _key(service: str, operation: str) -> str:
+        return f"{service}/{action_family(operation)}"
+
+    def before_call(self, service: str, operation: str) -> None:
+        """Wait for a token of the operation's family. Called before each attempt."""
+        bucket, stats = self._bucket(self._key(service, operation))
+        waited = bucket.acquire()
+        with self._lock:
+            stats.calls += 1
+            stats.waited += waited
+
+    def after_call(self, service: str, operation: str, error_code: str | None) -> None:
+        """Adapt the family's rate to the outcome of an attempt."""
+        key = self._key(service, operation)
+        bucket, stats = self._bucket(key)
+        if error_code in THROTTLE_ERRORS:
+            bucket.throttled()
+            with self._lock:
+                stats.throttled += 1
+            self._logger.debug(f"{operation} throttled, {key} limited to {bucket.rate:.1f}/s.")
+        elif error_code is None:
+            bucket.succeeded()
+
+    def attach(self, client: Any) -> None:
+        """Route every call of a boto3 client through the limiter.
+
+        Attaching the same client again has no effect.
+        """
+        events = client.meta.events
+        events.register("before-send", self._on_send, unique_id="tagmania-rate-limit-send")
+        events.register("needs-retry", self._on_response, unique_id="tagmania-rate-limit-retry")
+
+    def _on_send(self, event_name: str, **kwargs: Any) -> None:
+        # before-send.<service>.<Operation>
+        _event, service, operation = event_name.split(".", 2)
+        self.before_call(service, operation)
+
+    def _on_response(self, event_name: str, **kwargs: Any) -> None:
+        # needs-retry.<service>.<Operation>. Returning None leaves the retry
+        # decision to the retry handler.
+        _event, service, operation = event_name.split(".", 2)
+        response = kwargs.get("response")
+        if response is None:
+            # Connection errors say nothing about the rate
+            return
+        code = response[1].get("Error", {}).get("Code") if response[1] else None
+        self.after_call(service, operation, code)
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """'service/family' -> calls, throttled, waited (seconds) and current rate."""
+        with self._lock:
+            return {
+                key: {
+                    "calls": stats.calls,
+                    "throttled": stats.throttled,
+                    "waited": round(stats.waited, 3),
+                    "rate": self._buckets[key].rate,
+                }
+                for key, stats in sorted(self._stats.items())
+            }
+
+    @property
+    def throttled(self) -> int:
+        """Throttled calls across all families."""
+        with self._lock:
+            return sum(stats.throttled for stats in self._stats.values())
+
+    def summary(self) -> str:
+        """One-line description of the calls made so far."""
+        parts = []
+        for key, stats in self.stats().items():
+            part = f"{key} {stats['calls']:.0f} calls"
+            if stats["throttled"]:
+                part += f" ({stats['throttled']:.0f} throttled, now {stats['rate']:.1f}/s)"
+            if stats["waited"]:
+                part += f", waited {stats['waited']:.1f}s"
+            parts.append(part)
+        return "API calls: " + ("; ".join(parts) if parts else "none") + "."
+
+
+_limiter: RateLimiter | None = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """The process-wide RateLimiter, created on first use."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
@@ -0,0 +1,166 @@
+"""Records - Lightweight views of EC2 describe results.
+
+boto3 resource objects carry the service's resource model with them, and
+building thousands of them while listing a cluster costs far more memory and
+CPU than the describe calls themselves. ClusterSet therefore turns describe
+items into records instead: small ``__slots__`` objects that hold the item
+and read attributes straight from it.
+
+A record answers the attributes of the matching boto3 resource the same way:
+
+- ``id``, ``tags``, ``meta.data`` and the snake_case form of any describe key
+  (``state``, ``placement``, ``volume_id``, ``block_device_mappings``, ...)
+  are read from the describe item without any API call.
+- Anything else (actions such as ``create_tags()`` or ``reload()``) builds the
+  boto3 resource on first use, pre-loaded with the same data, and is passed
+  on to it.
+
+Example:
+    Listing instances without building resource objects:
+
+    ```python
+    for instance in cluster.iter_instances():
+        print(instance.id, instance.state['Name'], instance.placement)
+    ```
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Any
+
+ResourceDict = dict[str, Any]
+
+# Builds the boto3 resource of a record, given the resource name and ID
+ResourceFactory = Callable[[str, str], Any]
+
+
+@lru_cache(maxsize=512)
+def _describe_key(attribute: str) -> str:
+    """Describe key of a boto3 attribute name, e.g. 'volume_id' -> 'VolumeId'."""
+    return "".join(part[:1].upper() + part[1:] for part in attribute.split("_"))
+
+
+class _RecordMeta:
+    """``meta`` of a record: ``data`` is the describe item, the rest is the resource's."""
+
+    __slots__ = ("data", "_record")
+
+    def __init__(self, record: Record) -> None:
+        self.data = record.data
+        self._record = record
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._record.resource().meta, name)
+
+
+class Record:
+    """One describe item, read like the boto3 resource of the same type.
+
+    Attributes:
+        id: Resource ID
+        data: Describe item the record was built from
+    """
+
+    __slots__ = ("id", "data", "_factory", "_resource")
+
+    # boto3 resource name, and the describe key holding the ID
+    RESOURCE = ""
+    ID_KEY = ""
+
+    def __init__(self, data: ResourceDict, factory: ResourceFactory | None = None) -> None:
+        """Wrap a describe item.
+
+        Args:
+            data: Item from a describe_* response
+            factory: Builds the boto3 resource for attributes the describe
+                    item cannot answer (optional)
+        """
+        self.id: str = data[self.ID_KEY]
+        self.data = data
+        self._factory = factory
+        self._resource: Any = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(id={self.id!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Record):
+            return NotImplemented
+        return type(self) is type(other) and self.id == other.id
+
+    def __hash__(self) -> int:
+        return hash((type(self).__name__, self.id))
+
+    @property
+    def tags(self) -> list[dict[str, str]] | None:
+        """Tags of the resource, None if it has none (like boto3)."""
+        return self.data.get("Tags")
+
+    @property
+    def meta(self) -> _RecordMeta:
+        return _RecordMeta(self)
+
+    def resource(self) -> Any:
+        """The boto3 resource for this record, built on first use.
+
+        Raises:
+            AttributeError: If the record was built without a factory
+        """
+        if self._resource is None:
+            if self._factory is None:
+                raise AttributeError(f"{self!r} has no boto3 resource to fall back on.")
+            self._resource = self._factory(self.RESOURCE, self.id)
+            self._resource.meta.data = self.data
+        return self._resource
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for names that are not slots or properties, or for a
+        # slot that is not set yet (e.g. while copying)
+        if name.startswith("_") or name in ("id", "data"):
+            raise AttributeError(name)
+        key = _describe_key(name)
+        if key in self.data:
+            return self.data[key]
+        return getattr(self.resource(), name)
+
+
+class InstanceRecord(Record):
+    """An item of describe_instances."""
+
+    __slots__ = ()
+    RESOURCE = "Instance"
+    ID_KEY = "InstanceId"
+
+    @property
+    def state(self) -> dict[str, Any] | None:
+        return self.data.get("State")
+
+
+class VolumeRecord(Record):
+    """An item of describe_volumes."""
+
+    __slots__ = ()
+    RESOURCE = "Volume"
+    ID_KEY = "VolumeId"
+
+    @property
+    def state(self) -> str | None:
+        return self.data.get("State")
+
+    @property
+    def attachments(self) -> list[dict[str, Any]] | None:
+        return self.data.get("Attachments")
+
+
+class SnapshotRecord(Record):
+    """An item of describe_snapshots."""
+
+    __slots__ = ()
+    RESOURCE = "Snapshot"
+    ID_KEY = "SnapshotId"
+
+    @property
+    def state(self) -> str | None:
+        return self.data.get("State")
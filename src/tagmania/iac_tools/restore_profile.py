@@ -0,0 +1,182 @@
+"""RestoreProfile - How restored volumes are created, and what they settle to.
+
+Restored volumes are created with a provisioned initialization rate so they
+hydrate at a predictable speed. A restore profile picks that rate by volume
+size and can create the volumes with a faster type, IOPS or throughput while
+they hydrate. If it names a baseline, the volumes are tagged with it and
+``ClusterSet.settle_volumes`` modifies them back once their initialization has
+completed.
+
+Profiles are written as space-separated ``key=value`` pairs, so they can be
+passed on the command line or stored in a ``RestoreProfile`` tag on the
+cluster's instances:
+
+- ``rate``: initialization rate in MiB/s, either one value (``rate=300``),
+  tiers of ``min_GiB:rate`` separated by ``/`` (``rate=0:300/1024:200``), or
+  ``none`` to hydrate lazily
+- ``type``, ``iops``, ``throughput``: VolumeType, Iops and Throughput of the
+  new volumes
+- ``baseline-type``, ``baseline-iops``, ``baseline-throughput``: what the
+  volumes are modified to once initialized
+
+Example:
+    gp3 with high throughput while hydrating, 125 MiB/s afterwards:
+
+    ```python
+    profile = RestoreProfile.parse(
+        'rate=0:300/1024:200 type=gp3 throughput=1000 baseline-throughput=125'
+    )
+    cluster.restore_pipelined('nightly', profile=profile)
+    ...
+    cluster.settle_volumes()
+    ```
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+# Tag holding a cluster's profile, on any of its instances
+PROFILE_TAG = "RestoreProfile"
+# Tag holding the settings a restored volume is modified to once initialized
+BASELINE_TAG = "RestoreBaseline"
+
+# EBS accepts initialization rates from 100 to 300 MiB/s
+MIN_INITIALIZATION_RATE = 100
+MAX_INITIALIZATION_RATE = 300
+
+# Profile key -> create_volume / modify_volume argument
+_VOLUME_KEYS = {"type": "VolumeType", "iops": "Iops", "throughput": "Throughput"}
+
+
+class RestoreProfile:
+    """Initialization rate tiers and volume settings for restored volumes.
+
+    Attributes:
+        rates: (minimum size in GiB, rate in MiB/s) tiers, sorted by size. A
+              volume gets the rate of the largest tier it reaches. Empty means
+              no initialization rate.
+        volume: create_volume overrides (VolumeType, Iops, Throughput)
+        baseline: modify_volume arguments applied once initialized
+    """
+
+    def __init__(
+        self,
+        rates: list[tuple[int, int]] | None = None,
+        volume: dict[str, Any] | None = None,
+        baseline: dict[str, Any] | None = None,
+    ) -> None:
+        """Initialize a profile.
+
+        Args:
+            rates: (min GiB, MiB/s) tiers (optional). Defaults to 300 MiB/s
+                  for every size.
+            volume: VolumeType/Iops/Throughput for the new volumes (optional)
+            baseline: VolumeType/Iops/Throughput to settle to (optional)
+
+        Raises:
+            ValueError: If a rate is outside what EBS accepts
+        """
+        self.rates = sorted(rates if rates is not None else [(0, MAX_INITIALIZATION_RATE)])
+        for _size, rate in self.rates:
+            if not MIN_INITIALIZATION_RATE <= rate <= MAX_INITIALIZATION_RATE:
+                raise ValueError(
+                    f"Initialization rate {rate} is not between "
+                    f"{MIN_INITIALIZATION_RATE} and {MAX_INITIALIZATION_RATE} MiB/s."
+                )
+        self.volume = dict(volume or {})
+        self.baseline = dict(baseline or {})
+
+    def __repr__(self) -> str:
+        return f"RestoreProfile.parse({self.to_spec()!r})"
+
+    @classmethod
+    def parse(cls, spec: str) -> RestoreProfile:
+        """Build a profile from its ``key=value`` form.
+
+        Raises:
+            ValueError: If a key or value is not understood
+        """
+        rates: list[tuple[int, int]] | None = None
+        volume: dict[str, Any] = {}
+        baseline: dict[str, Any] = {}
+        for pair in spec.split():
+            key, sep, value = pair.partition("=")
+            if not sep or not value:
+                raise ValueError(f"Expected key=value in restore profile, got '{pair}'.")
+            if key == "rate":
+                rates = [] if value == "none" else _parse_rates(value)
+                continue
+            target = volume
+            if key.startswith("baseline-"):
+                key = key.removeprefix("baseline-")
+                target = baseline
+            if key not in _VOLUME_KEYS:
+                raise ValueError(f"Unknown restore profile key '{pair.partition('=')[0]}'.")
+            target[_VOLUME_KEYS[key]] = value if key == "type" else _parse_int(value, pair)
+        return cls(rates, volume, baseline)
+
+    def to_spec(self) -> str:
+        """The ``key=value`` form of the profile."""
+        names = {arg: key for key, arg in _VOLUME_KEYS.items()}
+        rate = "/".join(f"{size}:{rate}" for size, rate in self.rates) or "none"
+        pairs = [f"rate={rate}"]
+        pairs += [f"{names[arg]}={value}" for arg, value in self.volume.items()]
+        pairs += [f"baseline-{names[arg]}={value}" for arg, value in self.baseline.items()]
+        return " ".join(pairs)
+
+    def initialization_rate(self, size: int | None) -> int | None:
+        """Initialization rate for a volume of ``size`` GiB, or None for none.
+
+        A volume of unknown size gets the rate of the smallest tier.
+        """
+        rate = None
+        for min_size, tier_rate in self.rates:
+            if rate is None or (size is not None and size >= min_size):
+                rate = tier_rate
+        return rate
+
+    def volume_options(self, size: int | None) -> dict[str, Any]:
+        """create_volume arguments for a volume of ``size`` GiB."""
+        options = dict(self.volume)
+        rate = self.initialization_rate(size)
+        if rate is not None:
+            options["VolumeInitializationRate"] = rate
+        return options
+
+    def baseline_tag(self) -> str | None:
+        """Value of the BASELINE_TAG of restored volumes, or None without a baseline."""
+        if not self.baseline:
+            return None
+        names = {arg: key for key, arg in _VOLUME_KEYS.items()}
+        return " ".join(f"baseline-{names[arg]}={value}" for arg, value in self.baseline.items())
+
+
+def _parse_int(value: str, pair: str) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Expected a number in restore profile, got '{pair}'.") from None
+
+
+def _parse_rates(value: str) -> list[tuple[int, int]]:
+    if ":" not in value:
+        return [(0, _parse_int(value, f"rate={value}"))]
+    rates = []
+    for tier in value.split("/"):
+        size, _sep, rate = tier.partition(":")
+        rates.append((_parse_int(size, f"rate={value}"), _parse_int(rate, f"rate={value}")))
+    return rates
+
+
+def parse_baseline(value: str) -> dict[str, Any]:
+    """modify_volume arguments from a BASELINE_TAG value.
+
+    Raises:
+        ValueError: If the tag value is not understood
+    """
+    return RestoreProfile.parse(value).baseline
+
+
+# Matches the volumes restore created before profiles existed
+DEFAULT_PROFILE = RestoreProfile()
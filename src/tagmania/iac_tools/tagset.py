@@ -25,6 +25,9 @@ Example:
     ```
 """
 
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping
 from typing import Any
 
 TagDict = dict[str, str]
@@ -38,8 +41,14 @@ class TagSet:
     abstracts the details of the AWS tag format and provides simple methods
     for common tag operations.
 
+    Lookups go through a key->value index that is built on the first ``get``
+    and kept in step by ``add``, so repeated lookups are O(1). The wrapped list
+    is still the source of truth for ``to_list()``; modify tags through the
+    TagSet rather than the list once lookups have started.
+
     Attributes:
         _tags: Internal list of tag dictionaries in AWS format
+        _index: Lazily built key->value map (first occurrence of a key wins)
 
     Example:
         ```python
@@ -58,6 +67,8 @@ class TagSet:
         ```
     """
 
+    __slots__ = ("_tags", "_index")
+
     def __init__(self, tags: list[Any] | None = None) -> None:
         """Initialize TagSet with optional existing tags.
 
@@ -69,6 +80,55 @@ class TagSet:
             self._tags: list[TagDict] = []
         else:
             self._tags = tags
+        self._index: TagDict | None = None
+
+    @classmethod
+    def from_dict(cls, tags: Mapping[str, str]) -> TagSet:
+        """Create a TagSet from a plain ``{key: value}`` mapping.
+
+        Example:
+            ```python
+            tags = TagSet.from_dict({'Environment': 'production'})
+            ```
+        """
+        return cls([{"Key": k, "Value": v} for k, v in tags.items()])
+
+    @classmethod
+    def from_resource(cls, resource: Mapping[str, Any]) -> TagSet:
+        """Create a TagSet from a describe response item (instance, volume, ...).
+
+        Items without tags have no ``Tags`` key at all; they get an empty set.
+        """
+        return cls(resource.get("Tags") or [])
+
+    @classmethod
+    def bulk(cls, resources: Iterable[Mapping[str, Any]], id_key: str) -> dict[str, TagSet]:
+        """Build TagSets for many describe response items at once.
+
+        Args:
+            resources: Describe response items (e.g. response['Volumes'])
+            id_key: Key holding each item's ID (e.g. 'VolumeId')
+
+        Returns:
+            dict: Resource ID -> TagSet
+
+        Example:
+            ```python
+            response = ec2_client.describe_volumes(Filters=filters)
+            tags_by_id = TagSet.bulk(response['Volumes'], 'VolumeId')
+            ```
+        """
+        return {r[id_key]: cls.from_resource(r) for r in resources}
+
+    def _lookup(self) -> TagDict:
+        """Return the key->value index, building it on first use."""
+        if self._index is None:
+            index: TagDict = {}
+            for tag in self._tags:
+                # Keep the first occurrence, matching the original linear scan
+                index.setdefault(tag["Key"], tag["Value"])
+            self._index = index
+        return self._index
 
     def add(self, key: str, value: str) -> None:
         """Add a new tag to the tag set.
@@ -85,6 +145,8 @@ class TagSet:
         """
         tag: TagDict = {"Key": key, "Value": value}
         self._tags.append(tag)
+        if self._index is not None:
+            self._index.setdefault(key, value)
 
     def get(self, key: str) -> str | None:
         """Retrieve the value for a specific tag key.
@@ -102,10 +164,74 @@ class TagSet:
                 print(f"Instance belongs to cluster: {cluster_name}")
             ```
         """
-        for tag in self._tags:
-            if tag["Key"] == key:
-                return tag["Value"]
-        return None
+        return self._lookup().get(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._lookup()
+
+    def __len__(self) -> int:
+        return len(self._lookup())
+
+    def __bool__(self) -> bool:
+        # A TagSet is truthy even when empty, as it was before __len__ existed
+        return True
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._lookup())
+
+    def to_dict(self) -> TagDict:
+        """Convert tag set to a plain ``{key: value}`` dictionary."""
+        return dict(self._lookup())
+
+    def diff(self, desired: TagSet) -> TagSet:
+        """Return the tags from ``desired`` that this set is missing or has a different value for.
+
+        An empty result means writing ``desired`` would change nothing.
+
+        Example:
+            ```python
+            current = TagSet.from_resource(volume)
+            changes = current.diff(TagSet.from_dict({'Env': 'prod'}))
+            if len(changes):
+                ec2_client.create_tags(Resources=[volume_id], Tags=changes.to_list())
+            ```
+        """
+        current = self._lookup()
+        return TagSet(
+            [{"Key": k, "Value": v} for k, v in desired._lookup().items() if current.get(k) != v]
+        )
+
+    def removable(self, tags: Iterable[Mapping[str, str]]) -> list[TagDict]:
+        """Return the delete_tags entries of ``tags`` that would remove a tag from this set.
+
+        This is the counterpart of ``diff`` for delete_tags: an entry counts
+        if this set carries its key and, when the entry has a value, carries
+        the key with that value. Key-only entries are kept as they are.
+
+        Example:
+            ```python
+            current = TagSet.from_resource(volume)
+            changes = current.removable([{'Key': 'Env'}])
+            if changes:
+                ec2_client.delete_tags(Resources=[volume_id], Tags=changes)
+            ```
+        """
+        current = self._lookup()
+        return [
+            dict(t)
+            for t in tags
+            if t["Key"] in current and t.get("Value") in (None, current[t["Key"]])
+        ]
+
+    def merge(self, other: TagSet) -> TagSet:
+        """Return a new TagSet with ``other`` applied on top of this one.
+
+        Values from ``other`` overwrite existing keys, matching how EC2
+        create_tags behaves. Neither input is modified.
+        """
+        merged = self.to_dict()
+        merged.update(other._lookup())
+        return TagSet.from_dict(merged)
 
     def to_list(self) -> list[Any]:
         """Convert tag set to AWS-compatible list format.
@@ -22,25 +22,25 @@ Example:
 """
 
 import os
-from functools import lru_cache
 from typing import Any
 
-import boto3
+from .clients import get_client_factory
 
 
-@lru_cache  # cache the client the first time we ask for it
 def _lambda_client() -> Any:
-    """Get cached AWS Lambda client with fallback region handling.
+    """Get the shared AWS Lambda client with fallback region handling.
 
     Returns:
         boto3.client: Configured Lambda client with region fallback
 
     Note:
-        Uses LRU cache to avoid creating multiple clients. Falls back to
-        us-east-1 if AWS_REGION environment variable is not set.
+        The client comes from the process-wide client factory, so it is
+        created once and shares its session with ClusterSet. Falls back to
+        us-east-1 if AWS_REGION environment variable is not set. Calls go
+        through the process-wide rate limiter, like those of ClusterSet.
     """
     # Fall back to env-var or default region so boto3 never errors
-    return boto3.client("lambda", region_name=os.getenv("AWS_REGION", "us-east-1"))
+    return get_client_factory().client("lambda", region=os.getenv("AWS_REGION", "us-east-1"))
 
 
 def get_lambda_arn(function_name: str) -> str:
@@ -0,0 +1,339 @@
+"""ResourceWaiter - Poll many EC2 resources until each reaches its target state.
+
+The boto3 waiters poll one resource type at a fixed delay and return only when
+the whole batch is done. This module tracks instances, volumes and snapshots in
+a single polling loop instead:
+
+- Only resources that are not done yet are described again on each poll, with
+  ID filters chunked to the EC2 per-filter limit.
+- The poll interval starts short, backs off while nothing changes, drops back
+  when something finishes, and carries random jitter so that concurrent waits
+  do not poll in lock step.
+- A per-resource callback fires as soon as that resource is done, so follow-up
+  work can start before the rest of the batch has finished.
+
+Resources that reach a failure state (e.g. a volume in ``error``) stop being
+polled and are reported together at the end, as are resources still
+unfinished when the timeout expires.
+
+Example:
+    Waiting on volumes and snapshots in one loop:
+
+    ```python
+    waiter = ResourceWaiter(ec2_client)
+    waiter.add_many('volume', volume_ids, 'available')
+    waiter.add('snapshot', 'snap-0abc', 'completed',
+               callback=lambda snapshot_id, item: print(f"{snapshot_id} done"))
+    waiter.wait(timeout=1800)
+    ```
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import time
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from .inventory import MAX_FILTER_VALUES
+from .paging import DEFAULT_PAGE_SIZE, iter_items
+
+ResourceDict = dict[str, Any]
+
+# A target is either a state name, or a predicate on the describe item. The
+# item is None once the resource no longer exists, so "deleted" can be
+# expressed as the state name "deleted".
+Target = str | Callable[[ResourceDict | None], bool]
+Callback = Callable[[str, ResourceDict | None], None]
+
+# A resource that was just created can be missing from describe results for a
+# short while. It only counts as gone after this many polls in a row without it.
+MISSING_POLL_LIMIT = 5
+
+
+def _initialization_state(status: ResourceDict) -> str:
+    """'initializing' or 'completed' from a describe_volume_status item."""
+    for detail in status.get("VolumeStatus", {}).get("Details", []):
+        if detail.get("Name") == "initialization-state":
+            return str(detail.get("Status"))
+    return "completed"
+
+
+class _Kind:
+    """How to describe one kind of resource and read its state.
+
+    Most resources are identified by one ID key that is also the filter value.
+    Others are tracked under a composite ID built by ``key``, and filtered on
+    the part of it returned by ``filter_value``. Operations without an ID
+    filter take the IDs through the request parameter ``id_param`` instead.
+    """
+
+    def __init__(
+        self,
+        operation: str,
+        result_path: str,
+        id_key: str,
+        id_filter: str,
+        state: Callable[[ResourceDict], str],
+        failure_states: set[str],
+        key: Callable[[ResourceDict], str] | None = None,
+        filter_value: Callable[[str], str] | None = None,
+        id_param: str | None = None,
+    ) -> None:
+        self.operation = operation
+        self.result_path = result_path
+        self.id_key = id_key
+        self.id_filter = id_filter
+        self.state = state
+        self.failure_states = failure_states
+        self.key = key or (lambda item: str(item[id_key]))
+        self.filter_value = filter_value or (lambda resource_id: resource_id)
+        self.id_param = id_param
+
+    def request(self, ids: list[str]) -> dict[str, Any]:
+        """Describe parameters selecting ``ids``."""
+        if self.id_param is not None:
+            return {self.id_param: ids}
+        return {"Filters": [{"Name": self.id_filter, "Values": ids}]}
+
+
+KINDS = {
+    "instance": _Kind(
+        "describe_instances",
+        "Reservations.Instances",
+        "InstanceId",
+        "instance-id",
+        lambda i: str(i["State"]["Name"]),
+        {"terminated", "shutting-down"},
+    ),
+    "volume": _Kind(
+        "describe_volumes",
+        "Volumes",
+        "VolumeId",
+        "volume-id",
+        lambda v: str(v["State"]),
+        {"error"},
+    ),
+    "snapshot": _Kind(
+        "describe_snapshots",
+        "Snapshots",
+        "SnapshotId",
+        "snapshot-id",
+        lambda s: str(s["State"]),
+        {"error"},
+    ),
+    # Initialization (hydration) of a volume from its snapshot.
+    # DescribeVolumeStatus has no volume-id filter.
+    "volume_initialization": _Kind(
+        "describe_volume_status",
+        "VolumeStatuses",
+        "VolumeId",
+        "volume-id",
+        _initialization_state,
+        set(),
+        id_param="VolumeIds",
+    ),
+    # Fast snapshot restore of one snapshot in one zone, as 'snap-id/zone'
+    "fast_snapshot_restore": _Kind(
+        "describe_fast_snapshot_restores",
+        "FastSnapshotRestores",
+        "SnapshotId",
+        "snapshot-id",
+        lambda f: str(f["State"]),
+        {"disabling", "disabled"},
+        key=lambda f: f"{f['SnapshotId']}/{f['AvailabilityZone']}",
+        filter_value=lambda resource_id: resource_id.split("/")[0],
+    ),
+}
+
+
+class _Pending:
+    """One resource being waited on."""
+
+    def __init__(self, kind: str, target: Target, callback: Callback | None) -> None:
+        self.kind = kind
+        self.target = target
+        self.callback = callback
+        self.last_state = "unknown"
+        self.missing_polls = 0
+
+
+class ResourceWaiter:
+    """Wait for a mixed set of instances, volumes and snapshots.
+
+    Attributes:
+        completed: resource ID -> final describe item (None if deleted)
+        failed: resource ID -> state that made it fail, or 'timeout'
+    """
+
+    def __init__(
+        self,
+        ec2_client: Any,
+        initial_delay: float = 2.0,
+        max_delay: float = 15.0,
+        backoff: float = 1.5,
+        jitter: float = 0.2,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize a waiter with nothing to wait on.
+
+        Args:
+            ec2_client: boto3 EC2 client used for the describe calls
+            initial_delay: Seconds between the first polls, and again after a
+                          poll where something finished
+            max_delay: Upper bound for the interval while nothing changes
+            backoff: Factor applied to the interval after an idle poll
+            jitter: Random spread of each interval, as a fraction (0.2 = +/-20%)
+            sleep: Sleep function (optional, for tests)
+            clock: Monotonic clock (optional, for tests)
+        """
+        self._ec2_client = ec2_client
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.backoff = backoff
+        self.jitter = jitter
+        self._sleep = sleep
+        self._clock = clock
+        self._logger = logging.getLogger("tagmania")
+        self._pending: dict[str, _Pending] = {}
+        self.completed: dict[str, ResourceDict | None] = {}
+        self.failed: dict[str, str] = {}
+
+    def add(
+        self,
+        kind: str,
+        resource_id: str,
+        target: Target,
+        callback: Callback | None = None,
+    ) -> None:
+        """Start tracking a resource.
+
+        Args:
+            kind: 'instance', 'volume', 'snapshot', 'volume_initialization'
+                 or 'fast_snapshot_restore'
+            resource_id: ID of the resource ('snap-id/zone' for a fast
+                        snapshot restore)
+            target: State to wait for (e.g. 'running', 'available',
+                   'completed', 'deleted'), or a predicate on the describe item
+            callback: Called with (resource_id, item) as soon as the resource
+                     reaches its target (optional)
+
+        Raises:
+            ValueError: If the kind is unknown
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown resource kind '{kind}'.")
+        self._pending[resource_id] = _Pending(kind, target, callback)
+
+    def add_many(
+        self,
+        kind: str,
+        resource_ids: Iterable[str],
+        target: Target,
+        callback: Callback | None = None,
+    ) -> None:
+        """Track several resources of one kind with the same target."""
+        for resource_id in resource_ids:
+            self.add(kind, resource_id, target, callback)
+
+    def _describe(self, kind: str, resource_ids: list[str]) -> dict[str, ResourceDict]:
+        """Describe resources by ID. Missing resources are simply absent."""
+        spec = KINDS[kind]
+        values = list(dict.fromkeys(spec.filter_value(rid) for rid in resource_ids))
+        found: dict[str, ResourceDict] = {}
+        for start in range(0, len(values), MAX_FILTER_VALUES):
+            chunk = values[start : start + MAX_FILTER_VALUES]
+            # EC2 rejects a page size next to an explicit list of IDs
+            page_size = None if spec.id_param else DEFAULT_PAGE_SIZE
+            for item in iter_items(
+                self._ec2_client,
+                spec.operation,
+                spec.result_path,
+                page_size=page_size,
+                **spec.request(chunk),
+            ):
+                found[spec.key(item)] = item
+        return found
+
+    @staticmethod
+    def _reached(pending: _Pending, item: ResourceDict | None) -> bool:
+        if callable(pending.target):
+            return pending.target(item)
+        if pending.target == "deleted":
+            return item is None or pending.last_state == "deleted"
+        return pending.last_state == pending.target
+
+    def poll(self) -> int:
+        """Describe every unfinished resource once and record what finished.
+
+        Returns:
+            int: Number of resources that finished or failed on this poll
+        """
+        by_kind: dict[str, list[str]] = {}
+        for resource_id, pending in self._pending.items():
+            by_kind.setdefault(pending.kind, []).append(resource_id)
+        finished = 0
+        for kind, resource_ids in by_kind.items():
+            spec = KINDS[kind]
+            found = self._describe(kind, resource_ids)
+            for resource_id in resource_ids:
+                pending = self._pending[resource_id]
+                item = found.get(resource_id)
+                pending.last_state = spec.state(item) if item is not None else "deleted"
+                if self._reached(pending, item):
+                    del self._pending[resource_id]
+                    self.completed[resource_id] = item
+                    finished += 1
+                    if pending.callback is not None:
+                        pending.callback(resource_id, item)
+                    continue
+                pending.missing_polls = pending.missing_polls + 1 if item is None else 0
+                if (
+                    pending.last_state in spec.failure_states
+                    or pending.missing_polls >= MISSING_POLL_LIMIT
+                ):
+                    del self._pending[resource_id]
+                    self.failed[resource_id] = pending.last_state
+                    finished += 1
+        self._logger.debug(
+            f"wait: {len(self.completed)} done, {len(self._pending)} pending, "
+            f"{len(self.failed)} failed"
+        )
+        return finished
+
+    def wait(self, timeout: float = 1800.0) -> dict[str, ResourceDict | None]:
+        """Poll until every tracked resource has finished, failed or timed out.
+
+        Args:
+            timeout: Seconds to wait in total
+
+        Returns:
+            dict: resource ID -> final describe item of each completed resource
+
+        Raises:
+            Exception: If any resource failed or did not finish in time. All
+                      other resources have completed by then.
+        """
+        deadline = self._clock() + timeout
+        delay = self.initial_delay
+        while self._pending:
+            finished = self.poll()
+            if not self._pending:
+                break
+            if self._clock() >= deadline:
+                for resource_id in self._pending:
+                    self.failed[resource_id] = "timeout"
+                self._pending.clear()
+                break
+            # Poll quickly again while things are finishing, back off otherwise
+            if finished:
+                delay = self.initial_delay
+            spread = delay * self.jitter
+            self._sleep(max(0.0, delay + random.uniform(-spread, spread)))
+            delay = min(delay * self.backoff, self.max_delay)
+        if self.failed:
+            details = ", ".join(f"{rid} ({state})" for rid, state in self.failed.items())
+            raise Exception(f"Error: wait: {len(self.failed)} resources did not finish: {details}")
+        return self.completed
@@ -12,6 +12,7 @@ Features:
     - Create named snapshots of entire clusters
     - Restore clusters from snapshots with volume replacement
     - Targeted restore using regex patterns on instance names
+    - Rollback of a restore to the volumes it replaced
     - List and delete existing snapshots
     - Safety confirmations for all destructive operations
 
@@ -22,15 +23,44 @@ Usage:
     # Create a backup
     cluster-snap --backup --name daily-backup production
 
+    # Create a backup, restarting each instance once its snapshots are initiated
+    cluster-snap --backup --restart --name daily-backup production
+
+    # Crash-consistent backup of the data volumes of a running cluster
+    cluster-snap --backup --crash-consistent --exclude-root --name hourly production
+
+    # Restore with fully initialized volumes (Fast Snapshot Restore)
+    cluster-snap --restore --fast-restore --name daily-backup production
+
+    # Restore onto fast gp3 volumes, then settle them to baseline once hydrated
+    cluster-snap --restore --restore-profile "type=gp3 throughput=1000 baseline-throughput=125" production
+    cluster-snap --settle --wait production
+
+    # Back up and restore only data disks of at least 10 GiB
+    cluster-snap --backup --exclude-root --min-size 10 --name nightly production
+    cluster-snap --restore --exclude-root --min-size 10 --name nightly production
+
     # Restore entire cluster
     cluster-snap --restore --name daily-backup production
 
+    # Staged restore: create the volumes while the cluster runs, then swap them in
+    cluster-snap --restore --stage --name daily-backup production
+    cluster-snap --restore --cutover --name daily-backup production
+
+    # Restore keeping the old volumes, then either go back or delete them
+    cluster-snap --restore --keep-rollback --name daily-backup production
+    cluster-snap --rollback --name daily-backup production
+    cluster-snap --commit --name daily-backup production
+
     # Targeted restore (only web servers)
     cluster-snap --restore --target ".*-web-.*" production
 
     # List snapshots
     cluster-snap --list production
 
+    # Show volumes that are still being deleted
+    cluster-snap --deletions production
+
     # Delete snapshots
     cluster-snap --delete --name daily-backup production
     ```
@@ -46,6 +76,9 @@ import logging
 import re
 
 from tagmania.iac_tools.clusterset import ClusterSet
+from tagmania.iac_tools.device_policy import DevicePolicy
+from tagmania.iac_tools.restore_profile import RestoreProfile
+from tagmania.iac_tools.tagset import TagSet
 from tagmania.iac_tools.timing import log_duration
 
 
@@ -60,6 +93,135 @@ def _configure_logging() -> logging.Logger:
     return logger
 
 
+def _device_policy(args: argparse.Namespace) -> DevicePolicy:
+    """Build the device selection shared by backup and restore from the CLI flags."""
+    return DevicePolicy(
+        exclude_root=args.exclude_root,
+        include=args.include_device,
+        exclude=args.exclude_device,
+        min_size=args.min_size,
+    )
+
+
+def _print_settle_hint(cluster: str, restore_profile: RestoreProfile) -> None:
+    """Remind the user to settle volumes restored with a baseline."""
+    if restore_profile.baseline:
+        print(
+            f"Run 'cluster-snap --settle {cluster}' once the volumes are initialized "
+            "to modify them back to their baseline."
+        )
+
+
+def _staged_restore(
+    cluster: ClusterSet,
+    args: argparse.Namespace,
+    snapshot_name: str,
+    policy: DevicePolicy,
+    restore_profile: RestoreProfile,
+    logger: logging.Logger,
+) -> None:
+    """Run the --stage or --cutover half of a staged restore once confirmed."""
+    scope = f"instances matching '{args.target}'" if args.target else args.cluster
+    if args.stage:
+        prompt = f"Stage volumes from backup '{snapshot_name}' for {scope}?"
+    else:
+        prompt = f"Cut {scope} over to the volumes staged from '{snapshot_name}'?"
+    if input(f"{prompt} [no] ") != "yes":
+        print("Operation aborted.")
+        return
+    inventory = cluster.get_inventory()
+    try:
+        if args.stage:
+            # The instances keep running while the volumes are created
+            with log_duration(logger, "stage"):
+                cluster.stage_restore(
+                    snapshot_name,
+                    args.target,
+                    inventory=inventory,
+                    policy=policy,
+                    profile=restore_profile,
+                )
+        else:
+            # Each instance is down only for the detach/attach swap
+            with log_duration(logger, "cutover"):
+                cluster.cutover(
+                    snapshot_name,
+                    args.target,
+                    inventory=inventory,
+                    policy=policy,
+                    keep_rollback=args.keep_rollback,
+                )
+    except ValueError as e:
+        print(f"{e}")
+        print("Operation aborted.")
+        return
+    print("Operation completed successfully!")
+    if args.stage:
+        _print_settle_hint(args.cluster, restore_profile)
+    else:
+        _print_rollback_hint(args, snapshot_name)
+
+
+def _print_rollback_hint(args: argparse.Namespace, snapshot_name: str) -> None:
+    """Tell the user how to roll back or commit a restore that kept its old volumes."""
+    if args.keep_rollback:
+        print(
+            f"The replaced volumes are kept. Run 'cluster-snap --rollback --name "
+            f"{snapshot_name} {args.cluster}' to reattach them, or '--commit' to delete them."
+        )
+
+
+def _rollback_or_commit(
+    cluster: ClusterSet,
+    args: argparse.Namespace,
+    snapshot_name: str,
+    policy: DevicePolicy,
+    logger: logging.Logger,
+) -> None:
+    """Reattach (--rollback) or delete (--commit) the volumes a restore kept, once confirmed."""
+    scope = f"instances matching '{args.target}'" if args.target else args.cluster
+    if args.rollback:
+        prompt = f"Roll {scope} back to the volumes replaced by restore '{snapshot_name}'?"
+    else:
+        prompt = f"Delete the volumes of {scope} kept by restore '{snapshot_name}'?"
+    if input(f"{prompt} [no] ") != "yes":
+        print("Operation aborted.")
+        return
+    inventory = cluster.get_inventory()
+    try:
+        if args.rollback:
+            with log_duration(logger, "rollback"):
+                cluster.rollback(snapshot_name, args.target, inventory=inventory, policy=policy)
+        else:
+            cluster.commit_restore(snapshot_name, args.target, inventory=inventory, policy=policy)
+    except ValueError as e:
+        print(f"{e}")
+        print("Operation aborted.")
+        return
+    print("Operation completed successfully!")
+
+
+def _finish_deletions(cluster: ClusterSet, logger: logging.Logger) -> None:
+    """Wait for the deletions queued in the background once everything else is done."""
+    if cluster.has_deletions:
+        print(f"Finishing background deletions. {cluster.deletions.status()}")
+        with log_duration(logger, "deletions"):
+            cluster.deletions.drain()
+        print(cluster.deletions.status())
+
+
+def _print_deletions(cluster: ClusterSet, name: str) -> None:
+    """List the managed volumes of the cluster that EC2 is still deleting."""
+    volumes = cluster.get_deleting_volumes()
+    if len(volumes) == 0:
+        print(f"No volumes of {name} are being deleted.")
+        return
+    print(f"{len(volumes)} volumes of {name} are being deleted:")
+    for volume in volumes:
+        volume_name = TagSet(volume.get("Tags") or []).get("Name") or "-"
+        print(f"{volume['VolumeId']} ({volume_name})")
+
+
 def main():
     """Main entry point for the cluster snapshot management CLI.
 
@@ -110,6 +272,38 @@ def main():
         default=False,
         help="Restore cluster CLUSTER from snapshots.",
     )
+    group.add_argument(
+        "--settle",
+        action="store_const",
+        dest="settle",
+        const=True,
+        default=False,
+        help="Modify restored volumes back to their profile baseline once initialized.",
+    )
+    group.add_argument(
+        "--rollback",
+        action="store_const",
+        dest="rollback",
+        const=True,
+        default=False,
+        help="Reattach the volumes replaced by a --keep-rollback restore.",
+    )
+    group.add_argument(
+        "--commit",
+        action="store_const",
+        dest="commit",
+        const=True,
+        default=False,
+        help="Delete the volumes kept by a --keep-rollback restore, without waiting.",
+    )
+    group.add_argument(
+        "--deletions",
+        action="store_const",
+        dest="deletions",
+        const=True,
+        default=False,
+        help="List the volumes of cluster CLUSTER that are still being deleted.",
+    )
     group.add_argument(
         "-l",
         "--list",
@@ -127,6 +321,93 @@ def main():
         default=None,
         help="Regex pattern to match instance Name tags for targeted restore.",
     )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        default=False,
+        help="With --backup, start each instance again once its snapshots are initiated.",
+    )
+    parser.add_argument(
+        "--crash-consistent",
+        action="store_true",
+        default=False,
+        help="""
+            With --backup, snapshot all volumes of each instance at the same
+            point in time without stopping the cluster.""",
+    )
+    staging = parser.add_mutually_exclusive_group()
+    staging.add_argument(
+        "--stage",
+        action="store_true",
+        default=False,
+        help="""
+            With --restore, only create the volumes from the snapshots while
+            the instances keep running. Swap them in later with --cutover.""",
+    )
+    staging.add_argument(
+        "--cutover",
+        action="store_true",
+        default=False,
+        help="""
+            With --restore, stop each instance, swap in the volumes created by
+            --stage and start it again.""",
+    )
+    parser.add_argument(
+        "--keep-rollback",
+        action="store_true",
+        default=False,
+        help="""
+            With --restore or --cutover, keep the replaced volumes, tagged
+            'rollback-<name>', instead of deleting them.""",
+    )
+    parser.add_argument(
+        "--fast-restore",
+        action="store_true",
+        default=False,
+        help="""
+            With --restore, enable Fast Snapshot Restore on the snapshots while
+            the volumes are created, so they are fully initialized right away.
+            This is billed per snapshot and availability zone, one hour minimum.""",
+    )
+    parser.add_argument(
+        "--restore-profile",
+        type=str,
+        default=None,
+        help="""
+            With --restore, how to create the volumes, e.g. 'rate=0:300/1024:200
+            type=gp3 throughput=1000 baseline-throughput=125'. Defaults to the
+            cluster's RestoreProfile tag, or 300 MiB/s initialization.""",
+    )
+    parser.add_argument(
+        "--wait",
+        action="store_true",
+        default=False,
+        help="With --settle, wait for volumes that are still initializing.",
+    )
+    parser.add_argument(
+        "--exclude-root",
+        action="store_true",
+        default=False,
+        help="Skip the root volume of each instance (backup and restore).",
+    )
+    parser.add_argument(
+        "--include-device",
+        type=str,
+        default=None,
+        help="Regex a device name must match to be backed up or restored (e.g. '/dev/sd[f-p]').",
+    )
+    parser.add_argument(
+        "--exclude-device",
+        type=str,
+        default=None,
+        help="Regex of device names to skip during backup and restore.",
+    )
+    parser.add_argument(
+        "--min-size",
+        type=int,
+        default=None,
+        help="Skip volumes smaller than this many GiB during backup and restore.",
+    )
     parser.add_argument(
         "cluster",
         help="""
@@ -138,6 +419,28 @@ def main():
     args = parser.parse_args()
 
     logger = _configure_logging()
+    try:
+        policy = _device_policy(args)
+    except re.error as e:
+        parser.error(f"invalid device pattern: {e}")
+    restore_profile = None
+    if args.restore_profile is not None:
+        try:
+            restore_profile = RestoreProfile.parse(args.restore_profile)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.restart and not args.backup:
+        parser.error("--restart requires --backup")
+    if args.crash_consistent and not args.backup:
+        parser.error("--crash-consistent requires --backup")
+    if (args.stage or args.cutover) and not args.restore:
+        parser.error("--stage and --cutover require --restore")
+    if args.keep_rollback and (args.stage or not args.restore):
+        parser.error("--keep-rollback requires --restore, without --stage")
+    if args.fast_restore and not args.restore:
+        parser.error("--fast-restore requires --restore")
+    if args.fast_restore and (args.stage or args.cutover):
+        parser.error("--fast-restore cannot be combined with --stage or --cutover")
     cluster = ClusterSet(args.cluster, profile=args.profile)
 
     if args.backup:
@@ -145,16 +448,29 @@ def main():
         confirm = input(f"Create backup of {args.cluster} named '{snapshot_name}'? [no] ")
         if confirm == "yes":
             print("Making backup.")
-            instances = cluster.get_instances()
-            if len(instances) == 0:
+            # One inventory is shared by every step so EC2 is described once
+            inventory = cluster.get_inventory()
+            if len(inventory.instances) == 0:
                 print("No instances found. Operation aborted.")
             else:
                 with log_duration(logger, "backup"):
-                    # Stop the cluster (not clean)
-                    cluster.stop_instances()
-                    cluster.create_snapshots(snapshot_name)
-                    # Start cluster
-                    # cluster.start_instances()
+                    if args.crash_consistent:
+                        # One point-in-time snapshot set per running instance
+                        cluster.create_snapshots(
+                            snapshot_name,
+                            inventory=inventory,
+                            multi_volume=True,
+                            policy=policy,
+                        )
+                    else:
+                        # Stop the cluster (not clean) and snapshot each
+                        # instance as soon as it has stopped
+                        cluster.backup_pipelined(
+                            snapshot_name,
+                            inventory=inventory,
+                            restart=args.restart,
+                            policy=policy,
+                        )
                 print("Operation completed successfully!")
         else:
             print("Operation aborted.")
@@ -179,16 +495,24 @@ def main():
 
     if args.restore:
         snapshot_name = "default" if args.name is None else args.name
+        if restore_profile is None:
+            restore_profile = cluster.get_restore_profile() or RestoreProfile()
+        if not args.cutover:
+            print(f"Restore profile: {restore_profile.to_spec()}")
 
+        if args.stage or args.cutover:
+            _staged_restore(cluster, args, snapshot_name, policy, restore_profile, logger)
         # Handle targeted restore
-        if args.target:
+        elif args.target:
             try:
                 # Validate regex pattern
                 re.compile(args.target)
 
                 # Check if any instances match the pattern
-                instances = cluster.get_instances()
-                filtered_instances = cluster._filter_instances_by_name_regex(instances, args.target)
+                inventory = cluster.get_inventory()
+                filtered_instances = cluster._filter_instances_by_name_regex(
+                    inventory.instances, args.target
+                )
 
                 if len(filtered_instances) == 0:
                     print(
@@ -200,12 +524,12 @@ def main():
                     )
                     for instance in filtered_instances:
                         name_tag = "Unknown"
-                        if instance.tags:
-                            for tag in instance.tags:
+                        if instance.get("Tags"):
+                            for tag in instance["Tags"]:
                                 if tag["Key"] == "Name":
                                     name_tag = tag["Value"]
                                     break
-                        print(f"  - {instance.id} ({name_tag})")
+                        print(f"  - {instance['InstanceId']} ({name_tag})")
 
                     confirm = input(
                         f"Restore backup '{snapshot_name}' for these {len(filtered_instances)} instances? [no] "
@@ -213,17 +537,23 @@ def main():
                     if confirm == "yes":
                         print("Restoring targeted instances.")
                         with log_duration(logger, "restore_targeted"):
-                            # Stop targeted instances
-                            cluster.stop_instances_targeted(args.target)
-                            # Detach and delete volumes from targeted instances
-                            cluster.detach_volumes_targeted(args.target)
-                            cluster.delete_volumes_targeted(args.target)
-                            # Create new volumes from snapshots and attach them
-                            cluster.create_volumes_targeted(snapshot_name, args.target)
-                            cluster.attach_volumes_targeted(snapshot_name, args.target)
+                            # Each targeted instance is stopped, has its volumes
+                            # detached and deleted, then gets new volumes from
+                            # the snapshots, independently of the others
+                            cluster.restore_pipelined(
+                                snapshot_name,
+                                args.target,
+                                inventory=inventory,
+                                policy=policy,
+                                fast_restore=args.fast_restore,
+                                profile=restore_profile,
+                                keep_rollback=args.keep_rollback,
+                            )
                             # Start targeted instances
                             # cluster.start_instances_targeted(args.target)
                         print("Operation completed successfully!")
+                        _print_settle_hint(args.cluster, restore_profile)
+                        _print_rollback_hint(args, snapshot_name)
                     else:
                         print("Operation aborted.")
             except re.error as e:
@@ -234,25 +564,38 @@ def main():
             confirm = input(f"Restore backup of {args.cluster} named '{snapshot_name}'? [no] ")
             if confirm == "yes":
                 print("Restoring cluster.")
-                instances = cluster.get_instances()
-                if len(instances) == 0:
+                inventory = cluster.get_inventory()
+                if len(inventory.instances) == 0:
                     print("No instances found. Operation aborted.")
                 else:
                     with log_duration(logger, "restore"):
-                        # Stop cluster (not clean)
-                        cluster.stop_instances()
-                        # Detach and delete current volumes
-                        cluster.detach_volumes()
-                        cluster.delete_volumes()
-                        # Create new volumes from snapshots and attach them
-                        cluster.create_volumes(snapshot_name)
-                        cluster.attach_volumes(snapshot_name)
+                        # Stop each instance (not clean), replace its volumes
+                        # with new ones from the snapshots, one pipeline per
+                        # instance
+                        cluster.restore_pipelined(
+                            snapshot_name,
+                            inventory=inventory,
+                            policy=policy,
+                            fast_restore=args.fast_restore,
+                            profile=restore_profile,
+                            keep_rollback=args.keep_rollback,
+                        )
                         # Start cluster
                         # cluster.start_instances()
                     print("Operation completed successfully!")
+                    _print_settle_hint(args.cluster, restore_profile)
+                    _print_rollback_hint(args, snapshot_name)
             else:
                 print("Operation aborted.")
 
+    if args.rollback or args.commit:
+        snapshot_name = "default" if args.name is None else args.name
+        _rollback_or_commit(cluster, args, snapshot_name, policy, logger)
+
+    if args.settle:
+        with log_duration(logger, "settle"):
+            cluster.settle_volumes(wait=args.wait)
+
     if args.list:
         if args.name is None:
             print(f"Listing all snapshots associated with {args.cluster}.")
@@ -262,7 +605,7 @@ def main():
             label_list = []
             snapshot_dict: dict[str, list[str]] = {}
             for snapshot in snapshots:
-                for tag in snapshot.tags:
+                for tag in snapshot.tags or []:
                     if "Label" in tag["Key"] and tag["Value"] not in label_list:
                         label_list.append(tag["Value"])
                         snapshot_dict[tag["Value"]] = []
@@ -282,6 +625,19 @@ def main():
             for snapshot in snapshots:
                 print(snapshot.id)
 
+    if args.deletions:
+        _print_deletions(cluster, args.cluster)
+
+    # Restores and backups return once the user-visible work is done. Old
+    # volumes and snapshots may still be deleting in the background.
+    _finish_deletions(cluster, logger)
+
+    # Throttled calls were slowed down and retried rather than failed
+    if cluster.rate_limiter.throttled:
+        logger.warning(cluster.rate_limiter.summary())
+    else:
+        logger.info(cluster.rate_limiter.summary())
+
 
 if __name__ == "__main__":
     main()
@@ -105,11 +105,8 @@ def main():
             pair = tag.split(":")
             tags.append({"Key": pair[0], "Value": pair[1]})
 
-        # Tag EC2 resources
-        cluster.tag_instances(tags)
-        cluster.tag_volumes(tags)
-        cluster.tag_snapshots(tags)
-        # cluster.tag_subnet(tags)
+        # Tag EC2 resources in bulk
+        cluster.tag_resources(tags)
 
         # Tag lambda functions
         print("Tagging lambda function(s)")
@@ -128,11 +125,8 @@ def main():
         for tag in args.untag:
             tags.append({"Key": tag})
 
-        # Un-tag EC2 resources
-        cluster.untag_instances(tags)
-        cluster.untag_volumes(tags)
-        cluster.untag_snapshots(tags)
-        # cluster.untag_subnet(tags)
+        # Un-tag EC2 resources in bulk
+        cluster.untag_resources(tags)
 
         # Un-tag lambda functions
         print("Un-tagging lambda function(s)")
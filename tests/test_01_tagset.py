@@ -1,3 +1,5 @@
+import pytest
+
 from tagmania.iac_tools.tagset import TagSet
 
 
@@ -65,3 +67,73 @@ class TestTagSet:
         assert ts.get("Name") == "web"
         assert ts.get("name") is None
         assert ts.get("NAME") is None
+
+    def test_uses_slots(self):
+        ts = TagSet()
+        assert not hasattr(ts, "__dict__")
+        with pytest.raises(AttributeError):
+            ts.extra = 1
+
+    def test_add_after_lookup_keeps_index_in_step(self):
+        ts = TagSet([{"Key": "Name", "Value": "web-01"}])
+        assert ts.get("Owner") is None
+        ts.add("Owner", "team")
+        ts.add("Name", "ignored-duplicate")
+        assert ts.get("Owner") == "team"
+        assert ts.get("Name") == "web-01"
+        assert len(ts.to_list()) == 3
+
+    def test_contains_len_iter(self):
+        ts = TagSet([{"Key": "A", "Value": "1"}, {"Key": "B", "Value": "2"}])
+        assert "A" in ts
+        assert "C" not in ts
+        assert len(ts) == 2
+        assert list(ts) == ["A", "B"]
+
+    def test_from_dict_round_trips(self):
+        ts = TagSet.from_dict({"Env": "prod", "Owner": "team"})
+        assert ts.to_list() == [
+            {"Key": "Env", "Value": "prod"},
+            {"Key": "Owner", "Value": "team"},
+        ]
+        assert ts.to_dict() == {"Env": "prod", "Owner": "team"}
+
+    def test_from_resource_without_tags(self):
+        assert TagSet.from_resource({"VolumeId": "vol-1"}).to_list() == []
+
+    def test_bulk(self):
+        volumes = [
+            {"VolumeId": "vol-1", "Tags": [{"Key": "Device", "Value": "/dev/sdf"}]},
+            {"VolumeId": "vol-2"},
+        ]
+        by_id = TagSet.bulk(volumes, "VolumeId")
+        assert by_id["vol-1"].get("Device") == "/dev/sdf"
+        assert len(by_id["vol-2"]) == 0
+
+    def test_diff(self):
+        current = TagSet.from_dict({"Env": "prod", "Owner": "a"})
+        desired = TagSet.from_dict({"Env": "prod", "Owner": "b", "Team": "x"})
+        assert current.diff(desired).to_dict() == {"Owner": "b", "Team": "x"}
+        assert len(current.diff(TagSet.from_dict({"Env": "prod"}))) == 0
+
+    def test_removable(self):
+        current = TagSet.from_dict({"Env": "prod", "Owner": "a"})
+        removable = current.removable(
+            [{"Key": "Env"}, {"Key": "Owner", "Value": "b"}, {"Key": "Team"}]
+        )
+        assert removable == [{"Key": "Env"}]
+        assert current.removable([{"Key": "Owner", "Value": "a"}]) == [
+            {"Key": "Owner", "Value": "a"}
+        ]
+
+    def test_merge(self):
+        base = TagSet.from_dict({"Env": "prod", "Owner": "a"})
+        merged = base.merge(TagSet.from_dict({"Owner": "b", "Team": "x"}))
+        assert merged.to_dict() == {"Env": "prod", "Owner": "b", "Team": "x"}
+        assert base.get("Owner") == "a"
+
+    def test_empty_tagset_is_truthy(self):
+        ts = TagSet()
+        assert len(ts) == 0
+        assert bool(ts) is True
+        assert (ts or None) is ts
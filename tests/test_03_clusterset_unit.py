@@ -1,9 +1,20 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
 from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import pytest
+from botocore.exceptions import ClientError
 
+from tagmania.iac_tools.clients import get_client_factory
 from tagmania.iac_tools.clusterset import ClusterSet
+from tagmania.iac_tools.device_policy import DevicePolicy
+from tagmania.iac_tools.inventory import ClusterInventory
+from tagmania.iac_tools.paging import DEFAULT_PAGE_SIZE
+from tagmania.iac_tools.rate_limit import get_rate_limiter
+from tagmania.iac_tools.records import InstanceRecord, VolumeRecord
+from tagmania.iac_tools.restore_profile import RestoreProfile
+from tagmania.iac_tools.tagset import TagSet
 
 
 def make_instance(name, cluster="test1", state="running", tags=None):
@@ -20,11 +31,19 @@ def make_volume(vol_id, tags=None):
     return SimpleNamespace(id=vol_id, tags=tags or [])
 
 
+@pytest.fixture(autouse=True)
+def fresh_clients():
+    # Each test gets its own mocked session instead of a cached one
+    get_client_factory().clear()
+    yield
+    get_client_factory().clear()
+
+
 @pytest.fixture
 def cluster():
-    with patch("tagmania.iac_tools.clusterset.boto3") as mock_boto:
+    with patch("boto3.Session") as mock_session:
         mock_session = MagicMock()
-        mock_boto.Session.return_value = mock_session
+        mock_session.return_value = mock_session
         cs = ClusterSet("test1")
         yield cs
 
@@ -73,22 +92,22 @@ class TestFilterInstancesByNameRegex:
 
 class TestClusterSetInit:
     def test_single_cluster_name(self):
-        with patch("tagmania.iac_tools.clusterset.boto3") as mock_boto:
-            mock_boto.Session.return_value = MagicMock()
+        with patch("boto3.Session") as mock_session:
+            mock_session.return_value = MagicMock()
             cs = ClusterSet("test1")
             assert cs.cluster_names == "test1"
             assert cs._cluster_name_str == "test1"
 
     def test_list_cluster_names(self):
-        with patch("tagmania.iac_tools.clusterset.boto3") as mock_boto:
-            mock_boto.Session.return_value = MagicMock()
+        with patch("boto3.Session") as mock_session:
+            mock_session.return_value = MagicMock()
             cs = ClusterSet(["cluster-a", "cluster-b"])
             assert cs.cluster_names == ["cluster-a", "cluster-b"]
             assert cs._cluster_name_str == "cluster-a"
 
     def test_cluster_filter_structure(self):
-        with patch("tagmania.iac_tools.clusterset.boto3") as mock_boto:
-            mock_boto.Session.return_value = MagicMock()
+        with patch("boto3.Session") as mock_session:
+            mock_session.return_value = MagicMock()
             cs = ClusterSet("prod")
             f = cs.get_cluster_filter()
             assert len(f) == 1
@@ -96,27 +115,92 @@ class TestClusterSetInit:
             assert f[0]["Values"] == ["prod"]
 
     def test_cluster_filter_returns_copy(self):
-        with patch("tagmania.iac_tools.clusterset.boto3") as mock_boto:
-            mock_boto.Session.return_value = MagicMock()
+        with patch("boto3.Session") as mock_session:
+            mock_session.return_value = MagicMock()
             cs = ClusterSet("prod")
             f1 = cs.get_cluster_filter()
             f2 = cs.get_cluster_filter()
             assert f1 is not f2
 
     def test_profile_passed_to_session(self):
-        with patch("tagmania.iac_tools.clusterset.boto3") as mock_boto:
-            mock_boto.Session.return_value = MagicMock()
-            ClusterSet("test1", profile="my-profile")
-            mock_boto.Session.assert_called_once_with(profile_name="my-profile")
+        with patch("boto3.Session") as mock_session:
+            mock_session.return_value = MagicMock()
+            assert ClusterSet("test1", profile="my-profile")._ec2_client
+            mock_session.assert_called_once_with(profile_name="my-profile")
 
     def test_no_profile_uses_default(self):
-        with patch("tagmania.iac_tools.clusterset.boto3") as mock_boto:
-            mock_boto.Session.return_value = MagicMock()
-            ClusterSet("test1")
-            mock_boto.Session.assert_called_once_with()
+        with patch("boto3.Session") as mock_session:
+            mock_session.return_value = MagicMock()
+            assert ClusterSet("test1")._ec2_client
+            mock_session.assert_called_once_with()
+
+    def test_clients_go_through_rate_limiter(self):
+        with patch("boto3.Session") as mock_session:
+            session = mock_session.return_value
+            cs = ClusterSet("test1")
+            assert cs._ec2_client and cs._ec2
+            config = session.client.call_args[1]["config"]
+            assert config.retries["mode"] == "adaptive"
+            assert cs.rate_limiter is get_rate_limiter()
+            session.client.return_value.meta.events.register.assert_called()
+            session.resource.return_value.meta.client.meta.events.register.assert_called()
+
+    def test_clusters_share_session_and_client(self):
+        with patch("boto3.Session") as mock_session:
+            a = ClusterSet("cluster-a", profile="prod")
+            b = ClusterSet("cluster-b", profile="prod")
+            assert a._ec2_client is b._ec2_client
+            mock_session.assert_called_once_with(profile_name="prod")
+
+    def test_pool_tracks_concurrency(self):
+        with patch("boto3.Session") as mock_session:
+            assert ClusterSet("test1", concurrency=32)._ec2_client
+            config = mock_session.return_value.client.call_args[1]["config"]
+            assert config.max_pool_connections == 66
+
+    def test_clients_created_on_first_use(self):
+        with patch("boto3.Session") as mock_session:
+            cs = ClusterSet("test1")
+            mock_session.assert_not_called()
+            assert cs.deletions.pending == []
+            mock_session.return_value.client.assert_called_once()
+            mock_session.return_value.resource.assert_not_called()
+
+    def test_concurrent_first_use_creates_one_queue(self):
+        cs = ClusterSet("test1")
+        created = []
 
-    def test_max_items_set(self, cluster):
-        assert cluster._MAX_ITEMS == 150
+        def slow_queue(*args):
+            time.sleep(0.05)
+            created.append(MagicMock())
+            return created[-1]
+
+        with (
+            patch("tagmania.iac_tools.clusterset.get_client_factory"),
+            patch("tagmania.iac_tools.clusterset.DeletionQueue", side_effect=slow_queue),
+            ThreadPoolExecutor(max_workers=4) as pool,
+        ):
+            queues = list(pool.map(lambda _: cs.deletions, range(4)))
+        assert len(created) == 1
+        assert all(q is created[0] for q in queues)
+
+    def test_has_deletions_does_not_create_the_queue(self):
+        with patch("boto3.Session") as mock_session:
+            cs = ClusterSet("test1")
+            assert cs.has_deletions is False
+            mock_session.assert_not_called()
+            assert cs._deletions is None
+
+    def test_no_item_cap_by_default(self, cluster):
+        assert cluster.max_items is None
+        assert cluster.page_size == DEFAULT_PAGE_SIZE
+
+    def test_paging_options(self):
+        with patch("boto3.Session") as mock_session:
+            mock_session.return_value = MagicMock()
+            cs = ClusterSet("test1", page_size=50, max_items=10)
+            assert cs.page_size == 50
+            assert cs.max_items == 10
 
     def test_automation_key_set(self, cluster):
         assert cluster.AUTOMATION_KEY == "SNAPSHOT_MANAGER"
@@ -124,19 +208,21 @@ class TestClusterSetInit:
 
 class TestClusterSetQueryMethods:
     def _setup_ec2_filter(self, cluster, instances):
-        """Configure the mock ec2 to return instances from filter()."""
-        mock_collection = MagicMock()
-        mock_collection.limit.return_value = instances
-        mock_collection.__iter__ = lambda self: iter(instances)
-        cluster._ec2.instances.filter.return_value = mock_collection
+        """Configure the mock client paginator to return instances in one page."""
+        data = [{"InstanceId": i.id, "State": i.state, "Tags": i.tags} for i in instances]
+        paginator = cluster._ec2_client.get_paginator.return_value
+        paginator.paginate.return_value = [{"Reservations": [{"Instances": data}]}]
+
+    def _filters(self, cluster):
+        return cluster._ec2_client.get_paginator.return_value.paginate.call_args[1]["Filters"]
 
     def test_get_instances(self, cluster):
         instances = [make_instance("web-01"), make_instance("db-01")]
         self._setup_ec2_filter(cluster, instances)
         result = cluster.get_instances()
         assert len(result) == 2
-        cluster._ec2.instances.filter.assert_called_once()
-        filters = cluster._ec2.instances.filter.call_args[1]["Filters"]
+        cluster._ec2_client.get_paginator.assert_called_once_with("describe_instances")
+        filters = self._filters(cluster)
         state_filter = next(f for f in filters if f["Name"] == "instance-state-name")
         assert "running" in state_filter["Values"]
         assert "stopped" in state_filter["Values"]
@@ -146,7 +232,7 @@ class TestClusterSetQueryMethods:
         self._setup_ec2_filter(cluster, instances)
         result = cluster.get_running_instances()
         assert len(result) == 1
-        filters = cluster._ec2.instances.filter.call_args[1]["Filters"]
+        filters = self._filters(cluster)
         state_filter = next(f for f in filters if f["Name"] == "instance-state-name")
         assert "running" in state_filter["Values"]
         assert "stopped" not in state_filter["Values"]
@@ -156,7 +242,7 @@ class TestClusterSetQueryMethods:
         self._setup_ec2_filter(cluster, instances)
         result = cluster.get_stopped_instances()
         assert len(result) == 1
-        filters = cluster._ec2.instances.filter.call_args[1]["Filters"]
+        filters = self._filters(cluster)
         state_filter = next(f for f in filters if f["Name"] == "instance-state-name")
         assert state_filter["Values"] == ["stopped"]
 
@@ -203,3 +289,1177 @@ class TestClusterSetQueryMethods:
     def test_get_stopped_instances_empty(self, cluster):
         self._setup_ec2_filter(cluster, [])
         assert cluster.get_stopped_instances() == []
+
+    def test_get_instances_not_truncated(self, cluster):
+        instances = [make_instance(f"node-{n:03d}") for n in range(400)]
+        self._setup_ec2_filter(cluster, instances)
+        result = cluster.get_instances()
+        assert len(result) == 400
+        assert result[-1].id == "i-node-399"
+        assert result[-1].meta.data["InstanceId"] == "i-node-399"
+
+    def test_page_size_passed_to_paginator(self, cluster):
+        self._setup_ec2_filter(cluster, [])
+        cluster.page_size = 25
+        cluster.get_instances()
+        kwargs = cluster._ec2_client.get_paginator.return_value.paginate.call_args[1]
+        assert kwargs["PaginationConfig"] == {"PageSize": 25}
+
+    def test_max_items_caps_and_warns(self, cluster, caplog):
+        instances = [make_instance(f"node-{n}") for n in range(5)]
+        self._setup_ec2_filter(cluster, instances)
+        cluster.max_items = 3
+        assert len(cluster.get_instances()) == 3
+        assert "max_items=3" in caplog.text
+
+    def test_instances_are_records(self, cluster):
+        self._setup_ec2_filter(cluster, [make_instance("web-01")])
+        instance = cluster.get_instances()[0]
+        assert isinstance(instance, InstanceRecord)
+        assert instance.state == {"Name": "running"}
+        cluster._ec2.Instance.assert_not_called()
+        # Actions fall back on the boto3 resource
+        instance.start()
+        cluster._ec2.Instance.assert_called_once_with("i-web-01")
+        cluster._ec2.Instance.return_value.start.assert_called_once_with()
+
+    def test_iter_instances_is_lazy(self, cluster):
+        self._setup_ec2_filter(cluster, [make_instance("web-01")])
+        iterator = cluster.iter_instances()
+        cluster._ec2_client.get_paginator.assert_not_called()
+        assert next(iterator).id == "i-web-01"
+
+    def test_get_snapshots_label_filter(self, cluster):
+        paginator = cluster._ec2_client.get_paginator.return_value
+        paginator.paginate.return_value = [{"Snapshots": [{"SnapshotId": "snap-1"}]}]
+        result = cluster.get_snapshots("daily")
+        assert [s.id for s in result] == ["snap-1"]
+        cluster._ec2_client.get_paginator.assert_called_once_with("describe_snapshots")
+        assert {"Name": "tag:Label", "Values": ["daily"]} in self._filters(cluster)
+
+
+class TestClusterSetInventory:
+    def _inventory(self, instances=(), snapshots=(), attached=None):
+        inv = MagicMock(spec=ClusterInventory)
+        inv.tags_of.side_effect = TagSet.from_resource
+        inv.instances = list(instances)
+        inv.snapshots.return_value = list(snapshots)
+        inv.attached_devices.side_effect = lambda iid: (attached or {}).get(iid, {})
+        return inv
+
+    def test_get_inventory_uses_client(self, cluster):
+        inv = cluster.get_inventory()
+        assert isinstance(inv, ClusterInventory)
+        assert inv._ec2_client is cluster._ec2_client
+
+    def test_create_volumes_uses_shared_inventory(self, cluster):
+        instance = {
+            "InstanceId": "i-web-01",
+            "Placement": {"AvailabilityZone": "us-east-1b"},
+            "Tags": [{"Key": "Name", "Value": "web-01"}],
+        }
+        snapshots = [
+            {
+                "SnapshotId": f"snap-{n}",
+                "Tags": [
+                    {"Key": "Device", "Value": f"/dev/sd{n}"},
+                    {"Key": "Instance", "Value": "web-01"},
+                ],
+            }
+            for n in "fg"
+        ]
+        inv = self._inventory(instances=[instance], snapshots=snapshots)
+        cluster._ec2_client.create_volume.side_effect = [
+            {"VolumeId": "vol-f"},
+            {"VolumeId": "vol-g"},
+        ]
+        with patch.object(cluster, "_wait") as wait:
+            cluster.create_volumes("daily", inventory=inv)
+        assert cluster._ec2_client.create_volume.call_count == 2
+        calls = cluster._ec2_client.create_volume.call_args_list
+        assert {c[1]["AvailabilityZone"] for c in calls} == {"us-east-1b"}
+        tags = TagSet(calls[0][1]["TagSpecifications"][0]["Tags"])
+        assert tags.get("Device") == "/dev/sdf"
+        assert tags.get("Label") == "daily"
+        cluster._ec2.instances.filter.assert_not_called()
+        assert wait.call_args[0][:2] == ("volume", ["vol-f", "vol-g"])
+        inv.invalidate.assert_called_once_with("volumes")
+
+    def test_create_volumes_in_each_instance_zone(self, cluster, capsys):
+        instances = [
+            {
+                "InstanceId": f"i-{name}",
+                "Placement": {"AvailabilityZone": az},
+                "Tags": [{"Key": "Name", "Value": name}],
+            }
+            for name, az in [("web-01", "us-east-1a"), ("db-01", "us-east-1c")]
+        ]
+        snapshots = [
+            {
+                "SnapshotId": f"snap-{name}",
+                "Tags": [
+                    {"Key": "Device", "Value": "/dev/sdf"},
+                    {"Key": "Instance", "Value": name},
+                ],
+            }
+            for name in ("web-01", "db-01", "gone-01")
+        ]
+        inv = self._inventory(instances=instances, snapshots=snapshots)
+        cluster._ec2_client.create_volume.side_effect = lambda SnapshotId, **kw: {
+            "VolumeId": SnapshotId.replace("snap", "vol")
+        }
+        with patch.object(cluster, "_wait"):
+            cluster.create_volumes("daily", inventory=inv)
+        zones = {
+            c[1]["SnapshotId"]: c[1]["AvailabilityZone"]
+            for c in cluster._ec2_client.create_volume.call_args_list
+        }
+        assert zones == {"snap-web-01": "us-east-1a", "snap-db-01": "us-east-1c"}
+        assert "No instance named gone-01 for snapshot snap-gone-01" in capsys.readouterr().out
+
+    def test_stop_instances_marks_state(self, cluster):
+        running = {"InstanceId": "i-web-01", "Tags": [{"Key": "Name", "Value": "web-01"}]}
+        inv = self._inventory()
+        inv.instances_in_state.return_value = [running]
+        with patch.object(cluster, "_wait_instances_stopped") as wait:
+            cluster.stop_instances(inventory=inv)
+        cluster._ec2_client.stop_instances.assert_called_once_with(InstanceIds=["i-web-01"])
+        wait.assert_called_once_with(["i-web-01"])
+        inv.mark_state.assert_called_once_with(["i-web-01"], "stopped")
+
+    def test_detach_volumes_uses_attached_devices(self, cluster):
+        instance = {"InstanceId": "i-web-01", "Tags": [{"Key": "Name", "Value": "web-01"}]}
+        volume = {
+            "VolumeId": "vol-1",
+            "Attachments": [{"InstanceId": "i-web-01", "Device": "/dev/sdf"}],
+        }
+        inv = self._inventory(instances=[instance], attached={"i-web-01": {"/dev/sdf": volume}})
+        with patch.object(cluster, "wait_for_volumes"):
+            cluster.detach_volumes(inventory=inv)
+        cluster._ec2_client.detach_volume.assert_called_once_with(
+            Device="/dev/sdf", InstanceId="i-web-01", VolumeId="vol-1"
+        )
+
+    def test_filter_accepts_inventory_dicts(self, cluster):
+        instances = [
+            {"InstanceId": "i-1", "Tags": [{"Key": "Name", "Value": "web-01"}]},
+            {"InstanceId": "i-2", "Tags": [{"Key": "Name", "Value": "db-01"}]},
+        ]
+        result = cluster._filter_instances_by_name_regex(instances, "web")
+        assert [i["InstanceId"] for i in result] == ["i-1"]
+
+
+class TestClusterSetAttachPlan:
+    def _inventory(self, instances, volumes):
+        inv = MagicMock(spec=ClusterInventory)
+        inv.tags_of.side_effect = TagSet.from_resource
+        inv.instances = instances
+        inv.restored_volumes.return_value = volumes
+        return inv
+
+    def _volume(self, vol_id, instance, device):
+        return {
+            "VolumeId": vol_id,
+            "Tags": [
+                {"Key": "Instance", "Value": instance},
+                {"Key": "Device", "Value": device},
+            ],
+        }
+
+    def _instance(self, name):
+        return {"InstanceId": f"i-{name}", "Tags": [{"Key": "Name", "Value": name}]}
+
+    def test_attach_volumes_runs_plan(self, cluster):
+        inv = self._inventory(
+            [self._instance("web-01")], [self._volume("vol-1", "web-01", "/dev/sdf")]
+        )
+        with patch.object(cluster, "wait_for_volumes") as wait:
+            cluster.attach_volumes("daily", inventory=inv)
+        cluster._ec2_client.attach_volume.assert_called_once_with(
+            Device="/dev/sdf", InstanceId="i-web-01", VolumeId="vol-1"
+        )
+        wait.assert_called_once_with(["vol-1"], "volume_in_use")
+
+    def test_attach_volumes_conflict_attaches_nothing(self, cluster, capsys):
+        inv = self._inventory(
+            [self._instance("web-01")],
+            [
+                self._volume("vol-1", "web-01", "/dev/sdf"),
+                self._volume("vol-2", "web-01", "/dev/sdf"),
+            ],
+        )
+        with pytest.raises(Exception, match="conflicting volumes"):
+            cluster.attach_volumes("daily", inventory=inv)
+        cluster._ec2_client.attach_volume.assert_not_called()
+        assert "vol-1, vol-2" in capsys.readouterr().out
+
+    def test_targeted_plan_ignores_other_instances_volumes(self, cluster):
+        inv = self._inventory(
+            [self._instance("web-01"), self._instance("db-01")],
+            [
+                self._volume("vol-1", "web-01", "/dev/sdf"),
+                self._volume("vol-2", "db-01", "/dev/sdf"),
+            ],
+        )
+        plan = cluster.plan_attachments("daily", "web", inventory=inv)
+        assert [a.volume_id for a in plan.attachments] == ["vol-1"]
+        assert plan.unmatched == []
+
+
+class TestClusterSetConcurrency:
+    def test_concurrency_configurable(self):
+        with patch("boto3.Session"):
+            cs = ClusterSet("test1", concurrency=4)
+        assert cs.concurrency == 4
+        assert cs._executor.max_workers == 4
+
+    def test_delete_volumes_in_background(self, cluster):
+        inv = MagicMock(spec=ClusterInventory)
+        inv.volumes = [{"VolumeId": f"vol-{n}"} for n in range(3)]
+
+        def delete_volume(VolumeId):
+            if VolumeId == "vol-1":
+                raise RuntimeError("AuthFailure")
+
+        cluster._ec2_client.delete_volume.side_effect = delete_volume
+        with patch.object(cluster, "wait_for_volumes") as wait:
+            cluster.delete_volumes(inventory=inv)
+        wait.assert_not_called()
+        inv.invalidate.assert_called_once_with("volumes")
+        with pytest.raises(Exception, match="deletions: 1 of 3 deletions failed"):
+            cluster.deletions.drain()
+        assert cluster._ec2_client.delete_volume.call_count == 3
+        assert sorted(cluster.deletions.deleted) == [("volume", "vol-0"), ("volume", "vol-2")]
+
+    def test_create_volumes_validates_before_creating(self, cluster):
+        inv = MagicMock(spec=ClusterInventory)
+        inv.tags_of.side_effect = TagSet.from_resource
+        inv.instances = [{"Placement": {"AvailabilityZone": "us-east-1a"}}]
+        inv.snapshots.return_value = [
+            {
+                "SnapshotId": "snap-ok",
+                "Tags": [
+                    {"Key": "Device", "Value": "/dev/sdf"},
+                    {"Key": "Instance", "Value": "web-01"},
+                ],
+            },
+            {"SnapshotId": "snap-bad", "Tags": [{"Key": "Instance", "Value": "web-01"}]},
+        ]
+        with pytest.raises(Exception, match="Can't find device tag for snapshot snap-bad"):
+            cluster.create_volumes("daily", inventory=inv)
+        cluster._ec2_client.create_volume.assert_not_called()
+
+
+def client_error(code):
+    return ClientError({"Error": {"Code": code, "Message": code}}, "StartInstances")
+
+
+class TestClusterSetInstanceBatches:
+    def _inventory(self, count):
+        instances = [
+            {"InstanceId": f"i-{n:03}", "Tags": [{"Key": "Name", "Value": f"node-{n}"}]}
+            for n in range(count)
+        ]
+        inv = MagicMock(spec=ClusterInventory)
+        inv.tags_of.side_effect = TagSet.from_resource
+        inv.instances_in_state.return_value = instances
+        return inv
+
+    def test_start_instances_chunked(self, cluster):
+        inv = self._inventory(120)
+        with patch.object(cluster, "_wait_instances_running") as wait:
+            cluster.start_instances(inventory=inv)
+        calls = cluster._ec2_client.start_instances.call_args_list
+        assert sorted(len(c[1]["InstanceIds"]) for c in calls) == [20, 50, 50]
+        assert len(wait.call_args[0][0]) == 120
+        inv.mark_state.assert_called_once()
+
+    def test_capacity_error_retried_per_instance(self, cluster):
+        inv = self._inventory(3)
+        attempts = {"i-001": 0}
+
+        def start_instances(InstanceIds):
+            if "i-001" in InstanceIds:
+                attempts["i-001"] += 1
+                if len(InstanceIds) > 1 or attempts["i-001"] < 3:
+                    raise client_error("InsufficientInstanceCapacity")
+            return {"StartingInstances": []}
+
+        cluster._ec2_client.start_instances.side_effect = start_instances
+        with (
+            patch.object(cluster, "_wait_instances_running") as wait,
+            patch("tagmania.iac_tools.clusterset.time.sleep") as sleep,
+        ):
+            cluster.start_instances(inventory=inv)
+        assert sorted(wait.call_args[0][0]) == ["i-000", "i-001", "i-002"]
+        assert [c[0][0] for c in sleep.call_args_list] == [15]
+        assert attempts["i-001"] == 3
+
+    def test_other_errors_reported_per_instance(self, cluster):
+        inv = self._inventory(3)
+
+        def stop_instances(InstanceIds):
+            if "i-002" in InstanceIds:
+                raise client_error("IncorrectInstanceState")
+            return {"StoppingInstances": []}
+
+        cluster._ec2_client.stop_instances.side_effect = stop_instances
+        with (
+            patch.object(cluster, "_wait_instances_stopped") as wait,
+            pytest.raises(Exception, match="stop_instances: 1 of 3 operations failed"),
+        ):
+            cluster.stop_instances(inventory=inv)
+        wait.assert_called_once_with(["i-000", "i-001"])
+        inv.mark_state.assert_called_once_with(["i-000", "i-001"], "stopped")
+
+
+def tagged(id_key, resource_id, **tags):
+    return {id_key: resource_id, "Tags": [{"Key": k, "Value": v} for k, v in tags.items()]}
+
+
+class TestClusterSetBulkTagging:
+    def test_tag_resources_chunks_across_kinds(self, cluster, capsys):
+        resources = {
+            "instances": [tagged("InstanceId", f"i-{n}") for n in range(300)],
+            "volumes": [tagged("VolumeId", f"vol-{n}") for n in range(300)],
+            "snapshots": [tagged("SnapshotId", f"snap-{n}", VolumeId="x") for n in range(500)],
+        }
+        tags = [{"Key": "Env", "Value": "prod"}]
+        with patch.object(cluster, "get_taggable_resources", return_value=resources):
+            cluster.tag_resources(tags)
+        calls = cluster._ec2_client.create_tags.call_args_list
+        assert sorted(len(c[1]["Resources"]) for c in calls) == [100, 500, 500]
+        ids = {r for c in calls for r in c[1]["Resources"]}
+        assert len(ids) == 1100
+        assert "snap-0" in ids
+        assert all(c[1]["Tags"] == tags for c in calls)
+        assert "1100 resources changed, 0 already up to date" in capsys.readouterr().out
+
+    def test_tag_resources_skips_up_to_date(self, cluster, capsys):
+        resources = {
+            "instances": [
+                tagged("InstanceId", "i-done", Env="prod", Owner="team"),
+                tagged("InstanceId", "i-stale", Env="dev", Owner="team"),
+            ],
+            "volumes": [tagged("VolumeId", "vol-new")],
+            "snapshots": [],
+        }
+        tags = [{"Key": "Env", "Value": "prod"}, {"Key": "Owner", "Value": "team"}]
+        with patch.object(cluster, "get_taggable_resources", return_value=resources):
+            cluster.tag_resources(tags)
+        calls = {
+            tuple(c[1]["Resources"]): c[1]["Tags"]
+            for c in cluster._ec2_client.create_tags.call_args_list
+        }
+        assert calls == {
+            ("i-stale",): [{"Key": "Env", "Value": "prod"}],
+            ("vol-new",): tags,
+        }
+        out = capsys.readouterr().out
+        assert "Tagging 1 of 2 instances" in out
+        assert "2 resources changed, 1 already up to date" in out
+
+    def test_all_up_to_date_makes_no_calls(self, cluster):
+        resources = {"instances": [tagged("InstanceId", "i-1", Env="prod")]}
+        with patch.object(cluster, "get_taggable_resources", return_value=resources):
+            cluster.tag_resources([{"Key": "Env", "Value": "prod"}])
+        cluster._ec2_client.create_tags.assert_not_called()
+
+    def test_untag_only_present_keys(self, cluster):
+        resources = {
+            "instances": [tagged("InstanceId", "i-1", Env="prod", Temp="x")],
+            "volumes": [tagged("VolumeId", "vol-1", Temp="y"), tagged("VolumeId", "vol-2")],
+            "snapshots": [],
+        }
+        with patch.object(cluster, "get_taggable_resources", return_value=resources):
+            cluster.untag_resources([{"Key": "Env"}, {"Key": "Temp"}])
+        calls = {
+            tuple(c[1]["Resources"]): c[1]["Tags"]
+            for c in cluster._ec2_client.delete_tags.call_args_list
+        }
+        assert calls == {
+            ("i-1",): [{"Key": "Env"}, {"Key": "Temp"}],
+            ("vol-1",): [{"Key": "Temp"}],
+        }
+
+    def test_untag_with_value_only_matching(self, cluster):
+        resources = {
+            "instances": [
+                tagged("InstanceId", "i-1", Env="prod"),
+                tagged("InstanceId", "i-2", Env="dev"),
+            ],
+        }
+        with patch.object(cluster, "get_taggable_resources", return_value=resources):
+            cluster.untag_resources([{"Key": "Env", "Value": "dev"}])
+        cluster._ec2_client.delete_tags.assert_called_once_with(
+            Resources=["i-2"], Tags=[{"Key": "Env", "Value": "dev"}]
+        )
+
+    def test_failed_chunk_reported(self, cluster):
+        cluster._ec2_client.create_tags.side_effect = RuntimeError("TagLimitExceeded")
+        volume = VolumeRecord({"VolumeId": "vol-1", "Tags": []})
+        with (
+            patch.object(cluster, "iter_volumes", return_value=iter([volume])),
+            pytest.raises(Exception, match="create_tags: 1 of 1 operations failed"),
+        ):
+            cluster.tag_volumes([{"Key": "Env", "Value": "prod"}])
+
+
+class TestClusterSetRestorePipeline:
+    def _snapshot(self, snap_id, instance, device):
+        return {
+            "SnapshotId": snap_id,
+            "Tags": [
+                {"Key": "Device", "Value": device},
+                {"Key": "Instance", "Value": instance},
+            ],
+        }
+
+    def _inventory(self, names, snapshots, volumes=()):
+        instances = [
+            {
+                "InstanceId": f"i-{name}",
+                "State": {"Name": "running"},
+                "Placement": {"AvailabilityZone": f"az-{name}"},
+                "Tags": [{"Key": "Name", "Value": name}],
+            }
+            for name in names
+        ]
+        attached = {f"i-{name}": {"/dev/sdf": {"VolumeId": f"vol-old-{name}"}} for name in names}
+        inv = MagicMock(spec=ClusterInventory)
+        inv.tags_of.side_effect = TagSet.from_resource
+        inv.instances = instances
+        inv.snapshots.return_value = snapshots
+        inv.attached_devices.side_effect = lambda iid: attached.get(iid, {})
+        inv.volumes = [{"VolumeId": f"vol-old-{name}"} for name in names] + list(volumes)
+        return inv
+
+    def _run(self, cluster, inv, **kwargs):
+        cluster._ec2_client.create_volume.side_effect = lambda SnapshotId, **kw: {
+            "VolumeId": SnapshotId.replace("snap", "vol-new")
+        }
+        with (
+            patch.object(cluster, "_wait") as wait,
+            patch.object(cluster, "wait_for_volumes"),
+            patch.object(cluster, "_wait_instances_stopped"),
+        ):
+            cluster.restore_pipelined("daily", inventory=inv, **kwargs)
+        cluster.deletions.drain()
+        return wait
+
+    def test_each_instance_runs_its_own_chain(self, cluster):
+        inv = self._inventory(
+            ["web", "db"],
+            [
+                self._snapshot("snap-web", "web", "/dev/sdf"),
+                self._snapshot("snap-db", "db", "/dev/sdf"),
+            ],
+        )
+        self._run(cluster, inv)
+        client = cluster._ec2_client
+        assert sorted(c[1]["InstanceIds"][0] for c in client.stop_instances.call_args_list) == [
+            "i-db",
+            "i-web",
+        ]
+        assert sorted(c[1]["VolumeId"] for c in client.delete_volume.call_args_list) == [
+            "vol-old-db",
+            "vol-old-web",
+        ]
+        creates = {c[1]["SnapshotId"]: c[1] for c in client.create_volume.call_args_list}
+        assert creates["snap-db"]["AvailabilityZone"] == "az-db"
+        attaches = {
+            c[1]["VolumeId"]: c[1]["InstanceId"] for c in client.attach_volume.call_args_list
+        }
+        assert attaches == {"vol-new-web": "i-web", "vol-new-db": "i-db"}
+        inv.invalidate.assert_called_once_with()
+
+    def test_conflicting_snapshots_change_nothing(self, cluster):
+        inv = self._inventory(
+            ["web"],
+            [
+                self._snapshot("snap-1", "web", "/dev/sdf"),
+                self._snapshot("snap-2", "web", "/dev/sdf"),
+            ],
+        )
+        with pytest.raises(Exception, match="snap-1 and snap-2 both claim /dev/sdf on web"):
+            self._run(cluster, inv)
+        cluster._ec2_client.stop_instances.assert_not_called()
+
+    def test_no_snapshots_changes_nothing(self, cluster, capsys):
+        inv = self._inventory(["web"], [])
+        self._run(cluster, inv)
+        cluster._ec2_client.stop_instances.assert_not_called()
+        assert "No snapshots found with label 'daily'" in capsys.readouterr().out
+
+    def test_failed_instance_does_not_stop_others(self, cluster):
+        inv = self._inventory(
+            ["web", "db"],
+            [
+                self._snapshot("snap-web", "web", "/dev/sdf"),
+                self._snapshot("snap-db", "db", "/dev/sdf"),
+            ],
+        )
+
+        def detach_volume(VolumeId, **kwargs):
+            if VolumeId == "vol-old-web":
+                raise RuntimeError("IncorrectState")
+
+        cluster._ec2_client.detach_volume.side_effect = detach_volume
+        with pytest.raises(Exception, match="restore: 1 of 2 operations failed"):
+            self._run(cluster, inv)
+        attached = [c[1]["VolumeId"] for c in cluster._ec2_client.attach_volume.call_args_list]
+        assert attached == ["vol-new-db"]
+
+    def test_targeted_sweeps_only_matching_leftovers(self, cluster):
+        stale = [
+            {"VolumeId": "vol-stale-web", "Tags": [{"Key": "Instance", "Value": "web-old"}]},
+            {"VolumeId": "vol-stale-db", "Tags": [{"Key": "Instance", "Value": "db-old"}]},
+        ]
+        inv = self._inventory(
+            ["web", "db"],
+            [
+                self._snapshot("snap-web", "web", "/dev/sdf"),
+                self._snapshot("snap-db", "db", "/dev/sdf"),
+            ],
+            volumes=stale,
+        )
+        with patch.object(cluster, "_delete_volume_ids") as sweep:
+            self._run(cluster, inv, name_pattern="web")
+        sweep.assert_called_once_with(["vol-stale-web"])
+        stopped = [c[1]["InstanceIds"] for c in cluster._ec2_client.stop_instances.call_args_list]
+        assert stopped == [["i-web"]]
+
+    def test_fast_restore_before_stopping(self, cluster):
+        inv = self._inventory(["web"], [self._snapshot("snap-web", "web", "/dev/sdf")])
+        events = []
+        fast = MagicMock()
+        fast.ready = {"snap-web"}
+        fast.enable.side_effect = lambda zones: events.append(("enable", zones))
+        fast.disable.side_effect = lambda: events.append(("disable",))
+        cluster._ec2_client.stop_instances.side_effect = lambda **kw: events.append(("stop",))
+        with patch("tagmania.iac_tools.clusterset.FastRestore", return_value=fast):
+            self._run(cluster, inv, fast_restore=True)
+        assert events == [("enable", {"snap-web": {"az-web"}}), ("stop",), ("disable",)]
+        request = cluster._ec2_client.create_volume.call_args[1]
+        assert "VolumeInitializationRate" not in request
+
+    def test_policy_keeps_skipped_devices(self, cluster):
+        inv = self._inventory(
+            ["web"],
+            [
+                self._snapshot("snap-root", "web", "/dev/sda1"),
+                self._snapshot("snap-data", "web", "/dev/sdf"),
+            ],
+        )
+        root = {"VolumeId": "vol-root-web", "Size": 8}
+        inv.attached_devices.side_effect = lambda iid: {
+            "/dev/sda1": root,
+            "/dev/sdf": {"VolumeId": "vol-old-web", "Size": 100},
+        }
+        inv.instances[0]["RootDeviceName"] = "/dev/sda1"
+        inv.instance_by_name.side_effect = lambda name: inv.instances[0] if name == "web" else None
+        self._run(cluster, inv, policy=DevicePolicy(exclude_root=True))
+        client = cluster._ec2_client
+        assert [c[1]["VolumeId"] for c in client.detach_volume.call_args_list] == ["vol-old-web"]
+        assert [c[1]["SnapshotId"] for c in client.create_volume.call_args_list] == ["snap-data"]
+
+    def test_policy_keeps_attached_volumes_without_device_tag(self, cluster):
+        # A provisioner root volume tagged with its instance but not its device
+        root = {
+            "VolumeId": "vol-root-web",
+            "Size": 8,
+            "Attachments": [{"InstanceId": "i-web", "Device": "/dev/sda1"}],
+            "Tags": [{"Key": "Instance", "Value": "web"}],
+        }
+        inv = self._inventory(
+            ["web"], [self._snapshot("snap-data", "web", "/dev/sdf")], volumes=[root]
+        )
+        inv.attached_devices.side_effect = lambda iid: {
+            "/dev/sda1": root,
+            "/dev/sdf": {"VolumeId": "vol-old-web", "Size": 100},
+        }
+        inv.instances[0]["RootDeviceName"] = "/dev/sda1"
+        inv.instance_by_name.side_effect = lambda name: inv.instances[0] if name == "web" else None
+        with patch.object(cluster, "_delete_volume_ids") as sweep:
+            self._run(cluster, inv, policy=DevicePolicy(exclude_root=True))
+        client = cluster._ec2_client
+        assert [c[1]["VolumeId"] for c in client.delete_volume.call_args_list] == ["vol-old-web"]
+        sweep.assert_not_called()
+
+    def test_attached_volumes_are_not_swept(self, cluster):
+        other = {
+            "VolumeId": "vol-other",
+            "Attachments": [{"InstanceId": "i-db"}],
+            "Tags": [{"Key": "Instance", "Value": "db"}, {"Key": "Device", "Value": "/dev/sdf"}],
+        }
+        inv = self._inventory(
+            ["web"], [self._snapshot("snap-web", "web", "/dev/sdf")], volumes=[other]
+        )
+        with patch.object(cluster, "_delete_volume_ids") as sweep:
+            self._run(cluster, inv)
+        sweep.assert_not_called()
+
+
+class TestClusterSetStagedRestore:
+    def _staged(self, vol_id, instance, device, state="available"):
+        return {
+            "VolumeId": vol_id,
+            "State": state,
+            "Attachments": [],
+            "Tags": [
+                {"Key": "Device", "Value": device},
+                {"Key": "Instance", "Value": instance},
+            ],
+        }
+
+    def _inventory(self, names, staged=(), snapshots=(), state="running"):
+        inv = TestClusterSetRestorePipeline()._inventory(names, list(snapshots))
+        for instance in inv.instances:
+            instance["State"]["Name"] = state
+        inv.volumes += list(staged)
+        inv.restored_volumes.return_value = list(staged)
+        return inv
+
+    def _cutover(self, cluster, inv, **kwargs):
+        with (
+            patch.object(cluster, "wait_for_volumes"),
+            patch.object(cluster, "_wait_instances_stopped"),
+            patch.object(cluster, "_wait_instances_running"),
+        ):
+            cluster.cutover("daily", inventory=inv, **kwargs)
+        cluster.deletions.drain()
+
+    def test_stage_keeps_instances_running(self, cluster):
+        snapshot = TestClusterSetRestorePipeline()._snapshot("snap-web", "web", "/dev/sdf")
+        stale = self._staged("vol-staged-web", "web", "/dev/sdf")
+        inv = self._inventory(["web"], staged=[stale], snapshots=[snapshot])
+        cluster._ec2_client.create_volume.return_value = {"VolumeId": "vol-new-web"}
+        with (
+            patch.object(cluster, "_wait"),
+            patch.object(cluster, "_delete_volume_ids") as delete,
+        ):
+            cluster.stage_restore("daily", inventory=inv)
+        delete.assert_called_once_with(["vol-staged-web"], inv)
+        request = cluster._ec2_client.create_volume.call_args[1]
+        assert request["SnapshotId"] == "snap-web"
+        assert request["AvailabilityZone"] == "az-web"
+        cluster._ec2_client.stop_instances.assert_not_called()
+        cluster._ec2_client.detach_volume.assert_not_called()
+
+    def test_cutover_swaps_staged_volumes(self, cluster):
+        inv = self._inventory(
+            ["web", "db"],
+            staged=[
+                self._staged("vol-staged-web", "web", "/dev/sdf"),
+                self._staged("vol-staged-db", "db", "/dev/sdf"),
+                self._staged("vol-creating", "db", "/dev/sdg", state="creating"),
+            ],
+        )
+        self._cutover(cluster, inv)
+        client = cluster._ec2_client
+        client.create_volume.assert_not_called()
+        assert sorted(c[1]["VolumeId"] for c in client.detach_volume.call_args_list) == [
+            "vol-old-db",
+            "vol-old-web",
+        ]
+        attaches = {
+            c[1]["VolumeId"]: c[1]["InstanceId"] for c in client.attach_volume.call_args_list
+        }
+        assert attaches == {"vol-staged-web": "i-web", "vol-staged-db": "i-db"}
+        assert sorted(c[1]["InstanceIds"][0] for c in client.start_instances.call_args_list) == [
+            "i-db",
+            "i-web",
+        ]
+        assert sorted(c[1]["VolumeId"] for c in client.delete_volume.call_args_list) == [
+            "vol-old-db",
+            "vol-old-web",
+        ]
+        inv.invalidate.assert_called_once_with()
+
+    def test_cutover_leaves_stopped_instances_stopped(self, cluster):
+        inv = self._inventory(
+            ["web"], staged=[self._staged("vol-staged-web", "web", "/dev/sdf")], state="stopped"
+        )
+        self._cutover(cluster, inv)
+        cluster._ec2_client.stop_instances.assert_not_called()
+        cluster._ec2_client.start_instances.assert_not_called()
+        cluster._ec2_client.attach_volume.assert_called_once()
+
+    def test_cutover_without_staged_volumes(self, cluster, capsys):
+        inv = self._inventory(["web"])
+        self._cutover(cluster, inv)
+        cluster._ec2_client.stop_instances.assert_not_called()
+        assert "No staged volumes found with label 'daily'" in capsys.readouterr().out
+
+    def test_failed_cutover_keeps_replaced_volumes(self, cluster):
+        inv = self._inventory(["web"], staged=[self._staged("vol-staged-web", "web", "/dev/sdf")])
+        cluster._ec2_client.start_instances.side_effect = RuntimeError("InsufficientCapacity")
+        with pytest.raises(Exception, match="cutover: 1 of 1 operations failed"):
+            self._cutover(cluster, inv)
+        cluster.deletions.drain()
+        cluster._ec2_client.attach_volume.assert_called_once()
+        cluster._ec2_client.delete_volume.assert_not_called()
+
+    def test_cutover_conflict_changes_nothing(self, cluster):
+        inv = self._inventory(
+            ["web"],
+            staged=[
+                self._staged("vol-1", "web", "/dev/sdf"),
+                self._staged("vol-2", "web", "/dev/sdf"),
+            ],
+        )
+        with pytest.raises(Exception, match="cutover: conflicting volumes"):
+            self._cutover(cluster, inv)
+        cluster._ec2_client.stop_instances.assert_not_called()
+
+
+class TestClusterSetRollback:
+    def _kept(self, vol_id, instance, device):
+        volume = TestClusterSetStagedRestore()._staged(vol_id, instance, device)
+        volume["Tags"].append({"Key": "Label", "Value": "rollback-daily"})
+        return volume
+
+    def test_restore_keeps_detached_volumes(self, cluster):
+        pipeline = TestClusterSetRestorePipeline()
+        inv = pipeline._inventory(["web"], [pipeline._snapshot("snap-web", "web", "/dev/sdf")])
+        with patch.object(cluster, "_delete_volume_ids") as sweep:
+            pipeline._run(cluster, inv, keep_rollback=True)
+        client = cluster._ec2_client
+        client.delete_volume.assert_not_called()
+        sweep.assert_not_called()
+        tags = client.create_tags.call_args[1]
+        assert tags["Resources"] == ["vol-old-web"]
+        assert {"Key": "Label", "Value": "rollback-daily"} in tags["Tags"]
+        assert {"Key": "Device", "Value": "/dev/sdf"} in tags["Tags"]
+        assert {"Key": "Instance", "Value": "web"} in tags["Tags"]
+
+    def test_rollback_reattaches_kept_volumes(self, cluster):
+        staged = TestClusterSetStagedRestore()
+        inv = staged._inventory(["web"], staged=[self._kept("vol-kept-web", "web", "/dev/sdf")])
+        with (
+            patch.object(cluster, "wait_for_volumes"),
+            patch.object(cluster, "_wait_instances_stopped"),
+            patch.object(cluster, "_wait_instances_running"),
+        ):
+            cluster.rollback("daily", inventory=inv)
+        cluster.deletions.drain()
+        client = cluster._ec2_client
+        inv.restored_volumes.assert_called_once_with("rollback-daily")
+        assert client.detach_volume.call_args[1]["VolumeId"] == "vol-old-web"
+        assert client.attach_volume.call_args[1]["VolumeId"] == "vol-kept-web"
+        client.delete_volume.assert_called_once_with(VolumeId="vol-old-web")
+        client.start_instances.assert_called_once_with(InstanceIds=["i-web"])
+
+    def test_commit_deletes_without_waiting(self, cluster):
+        staged = TestClusterSetStagedRestore()
+        inv = staged._inventory(["web"], staged=[self._kept("vol-kept-web", "web", "/dev/sdf")])
+        with patch.object(cluster, "wait_for_volumes") as wait:
+            cluster.commit_restore("daily", inventory=inv)
+        cluster.deletions.drain()
+        cluster._ec2_client.delete_volume.assert_called_once_with(VolumeId="vol-kept-web")
+        wait.assert_not_called()
+
+    def test_nothing_to_roll_back(self, cluster, capsys):
+        inv = TestClusterSetStagedRestore()._inventory(["web"])
+        cluster.rollback("daily", inventory=inv)
+        cluster._ec2_client.stop_instances.assert_not_called()
+        assert "No rollback volumes found for label 'daily'" in capsys.readouterr().out
+
+
+class FakeWaiter:
+    """Reports every added resource as done, in the order it was added."""
+
+    def __init__(self):
+        self.added = []
+        self.completed = {}
+
+    def add_many(self, kind, resource_ids, target, callback=None):
+        self.added.extend((resource_id, callback) for resource_id in resource_ids)
+
+    def wait(self, timeout=None):
+        for resource_id, callback in self.added:
+            self.completed[resource_id] = None
+            if callback is not None:
+                callback(resource_id, None)
+        return self.completed
+
+
+class TestClusterSetBackupPipeline:
+    def _inventory(self, states):
+        instances = [
+            {
+                "InstanceId": f"i-{name}",
+                "State": {"Name": state},
+                "Tags": [{"Key": "Name", "Value": name}],
+            }
+            for name, state in states.items()
+        ]
+        inv = MagicMock(spec=ClusterInventory)
+        inv.tags_of.side_effect = TagSet.from_resource
+        inv.instances = instances
+        inv.instances_in_state.side_effect = lambda *s: [
+            i for i in instances if i["State"]["Name"] in s
+        ]
+        inv.snapshots.return_value = []
+        inv.attached_devices.side_effect = lambda iid: {
+            "/dev/sdf": {"VolumeId": iid.replace("i-", "vol-")}
+        }
+        return inv
+
+    def _run(self, cluster, inv, **kwargs):
+        client = cluster._ec2_client
+        events = []
+        client.stop_instances.side_effect = lambda InstanceIds: (
+            events.append(("stop", InstanceIds)) or {"StoppingInstances": []}
+        )
+        client.create_snapshot.side_effect = lambda VolumeId, **kw: (
+            events.append(("snapshot", VolumeId)) or {"SnapshotId": VolumeId.replace("vol", "snap")}
+        )
+        client.start_instances.side_effect = lambda InstanceIds: events.append(
+            ("start", InstanceIds)
+        )
+        with (
+            patch.object(cluster, "get_waiter", return_value=FakeWaiter()),
+            patch.object(cluster, "_wait") as wait,
+        ):
+            cluster.backup_pipelined("daily", inventory=inv, **kwargs)
+        return events, wait
+
+    def test_snapshots_each_instance_once_stopped(self, cluster):
+        inv = self._inventory({"web": "running", "db": "stopped"})
+        events, wait = self._run(cluster, inv)
+        # The stopped instance does not wait for the others to stop
+        assert events == [
+            ("snapshot", "vol-db"),
+            ("stop", ["i-web"]),
+            ("snapshot", "vol-web"),
+        ]
+        tags = cluster._ec2_client.create_snapshot.call_args[1]["TagSpecifications"][0]["Tags"]
+        assert {"Key": "Label", "Value": "pending-daily"} in tags
+        wait.assert_called_once_with("snapshot", ["snap-db", "snap-web"], "completed", 3600)
+        inv.invalidate.assert_called_with("snapshots")
+
+    def test_restart_after_snapshots_initiated(self, cluster):
+        inv = self._inventory({"web": "running"})
+        events, _ = self._run(cluster, inv, restart=True)
+        assert events == [
+            ("stop", ["i-web"]),
+            ("snapshot", "vol-web"),
+            ("start", ["i-web"]),
+        ]
+
+    def test_restart_leaves_stopped_instances_stopped(self, cluster):
+        inv = self._inventory({"web": "running", "db": "stopped"})
+        events, _ = self._run(cluster, inv, restart=True)
+        assert [e for e in events if e[0] == "start"] == [("start", ["i-web"])]
+
+    def test_failed_snapshot_skips_restart(self, cluster):
+        inv = self._inventory({"web": "running", "db": "running"})
+
+        def create_snapshot(VolumeId, **kwargs):
+            if VolumeId == "vol-web":
+                raise RuntimeError("SnapshotCreationPerVolumeRateExceeded")
+            return {"SnapshotId": "snap-db"}
+
+        with (
+            patch.object(cluster, "get_waiter", return_value=FakeWaiter()),
+            patch.object(cluster, "_wait"),
+            patch.object(cluster._ec2_client, "create_snapshot", side_effect=create_snapshot),
+            pytest.raises(Exception, match="backup_pipelined: 1 operations failed"),
+        ):
+            cluster.backup_pipelined("daily", inventory=inv, restart=True)
+        started = [c[1]["InstanceIds"] for c in cluster._ec2_client.start_instances.call_args_list]
+        assert started == [["i-db"]]
+
+
+class TestClusterSetMultiVolumeSnapshots:
+    def _inventory(self, names):
+        instances = [
+            {
+                "InstanceId": f"i-{name}",
+                "State": {"Name": "running"},
+                "RootDeviceName": "/dev/sda1",
+                "Tags": [{"Key": "Name", "Value": name}],
+            }
+            for name in names
+        ]
+        inv = MagicMock(spec=ClusterInventory)
+        inv.tags_of.side_effect = TagSet.from_resource
+        inv.instances = instances
+        inv.snapshots.return_value = []
+        inv.attached_devices.side_effect = lambda iid: {
+            "/dev/sda1": {"VolumeId": iid.replace("i-", "vol-root-")},
+            "/dev/sdf": {"VolumeId": iid.replace("i-", "vol-data-")},
+        }
+        return inv
+
+    def _create_snapshots(self, InstanceSpecification, **kwargs):
+        instance = InstanceSpecification["InstanceId"].replace("i-", "")
+        volumes = [f"vol-data-{instance}"]
+        if not InstanceSpecification["ExcludeBootVolume"]:
+            volumes.insert(0, f"vol-root-{instance}")
+        return {
+            "Snapshots": [{"VolumeId": v, "SnapshotId": v.replace("vol", "snap")} for v in volumes]
+        }
+
+    def test_one_call_per_instance(self, cluster):
+        inv = self._inventory(["web", "db"])
+        client = cluster._ec2_client
+        client.create_snapshots.side_effect = self._create_snapshots
+        with patch.object(cluster, "_wait") as wait:
+            cluster.create_snapshots("daily", inventory=inv, multi_volume=True)
+        assert client.create_snapshots.call_count == 2
+        client.create_snapshot.assert_not_called()
+        call = client.create_snapshots.call_args_list[0][1]
+        assert call["InstanceSpecification"] == {"InstanceId": "i-web", "ExcludeBootVolume": False}
+        tags = TagSet(call["TagSpecifications"][0]["Tags"])
+        assert tags.get("Label") == "pending-daily"
+        assert tags.get("Instance") == "web"
+        assert tags.get("Device") is None
+        # Device tags are added with one call per device name
+        device_tags = {
+            c[1]["Tags"][0]["Value"]: sorted(c[1]["Resources"])
+            for c in client.create_tags.call_args_list
+            if c[1]["Tags"][0]["Key"] == "Device"
+        }
+        assert device_tags == {
+            "/dev/sda1": ["snap-root-db", "snap-root-web"],
+            "/dev/sdf": ["snap-data-db", "snap-data-web"],
+        }
+        assert sorted(wait.call_args[0][1]) == [
+            "snap-data-db",
+            "snap-data-web",
+            "snap-root-db",
+            "snap-root-web",
+        ]
+
+    def test_exclude_root(self, cluster):
+        inv = self._inventory(["web"])
+        client = cluster._ec2_client
+        client.create_snapshots.side_effect = self._create_snapshots
+        with patch.object(cluster, "_wait"):
+            cluster.create_snapshots(
+                "daily", inventory=inv, multi_volume=True, policy=DevicePolicy(exclude_root=True)
+            )
+        spec = client.create_snapshots.call_args[1]["InstanceSpecification"]
+        assert spec["ExcludeBootVolume"] is True
+        tagged = [c[1]["Tags"][0] for c in client.create_tags.call_args_list]
+        assert tagged == [
+            {"Key": "Device", "Value": "/dev/sdf"},
+            {"Key": "Label", "Value": "daily"},
+        ]
+
+    def test_skipped_data_volumes_excluded(self, cluster):
+        inv = self._inventory(["web"])
+        client = cluster._ec2_client
+        client.create_snapshots.return_value = {
+            "Snapshots": [{"VolumeId": "vol-root-web", "SnapshotId": "snap-root-web"}]
+        }
+        with patch.object(cluster, "_wait"):
+            cluster.create_snapshots(
+                "daily", inventory=inv, multi_volume=True, policy=DevicePolicy(exclude="sdf")
+            )
+        spec = client.create_snapshots.call_args[1]["InstanceSpecification"]
+        assert spec == {
+            "InstanceId": "i-web",
+            "ExcludeBootVolume": False,
+            "ExcludeDataVolumes": ["vol-data-web"],
+        }
+
+    def test_exclude_root_single_volume_mode(self, cluster):
+        inv = self._inventory(["web"])
+        client = cluster._ec2_client
+        client.create_snapshot.return_value = {"SnapshotId": "snap-1"}
+        with patch.object(cluster, "_wait"):
+            cluster.create_snapshots("daily", inventory=inv, policy=DevicePolicy(exclude_root=True))
+        assert [c[1]["VolumeId"] for c in client.create_snapshot.call_args_list] == ["vol-data-web"]
+
+    def test_failed_device_tagging_is_reported(self, cluster):
+        inv = self._inventory(["web"])
+        client = cluster._ec2_client
+        client.create_snapshots.side_effect = self._create_snapshots
+        client.create_tags.side_effect = RuntimeError("RequestLimitExceeded")
+        with (
+            patch.object(cluster, "_wait"),
+            pytest.raises(Exception, match="create_snapshots: 2 of 3 operations failed"),
+        ):
+            cluster.create_snapshots("daily", inventory=inv, multi_volume=True)
+
+    def test_volume_attached_after_inventory(self, cluster):
+        inv = self._inventory(["web"])
+        client = cluster._ec2_client
+        client.create_snapshots.return_value = {
+            "Snapshots": [
+                {"VolumeId": "vol-root-web", "SnapshotId": "snap-root-web"},
+                {"VolumeId": "vol-new", "SnapshotId": "snap-new"},
+                {"VolumeId": "vol-gone", "SnapshotId": "snap-gone"},
+            ]
+        }
+        client.describe_volumes.return_value = {
+            "Volumes": [
+                {"VolumeId": "vol-new", "Attachments": [{"Device": "/dev/sdg"}]},
+                {"VolumeId": "vol-gone", "Attachments": []},
+            ]
+        }
+        with patch.object(cluster, "_wait") as wait:
+            cluster.create_snapshots("daily", inventory=inv, multi_volume=True)
+        client.describe_volumes.assert_called_once_with(VolumeIds=["vol-gone", "vol-new"])
+        device_tags = {
+            c[1]["Tags"][0]["Value"]: c[1]["Resources"]
+            for c in client.create_tags.call_args_list
+            if c[1]["Tags"][0]["Key"] == "Device"
+        }
+        assert device_tags == {"/dev/sda1": ["snap-root-web"], "/dev/sdg": ["snap-new"]}
+        # Every snapshot is still waited for and promoted
+        assert sorted(wait.call_args[0][1]) == ["snap-gone", "snap-new", "snap-root-web"]
+
+    def test_failed_device_lookup_does_not_raise(self, cluster):
+        inv = self._inventory(["web"])
+        client = cluster._ec2_client
+        client.create_snapshots.return_value = {
+            "Snapshots": [{"VolumeId": "vol-new", "SnapshotId": "snap-new"}]
+        }
+        client.describe_volumes.side_effect = RuntimeError("InvalidVolume.NotFound")
+        with patch.object(cluster, "_wait") as wait:
+            cluster.create_snapshots("daily", inventory=inv, multi_volume=True)
+        assert wait.call_args[0][1] == ["snap-new"]
+
+
+class TestClusterSetLabelRotation:
+    def _inventory(self, old=()):
+        inv = TestClusterSetMultiVolumeSnapshots()._inventory(["web"])
+        inv.snapshots.side_effect = lambda label: [
+            {"SnapshotId": snapshot_id} for snapshot_id in old if label == "daily"
+        ]
+        return inv
+
+    def test_previous_snapshots_deleted_after_relabel(self, cluster):
+        inv = self._inventory(old=["snap-old"])
+        client = cluster._ec2_client
+        events = []
+        client.create_snapshot.side_effect = lambda VolumeId, **kw: {
+            "SnapshotId": VolumeId.replace("vol", "snap")
+        }
+        client.create_tags.side_effect = lambda Resources, Tags: events.append(
+            ("tag", sorted(Resources), Tags)
+        )
+        client.delete_snapshot.side_effect = lambda SnapshotId: events.append(
+            ("delete", SnapshotId)
+        )
+        with patch.object(cluster, "_wait"):
+            cluster.create_snapshots("daily", inventory=inv)
+        cluster.deletions.drain()
+        assert events == [
+            (
+                "tag",
+                ["snap-data-web", "snap-root-web"],
+                [{"Key": "Label", "Value": "daily"}],
+            ),
+            ("delete", "snap-old"),
+        ]
+
+    def test_failed_backup_keeps_previous_snapshots(self, cluster):
+        inv = self._inventory(old=["snap-old"])
+        client = cluster._ec2_client
+        client.create_snapshot.side_effect = RuntimeError("SnapshotLimitExceeded")
+        with patch.object(cluster, "_wait"), pytest.raises(Exception, match="create_snapshot"):
+            cluster.create_snapshots("daily", inventory=inv)
+        client.create_tags.assert_not_called()
+        client.delete_snapshot.assert_not_called()
+
+    def test_failed_relabel_keeps_previous_snapshots(self, cluster):
+        inv = self._inventory(old=["snap-old"])
+        client = cluster._ec2_client
+        client.create_snapshot.side_effect = lambda VolumeId, **kw: {
+            "SnapshotId": VolumeId.replace("vol", "snap")
+        }
+        client.create_tags.side_effect = RuntimeError("RequestLimitExceeded")
+        with (
+            patch.object(cluster, "_wait"),
+            pytest.raises(Exception, match="previous snapshots are kept"),
+        ):
+            cluster.create_snapshots("daily", inventory=inv)
+        client.delete_snapshot.assert_not_called()
+
+    def test_leftover_pending_snapshots_are_superseded(self, cluster):
+        inv = self._inventory()
+        client = cluster._ec2_client
+        # An interrupted backup leaves snapshots in any state
+        client.get_paginator.return_value.paginate.return_value = [
+            {
+                "Snapshots": [
+                    {"SnapshotId": "snap-partial", "State": "completed"},
+                    {"SnapshotId": "snap-stuck", "State": "pending"},
+                    {"SnapshotId": "snap-broken", "State": "error"},
+                ]
+            }
+        ]
+        client.create_snapshot.return_value = {"SnapshotId": "snap-new"}
+        with patch.object(cluster, "_wait"):
+            cluster.create_snapshots("daily", inventory=inv)
+        cluster.deletions.drain()
+        filters = client.get_paginator.return_value.paginate.call_args[1]["Filters"]
+        assert {"Name": "tag:Label", "Values": ["pending-daily"]} in filters
+        assert "status" not in [f["Name"] for f in filters]
+        deleted = sorted(c[1]["SnapshotId"] for c in client.delete_snapshot.call_args_list)
+        assert deleted == ["snap-broken", "snap-partial", "snap-stuck"]
+
+
+class TestClusterSetRestoreProfile:
+    def _inventory(self, volumes=(), instances=()):
+        inv = MagicMock(spec=ClusterInventory)
+        inv.tags_of.side_effect = TagSet.from_resource
+        inv.volumes = list(volumes)
+        inv.instances = list(instances)
+        return inv
+
+    def test_volume_request_uses_profile(self, cluster):
+        profile = RestoreProfile.parse("rate=0:300/1024:150 type=gp3 baseline-throughput=125")
+        request = cluster._volume_request("/dev/sdf", "web", "daily", "az-a", profile, 2048)
+        assert request["VolumeInitializationRate"] == 150
+        assert request["VolumeType"] == "gp3"
+        tags = TagSet(request["TagSpecifications"][0]["Tags"])
+        assert tags.get("RestoreBaseline") == "baseline-throughput=125"
+
+    def test_cluster_profile_from_instance_tag(self, cluster):
+        tagged = {"Tags": [{"Key": "RestoreProfile", "Value": "rate=200"}]}
+        inv = self._inventory(instances=[{"Tags": []}, tagged])
+        assert cluster.get_restore_profile(inventory=inv).initialization_rate(10) == 200
+        assert cluster.get_restore_profile(inventory=self._inventory()) is None
+
+    def test_settle_only_initialized_volumes(self, cluster, capsys):
+        baseline = [{"Key": "RestoreBaseline", "Value": "baseline-type=gp3 baseline-iops=3000"}]
+        inv = self._inventory(
+            volumes=[
+                {"VolumeId": "vol-1", "Tags": baseline},
+                {"VolumeId": "vol-2", "Tags": baseline},
+                {"VolumeId": "vol-3", "Tags": []},
+            ]
+        )
+        waiter = MagicMock()
+        waiter.completed = {}
+
+        def poll():
+            waiter.completed["vol-1"] = None
+            callback = waiter.add_many.call_args[1]["callback"]
+            callback("vol-1", None)
+
+        waiter.poll.side_effect = poll
+        with patch.object(cluster, "get_waiter", return_value=waiter):
+            cluster.settle_volumes(inventory=inv)
+        assert waiter.add_many.call_args[0][:3] == (
+            "volume_initialization",
+            ["vol-1", "vol-2"],
+            "completed",
+        )
+        client = cluster._ec2_client
+        client.modify_volume.assert_called_once_with(VolumeId="vol-1", VolumeType="gp3", Iops=3000)
+        client.delete_tags.assert_called_once_with(
+            Resources=["vol-1"], Tags=[{"Key": "RestoreBaseline"}]
+        )
+        assert "vol-2 is still initializing" in capsys.readouterr().out
+        waiter.wait.assert_not_called()
+
+    def test_settle_nothing(self, cluster, capsys):
+        cluster.settle_volumes(inventory=self._inventory())
+        assert "No volumes to settle" in capsys.readouterr().out
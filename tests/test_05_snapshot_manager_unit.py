@@ -1,12 +1,14 @@
 from types import SimpleNamespace
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, patch
+
+import pytest
 
 
 def make_instance(name):
-    return SimpleNamespace(
-        id=f"i-{name}",
-        tags=[{"Key": "Name", "Value": name}],
-    )
+    return {
+        "InstanceId": f"i-{name}",
+        "Tags": [{"Key": "Name", "Value": name}],
+    }
 
 
 def make_snapshot(snap_id, label):
@@ -24,16 +26,98 @@ class TestSnapshotManagerBackup:
     @patch("builtins.input", return_value="yes")
     def test_backup_confirmed(self, mock_input, mock_cs_class, capsys):
         mock_cs = MagicMock()
-        mock_cs.get_instances.return_value = [make_instance("web-01")]
+        mock_cs.get_inventory.return_value.instances = [make_instance("web-01")]
         mock_cs_class.return_value = mock_cs
         with patch("sys.argv", ["snap", "--backup", "--name", "daily", "test1"]):
             from tagmania.snapshot_manager import main
 
             main()
-        mock_cs.stop_instances.assert_called_once()
-        mock_cs.create_snapshots.assert_called_once_with("daily")
+        inventory = mock_cs.get_inventory.return_value
+        mock_cs.backup_pipelined.assert_called_once_with(
+            "daily", inventory=inventory, restart=False, policy=ANY
+        )
         assert "Operation completed" in capsys.readouterr().out
 
+    @patch("tagmania.snapshot_manager.ClusterSet")
+    @patch("builtins.input", return_value="yes")
+    def test_backup_restart(self, mock_input, mock_cs_class):
+        mock_cs = MagicMock()
+        mock_cs.get_inventory.return_value.instances = [make_instance("web-01")]
+        mock_cs_class.return_value = mock_cs
+        with patch("sys.argv", ["snap", "--backup", "--restart", "--name", "daily", "test1"]):
+            from tagmania.snapshot_manager import main
+
+            main()
+        mock_cs.backup_pipelined.assert_called_once_with(
+            "daily", inventory=mock_cs.get_inventory.return_value, restart=True, policy=ANY
+        )
+
+    @patch("tagmania.snapshot_manager.ClusterSet")
+    @patch("builtins.input", return_value="yes")
+    def test_backup_crash_consistent(self, mock_input, mock_cs_class):
+        mock_cs = MagicMock()
+        mock_cs.get_inventory.return_value.instances = [make_instance("web-01")]
+        mock_cs_class.return_value = mock_cs
+        argv = ["snap", "--backup", "--crash-consistent", "--exclude-root", "test1"]
+        with patch("sys.argv", argv):
+            from tagmania.snapshot_manager import main
+
+            main()
+        mock_cs.create_snapshots.assert_called_once_with(
+            "default",
+            inventory=mock_cs.get_inventory.return_value,
+            multi_volume=True,
+            policy=ANY,
+        )
+        policy = mock_cs.create_snapshots.call_args[1]["policy"]
+        assert policy.exclude_root is True
+        mock_cs.backup_pipelined.assert_not_called()
+
+    @patch("tagmania.snapshot_manager.ClusterSet")
+    @patch("builtins.input", return_value="yes")
+    def test_backup_device_policy(self, mock_input, mock_cs_class):
+        mock_cs = MagicMock()
+        mock_cs.get_inventory.return_value.instances = [make_instance("web-01")]
+        mock_cs_class.return_value = mock_cs
+        argv = ["snap", "--backup", "--include-device", "sd[f-p]", "--min-size", "10", "test1"]
+        with patch("sys.argv", argv):
+            from tagmania.snapshot_manager import main
+
+            main()
+        policy = mock_cs.backup_pipelined.call_args[1]["policy"]
+        assert policy.selects("/dev/sdf", 20, "/dev/sda1")
+        assert not policy.selects("/dev/sda1", 20, "/dev/sda1")
+        assert not policy.selects("/dev/sdg", 8, "/dev/sda1")
+
+    @patch("tagmania.snapshot_manager.ClusterSet")
+    def test_invalid_device_pattern(self, mock_cs_class):
+        argv = ["snap", "--backup", "--exclude-device", "sd[", "test1"]
+        with patch("sys.argv", argv), pytest.raises(SystemExit):
+            from tagmania.snapshot_manager import main
+
+            main()
+        mock_cs_class.assert_not_called()
+
+    @patch("tagmania.snapshot_manager.ClusterSet")
+    def test_restart_requires_backup(self, mock_cs_class, capsys):
+        argv = ["snap", "--restore", "--restart", "test1"]
+        with patch("sys.argv", argv), pytest.raises(SystemExit):
+            from tagmania.snapshot_manager import main
+
+            main()
+        mock_cs_class.assert_not_called()
+        assert "--restart requires --backup" in capsys.readouterr().err
+
+    @patch("tagmania.snapshot_manager.ClusterSet")
+    def test_crash_consistent_requires_backup(self, mock_cs_class, capsys):
+        argv = ["snap", "--list", "--crash-consistent", "test1"]
+        with patch("sys.argv", argv), pytest.raises(SystemExit):
+            from tagmania.snapshot_manager import main
+
+            main()
+        mock_cs_class.assert_not_called()
+        assert "--crash-consistent requires --backup" in capsys.readouterr().err
+
     @patch("tagmania.snapshot_manager.ClusterSet")
     @patch("builtins.input", return_value="no")
     def test_backup_aborted(self, mock_input, mock_cs_class, capsys):
@@ -43,33 +127,38 @@ class TestSnapshotManagerBackup:
             from tagmania.snapshot_manager import main
 
             main()
-        mock_cs.stop_instances.assert_not_called()
+        mock_cs.backup_pipelined.assert_not_called()
         assert "Operation aborted" in capsys.readouterr().out
 
     @patch("tagmania.snapshot_manager.ClusterSet")
     @patch("builtins.input", return_value="yes")
     def test_backup_no_instances(self, mock_input, mock_cs_class, capsys):
         mock_cs = MagicMock()
-        mock_cs.get_instances.return_value = []
+        mock_cs.get_inventory.return_value.instances = []
         mock_cs_class.return_value = mock_cs
         with patch("sys.argv", ["snap", "--backup", "--name", "daily", "test1"]):
             from tagmania.snapshot_manager import main
 
             main()
-        mock_cs.stop_instances.assert_not_called()
+        mock_cs.backup_pipelined.assert_not_called()
         assert "No instances found" in capsys.readouterr().out
 
     @patch("tagmania.snapshot_manager.ClusterSet")
     @patch("builtins.input", return_value="yes")
     def test_backup_default_name(self, mock_input, mock_cs_class):
         mock_cs = MagicMock()
-        mock_cs.get_instances.return_value = [make_instance("web-01")]
+        mock_cs.get_inventory.return_value.instances = [make_instance("web-01")]
         mock_cs_class.return_value = mock_cs
         with patch("sys.argv", ["snap", "--backup", "test1"]):
             from tagmania.snapshot_manager import main
 
             main()
-        mock_cs.create_snapshots.assert_called_once_with("default")
+        mock_cs.backup_pipelined.assert_called_once_with(
+            "default",
+            inventory=mock_cs.get_inventory.return_value,
+            restart=False,
+            policy=ANY,
+        )
 
 
 class TestSnapshotManagerDelete:
@@ -129,19 +218,89 @@ class TestSnapshotManagerRestore:
     @patch("builtins.input", return_value="yes")
     def test_full_restore(self, mock_input, mock_cs_class, capsys):
         mock_cs = MagicMock()
-        mock_cs.get_instances.return_value = [make_instance("web-01")]
+        mock_cs.get_inventory.return_value.instances = [make_instance("web-01")]
         mock_cs_class.return_value = mock_cs
         with patch("sys.argv", ["snap", "--restore", "--name", "daily", "test1"]):
             from tagmania.snapshot_manager import main
 
             main()
-        mock_cs.stop_instances.assert_called_once()
-        mock_cs.detach_volumes.assert_called_once()
-        mock_cs.delete_volumes.assert_called_once()
-        mock_cs.create_volumes.assert_called_once_with("daily")
-        mock_cs.attach_volumes.assert_called_once_with("daily")
+        inventory = mock_cs.get_inventory.return_value
+        mock_cs.restore_pipelined.assert_called_once_with(
+            "daily",
+            inventory=inventory,
+            policy=ANY,
+            fast_restore=False,
+            profile=ANY,
+            keep_rollback=False,
+        )
         assert "Operation completed" in capsys.readouterr().out
 
+    @patch("tagmania.snapshot_manager.ClusterSet")
+    @patch("builtins.input", return_value="yes")
+    def test_full_restore_fast(self, mock_input, mock_cs_class):
+        mock_cs = MagicMock()
+        mock_cs.get_inventory.return_value.instances = [make_instance("web-01")]
+        mock_cs_class.return_value = mock_cs
+        with patch("sys.argv", ["snap", "--restore", "--fast-restore", "test1"]):
+            from tagmania.snapshot_manager import main
+
+            main()
+        mock_cs.restore_pipelined.assert_called_once_with(
+            "default",
+            inventory=mock_cs.get_inventory.return_value,
+            policy=ANY,
+            fast_restore=True,
+            profile=ANY,
+            keep_rollback=False,
+        )
+
+    @patch("tagmania.snapshot_manager.ClusterSet")
+    @patch("builtins.input", return_value="yes")
+    def test_full_restore_profile(self, mock_input, mock_cs_class, capsys):
+        mock_cs = MagicMock()
+        mock_cs.get_inventory.return_value.instances = [make_instance("web-01")]
+        mock_cs_class.return_value = mock_cs
+        argv = ["snap", "--restore", "--restore-profile", "type=gp3 baseline-type=gp2", "test1"]
+        with patch("sys.argv", argv):
+            from tagmania.snapshot_manager import main
+
+            main()
+        profile = mock_cs.restore_pipelined.call_args[1]["profile"]
+        assert profile.volume == {"VolumeType": "gp3"}
+        mock_cs.get_restore_profile.assert_not_called()
+        assert "cluster-snap --settle test1" in capsys.readouterr().out
+
+    @patch("tagmania.snapshot_manager.ClusterSet")
+    @patch("builtins.input", return_value="yes")
+    def test_full_restore_cluster_profile(self, mock_input, mock_cs_class):
+        mock_cs = MagicMock()
+        mock_cs.get_inventory.return_value.instances = [make_instance("web-01")]
+        mock_cs.get_restore_profile.return_value = None
+        mock_cs_class.return_value = mock_cs
+        with patch("sys.argv", ["snap", "--restore", "test1"]):
+            from tagmania.snapshot_manager import main
+
+            main()
+        profile = mock_cs.restore_pipelined.call_args[1]["profile"]
+        assert profile.to_spec() == "rate=0:300"
+
+    @patch("tagmania.snapshot_manager.ClusterSet")
+    def test_fast_restore_requires_restore(self, mock_cs_class, capsys):
+        argv = ["snap", "--backup", "--fast-restore", "test1"]
+        with patch("sys.argv", argv), pytest.raises(SystemExit):
+            from tagmania.snapshot_manager import main
+
+            main()
+        mock_cs_class.assert_not_called()
+        assert "--fast-restore requires --restore" in capsys.readouterr().err
+
+    def test_invalid_restore_profile(self):
+        argv = ["snap", "--restore", "--restore-profile", "speed=fast", "test1"]
+        with patch("sys.argv", argv), pytest.raises(SystemExit):
+            from tagmania.snapshot_manager import main
+
+            main()
+
     @patch("tagmania.snapshot_manager.ClusterSet")
     @patch("builtins.input", return_value="no")
     def test_full_restore_aborted(self, mock_input, mock_cs_class, capsys):
@@ -151,20 +310,20 @@ class TestSnapshotManagerRestore:
             from tagmania.snapshot_manager import main
 
             main()
-        mock_cs.stop_instances.assert_not_called()
+        mock_cs.restore_pipelined.assert_not_called()
         assert "Operation aborted" in capsys.readouterr().out
 
     @patch("tagmania.snapshot_manager.ClusterSet")
     @patch("builtins.input", return_value="yes")
     def test_full_restore_no_instances(self, mock_input, mock_cs_class, capsys):
         mock_cs = MagicMock()
-        mock_cs.get_instances.return_value = []
+        mock_cs.get_inventory.return_value.instances = []
         mock_cs_class.return_value = mock_cs
         with patch("sys.argv", ["snap", "--restore", "--name", "daily", "test1"]):
             from tagmania.snapshot_manager import main
 
             main()
-        mock_cs.stop_instances.assert_not_called()
+        mock_cs.restore_pipelined.assert_not_called()
         assert "No instances found" in capsys.readouterr().out
 
     @patch("tagmania.snapshot_manager.ClusterSet")
@@ -172,7 +331,7 @@ class TestSnapshotManagerRestore:
     def test_targeted_restore(self, mock_input, mock_cs_class, capsys):
         mock_cs = MagicMock()
         instances = [make_instance("web-01"), make_instance("db-01")]
-        mock_cs.get_instances.return_value = instances
+        mock_cs.get_inventory.return_value.instances = instances
         mock_cs._filter_instances_by_name_regex.return_value = [instances[0]]
         mock_cs_class.return_value = mock_cs
         with patch(
@@ -181,11 +340,16 @@ class TestSnapshotManagerRestore:
             from tagmania.snapshot_manager import main
 
             main()
-        mock_cs.stop_instances_targeted.assert_called_once_with("web.*")
-        mock_cs.detach_volumes_targeted.assert_called_once_with("web.*")
-        mock_cs.delete_volumes_targeted.assert_called_once_with("web.*")
-        mock_cs.create_volumes_targeted.assert_called_once_with("daily", "web.*")
-        mock_cs.attach_volumes_targeted.assert_called_once_with("daily", "web.*")
+        inventory = mock_cs.get_inventory.return_value
+        mock_cs.restore_pipelined.assert_called_once_with(
+            "daily",
+            "web.*",
+            inventory=inventory,
+            policy=ANY,
+            fast_restore=False,
+            profile=ANY,
+            keep_rollback=False,
+        )
         out = capsys.readouterr().out
         assert "Found 1 instances" in out
         assert "Operation completed" in out
@@ -194,7 +358,7 @@ class TestSnapshotManagerRestore:
     @patch("builtins.input", return_value="no")
     def test_targeted_restore_aborted(self, mock_input, mock_cs_class, capsys):
         mock_cs = MagicMock()
-        mock_cs.get_instances.return_value = [make_instance("web-01")]
+        mock_cs.get_inventory.return_value.instances = [make_instance("web-01")]
         mock_cs._filter_instances_by_name_regex.return_value = [make_instance("web-01")]
         mock_cs_class.return_value = mock_cs
         with patch(
@@ -203,13 +367,13 @@ class TestSnapshotManagerRestore:
             from tagmania.snapshot_manager import main
 
             main()
-        mock_cs.stop_instances_targeted.assert_not_called()
+        mock_cs.restore_pipelined.assert_not_called()
         assert "Operation aborted" in capsys.readouterr().out
 
     @patch("tagmania.snapshot_manager.ClusterSet")
     def test_targeted_restore_no_match(self, mock_cs_class, capsys):
         mock_cs = MagicMock()
-        mock_cs.get_instances.return_value = [make_instance("db-01")]
+        mock_cs.get_inventory.return_value.instances = [make_instance("db-01")]
         mock_cs._filter_instances_by_name_regex.return_value = []
         mock_cs_class.return_value = mock_cs
         with patch(
@@ -233,6 +397,131 @@ class TestSnapshotManagerRestore:
         assert "Invalid regex pattern" in capsys.readouterr().out
 
 
+class TestSnapshotManagerStagedRestore:
+    @patch("tagmania.snapshot_manager.ClusterSet")
+    @patch("builtins.input", return_value="yes")
+    def test_stage(self, mock_input, mock_cs_class, capsys):
+        mock_cs = MagicMock()
+        mock_cs.get_restore_profile.return_value = None
+        mock_cs_class.return_value = mock_cs
+        with patch("sys.argv", ["snap", "--restore", "--stage", "--name", "daily", "test1"]):
+            from tagmania.snapshot_manager import main
+
+            main()
+        mock_cs.stage_restore.assert_called_once_with(
+            "daily", None, inventory=mock_cs.get_inventory.return_value, policy=ANY, profile=ANY
+        )
+        mock_cs.restore_pipelined.assert_not_called()
+        assert "Operation completed" in capsys.readouterr().out
+
+    @patch("tagmania.snapshot_manager.ClusterSet")
+    @patch("builtins.input", return_value="yes")
+    def test_targeted_cutover(self, mock_input, mock_cs_class):
+        mock_cs = MagicMock()
+        mock_cs_class.return_value = mock_cs
+        argv = ["snap", "--restore", "--cutover", "--target", "web.*", "--name", "daily", "test1"]
+        with patch("sys.argv", argv):
+            from tagmania.snapshot_manager import main
+
+            main()
+        mock_cs.cutover.assert_called_once_with(
+            "daily",
+            "web.*",
+            inventory=mock_cs.get_inventory.return_value,
+            policy=ANY,
+            keep_rollback=False,
+        )
+        mock_cs.stage_restore.assert_not_called()
+
+    @patch("tagmania.snapshot_manager.ClusterSet")
+    @patch("builtins.input", return_value="no")
+    def test_cutover_aborted(self, mock_input, mock_cs_class, capsys):
+        mock_cs = MagicMock()
+        mock_cs_class.return_value = mock_cs
+        with patch("sys.argv", ["snap", "--restore", "--cutover", "test1"]):
+            from tagmania.snapshot_manager import main
+
+            main()
+        mock_cs.cutover.assert_not_called()
+        assert "Operation aborted" in capsys.readouterr().out
+
+    @pytest.mark.parametrize(
+        "argv",
+        [
+            ["snap", "--backup", "--stage", "test1"],
+            ["snap", "--restore", "--stage", "--cutover", "test1"],
+            ["snap", "--restore", "--stage", "--fast-restore", "test1"],
+        ],
+    )
+    def test_invalid_staging_flags(self, argv):
+        with patch("sys.argv", argv), pytest.raises(SystemExit):
+            from tagmania.snapshot_manager import main
+
+            main()
+
+
+class TestSnapshotManagerRollback:
+    @patch("tagmania.snapshot_manager.ClusterSet")
+    @patch("builtins.input", return_value="yes")
+    def test_restore_keep_rollback(self, mock_input, mock_cs_class, capsys):
+        mock_cs = MagicMock()
+        mock_cs.get_inventory.return_value.instances = [make_instance("web-01")]
+        mock_cs_class.return_value = mock_cs
+        argv = ["snap", "--restore", "--keep-rollback", "--name", "daily", "test1"]
+        with patch("sys.argv", argv):
+            from tagmania.snapshot_manager import main
+
+            main()
+        assert mock_cs.restore_pipelined.call_args[1]["keep_rollback"] is True
+        assert "cluster-snap --rollback --name daily test1" in capsys.readouterr().out
+
+    @patch("tagmania.snapshot_manager.ClusterSet")
+    @patch("builtins.input", return_value="yes")
+    def test_rollback(self, mock_input, mock_cs_class):
+        mock_cs = MagicMock()
+        mock_cs_class.return_value = mock_cs
+        with patch("sys.argv", ["snap", "--rollback", "--name", "daily", "test1"]):
+            from tagmania.snapshot_manager import main
+
+            main()
+        mock_cs.rollback.assert_called_once_with(
+            "daily", None, inventory=mock_cs.get_inventory.return_value, policy=ANY
+        )
+        mock_cs.commit_restore.assert_not_called()
+
+    @patch("tagmania.snapshot_manager.ClusterSet")
+    @patch("builtins.input", return_value="yes")
+    def test_commit_targeted(self, mock_input, mock_cs_class):
+        mock_cs = MagicMock()
+        mock_cs_class.return_value = mock_cs
+        with patch("sys.argv", ["snap", "--commit", "--target", "web.*", "test1"]):
+            from tagmania.snapshot_manager import main
+
+            main()
+        mock_cs.commit_restore.assert_called_once_with(
+            "default", "web.*", inventory=mock_cs.get_inventory.return_value, policy=ANY
+        )
+
+    @patch("tagmania.snapshot_manager.ClusterSet")
+    @patch("builtins.input", return_value="no")
+    def test_rollback_aborted(self, mock_input, mock_cs_class, capsys):
+        mock_cs = MagicMock()
+        mock_cs_class.return_value = mock_cs
+        with patch("sys.argv", ["snap", "--rollback", "test1"]):
+            from tagmania.snapshot_manager import main
+
+            main()
+        mock_cs.rollback.assert_not_called()
+        assert "Operation aborted" in capsys.readouterr().out
+
+    def test_keep_rollback_requires_restore(self):
+        with patch("sys.argv", ["snap", "--backup", "--keep-rollback", "test1"]):
+            from tagmania.snapshot_manager import main
+
+            with pytest.raises(SystemExit):
+                main()
+
+
 class TestSnapshotManagerList:
     @patch("tagmania.snapshot_manager.ClusterSet")
     def test_list_all(self, mock_cs_class, capsys):
@@ -275,3 +564,50 @@ class TestSnapshotManagerList:
 
             main()
         mock_cs_class.assert_called_once_with("test1", profile="myprof")
+
+
+class TestSnapshotManagerSettle:
+    @patch("tagmania.snapshot_manager.ClusterSet")
+    def test_settle_wait(self, mock_cs_class):
+        mock_cs = MagicMock()
+        mock_cs_class.return_value = mock_cs
+        with patch("sys.argv", ["snap", "--settle", "--wait", "test1"]):
+            from tagmania.snapshot_manager import main
+
+            main()
+        mock_cs.settle_volumes.assert_called_once_with(wait=True)
+
+
+class TestSnapshotManagerDeletions:
+    @patch("tagmania.snapshot_manager.ClusterSet")
+    def test_list_deleting_volumes(self, mock_cs_class, capsys):
+        mock_cs = MagicMock()
+        mock_cs.get_deleting_volumes.return_value = [
+            {"VolumeId": "vol-1", "Tags": [{"Key": "Name", "Value": "web - /dev/sdf"}]}
+        ]
+        mock_cs.has_deletions = False
+        mock_cs_class.return_value = mock_cs
+        with patch("sys.argv", ["snap", "--deletions", "test1"]):
+            from tagmania.snapshot_manager import main
+
+            main()
+        out = capsys.readouterr().out
+        assert "1 volumes of test1 are being deleted" in out
+        assert "vol-1 (web - /dev/sdf)" in out
+        mock_cs.deletions.drain.assert_not_called()
+
+    @patch("tagmania.snapshot_manager.ClusterSet")
+    @patch("builtins.input", return_value="yes")
+    def test_restore_drains_deletions_last(self, mock_input, mock_cs_class, capsys):
+        mock_cs = MagicMock()
+        mock_cs.get_inventory.return_value.instances = [make_instance("web-01")]
+        mock_cs.has_deletions = True
+        mock_cs.deletions.status.return_value = "Deletions: 1 pending, 0 deleted, 0 failed."
+        mock_cs_class.return_value = mock_cs
+        with patch("sys.argv", ["snap", "--restore", "--name", "daily", "test1"]):
+            from tagmania.snapshot_manager import main
+
+            main()
+        mock_cs.deletions.drain.assert_called_once_with()
+        out = capsys.readouterr().out
+        assert out.index("Operation completed") < out.index("Finishing background deletions")
@@ -115,10 +115,8 @@ class TestTagManagerTag:
             from tagmania.tag_manager import main
 
             main()
-        mock_cs.tag_instances.assert_called_once()
-        mock_cs.tag_volumes.assert_called_once()
-        mock_cs.tag_snapshots.assert_called_once()
-        tags = mock_cs.tag_instances.call_args[0][0]
+        mock_cs.tag_resources.assert_called_once()
+        tags = mock_cs.tag_resources.call_args[0][0]
         assert {"Key": "Env", "Value": "prod"} in tags
         assert {"Key": "Owner", "Value": "team"} in tags
 
@@ -134,9 +132,7 @@ class TestTagManagerUntag:
             from tagmania.tag_manager import main
 
             main()
-        mock_cs.untag_instances.assert_called_once()
-        mock_cs.untag_volumes.assert_called_once()
-        mock_cs.untag_snapshots.assert_called_once()
-        tags = mock_cs.untag_instances.call_args[0][0]
+        mock_cs.untag_resources.assert_called_once()
+        tags = mock_cs.untag_resources.call_args[0][0]
         assert {"Key": "TempTag"} in tags
         assert {"Key": "BuildNum"} in tags
@@ -0,0 +1,237 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from tagmania.iac_tools.inventory import MAX_FILTER_VALUES, ClusterInventory, resolve_attachments
+
+
+def make_instance(name, state="running", az="us-east-1a"):
+    return {
+        "InstanceId": f"i-{name}",
+        "State": {"Name": state},
+        "Placement": {"AvailabilityZone": az},
+        "Tags": [{"Key": "Name", "Value": name}, {"Key": "Cluster", "Value": "test1"}],
+    }
+
+
+def make_volume(vol_id, instance_id=None, device="/dev/sdf", tags=None):
+    attachments = [{"InstanceId": instance_id, "Device": device}] if instance_id else []
+    return {"VolumeId": vol_id, "Attachments": attachments, "Tags": tags or []}
+
+
+def make_snapshot(snap_id, label):
+    return {"SnapshotId": snap_id, "Tags": [{"Key": "Label", "Value": label}]}
+
+
+def make_client(instances=(), attached=(), volumes=(), snapshots=()):
+    """Build a mock EC2 client whose paginators return one page per operation."""
+    client = MagicMock()
+
+    def get_paginator(operation):
+        paginator = MagicMock()
+
+        def paginate(**kwargs):
+            if operation == "describe_instances":
+                return [{"Reservations": [{"Instances": list(instances)}]}]
+            if operation == "describe_snapshots":
+                return [{"Snapshots": list(snapshots)}]
+            names = [f["Name"] for f in kwargs["Filters"]]
+            if "attachment.instance-id" in names:
+                return [{"Volumes": list(attached)}]
+            return [{"Volumes": list(volumes)}]
+
+        paginator.paginate.side_effect = paginate
+        return paginator
+
+    client.get_paginator.side_effect = get_paginator
+    return client
+
+
+def make_inventory(**kwargs):
+    client = make_client(**kwargs)
+    inv = ClusterInventory(
+        client, [{"Name": "tag:Cluster", "Values": ["test1"]}], "SNAPSHOT_MANAGER"
+    )
+    return inv, client
+
+
+def operations(client):
+    return [c.args[0] for c in client.get_paginator.call_args_list]
+
+
+class TestClusterInventoryInstances:
+    def test_instances_fetched_once(self):
+        inv, client = make_inventory(instances=[make_instance("web-01")])
+        assert len(inv.instances) == 1
+        assert len(inv.instances) == 1
+        assert operations(client) == ["describe_instances"]
+
+    def test_instances_flattened_across_reservations(self):
+        client = MagicMock()
+        client.get_paginator.return_value.paginate.return_value = [
+            {"Reservations": [{"Instances": [make_instance("a")]}]},
+            {"Reservations": [{"Instances": [make_instance("b")]}, {"Instances": []}]},
+        ]
+        inv = ClusterInventory(client, [], "SNAPSHOT_MANAGER")
+        assert [i["InstanceId"] for i in inv.instances] == ["i-a", "i-b"]
+
+    def test_lookup_by_id_and_name(self):
+        inv, _ = make_inventory(instances=[make_instance("web-01"), make_instance("db-01")])
+        assert inv.instance("i-db-01")["InstanceId"] == "i-db-01"
+        assert inv.instance_by_name("web-01")["InstanceId"] == "i-web-01"
+        assert inv.instance_by_name("missing") is None
+
+    def test_instances_in_state(self):
+        inv, _ = make_inventory(
+            instances=[make_instance("web-01"), make_instance("db-01", state="stopped")]
+        )
+        assert [i["InstanceId"] for i in inv.instances_in_state("stopped")] == ["i-db-01"]
+
+    def test_mark_state_updates_without_refetch(self):
+        inv, client = make_inventory(instances=[make_instance("web-01")])
+        inv.mark_state(["i-web-01"], "stopped")  # no-op before load
+        inv.instances  # noqa: B018
+        inv.mark_state(["i-web-01"], "stopped")
+        assert inv.instances_in_state("stopped")[0]["InstanceId"] == "i-web-01"
+        assert operations(client) == ["describe_instances"]
+
+    def test_state_filter_excludes_terminated(self):
+        client = MagicMock()
+        client.get_paginator.return_value.paginate.return_value = []
+        inv = ClusterInventory(
+            client, [{"Name": "tag:Cluster", "Values": ["test1"]}], "SNAPSHOT_MANAGER"
+        )
+        assert inv.instances == []
+        filters = client.get_paginator.return_value.paginate.call_args[1]["Filters"]
+        assert filters[0] == {"Name": "tag:Cluster", "Values": ["test1"]}
+        state_filter = next(f for f in filters if f["Name"] == "instance-state-name")
+        assert "terminated" not in state_filter["Values"]
+
+
+class TestClusterInventoryVolumes:
+    def test_attached_volumes_single_describe(self):
+        inv, client = make_inventory(
+            instances=[make_instance("web-01"), make_instance("db-01")],
+            attached=[
+                make_volume("vol-1", "i-web-01", "/dev/sda1"),
+                make_volume("vol-2", "i-db-01", "/dev/sdf"),
+            ],
+        )
+        assert [v["VolumeId"] for v in inv.attached_volumes("i-web-01")] == ["vol-1"]
+        assert [v["VolumeId"] for v in inv.attached_volumes("i-db-01")] == ["vol-2"]
+        assert operations(client) == ["describe_instances", "describe_volumes"]
+
+    def test_attached_volumes_no_instances(self):
+        inv, client = make_inventory()
+        assert inv.attached_volumes("i-anything") == []
+        assert operations(client) == ["describe_instances"]
+
+    def test_restored_volumes_by_label(self):
+        managed = [
+            {"Key": "automation_key", "Value": "SNAPSHOT_MANAGER"},
+            {"Key": "Label", "Value": "daily"},
+        ]
+        provisioned = [{"Key": "automation_key", "Value": "PROVISIONER"}]
+        inv, _ = make_inventory(
+            volumes=[make_volume("vol-1", tags=managed), make_volume("vol-2", tags=provisioned)]
+        )
+        assert len(inv.volumes) == 2
+        assert [v["VolumeId"] for v in inv.restored_volumes("daily")] == ["vol-1"]
+        assert inv.restored_volumes("weekly") == []
+
+    def test_attached_devices(self):
+        inv, _ = make_inventory(
+            instances=[make_instance("web-01")],
+            attached=[
+                make_volume("vol-1", "i-web-01", "/dev/sda1"),
+                make_volume("vol-2", "i-web-01", "/dev/sdf"),
+            ],
+        )
+        devices = inv.attached_devices("i-web-01")
+        assert {d: v["VolumeId"] for d, v in devices.items()} == {
+            "/dev/sda1": "vol-1",
+            "/dev/sdf": "vol-2",
+        }
+        assert inv.attached_devices("i-other") == {}
+
+
+class TestResolveAttachments:
+    def test_filter_values_chunked(self):
+        client = MagicMock()
+        client.get_paginator.return_value.paginate.return_value = []
+        instance_ids = [f"i-{n}" for n in range(MAX_FILTER_VALUES * 2 + 1)]
+        assert resolve_attachments(client, instance_ids) == {}
+        calls = client.get_paginator.return_value.paginate.call_args_list
+        sizes = [len(c[1]["Filters"][0]["Values"]) for c in calls]
+        assert sizes == [MAX_FILTER_VALUES, MAX_FILTER_VALUES, 1]
+
+    def test_grouped_by_instance_and_device(self):
+        client = MagicMock()
+        shared = {
+            "VolumeId": "vol-multi",
+            "Attachments": [
+                {"InstanceId": "i-a", "Device": "/dev/sdg"},
+                {"InstanceId": "i-outside", "Device": "/dev/sdg"},
+            ],
+        }
+        client.get_paginator.return_value.paginate.return_value = [
+            {"Volumes": [make_volume("vol-1", "i-a", "/dev/sdf"), shared]},
+            {"Volumes": [make_volume("vol-2", "i-b", "/dev/sdf")]},
+        ]
+        attached = resolve_attachments(client, ["i-a", "i-b"])
+        assert set(attached) == {"i-a", "i-b"}
+        assert attached["i-a"]["/dev/sdf"]["VolumeId"] == "vol-1"
+        assert attached["i-a"]["/dev/sdg"]["VolumeId"] == "vol-multi"
+        assert attached["i-b"]["/dev/sdf"]["VolumeId"] == "vol-2"
+
+    def test_no_instances_no_calls(self):
+        client = MagicMock()
+        assert resolve_attachments(client, []) == {}
+        client.get_paginator.assert_not_called()
+
+
+class TestClusterInventorySnapshots:
+    def test_snapshots_label_filter(self):
+        inv, client = make_inventory(
+            snapshots=[make_snapshot("snap-1", "daily"), make_snapshot("snap-2", "weekly")]
+        )
+        assert [s["SnapshotId"] for s in inv.snapshots("daily")] == ["snap-1"]
+        assert len(inv.snapshots()) == 2
+        assert [s["SnapshotId"] for s in inv.snapshots("*")] == ["snap-1", "snap-2"]
+        assert operations(client) == ["describe_snapshots"]
+
+
+class TestClusterInventoryInvalidate:
+    def test_invalidate_section_refetches(self):
+        inv, client = make_inventory(snapshots=[make_snapshot("snap-1", "daily")])
+        inv.snapshots()
+        inv.invalidate("snapshots")
+        inv.snapshots()
+        assert operations(client) == ["describe_snapshots", "describe_snapshots"]
+
+    def test_invalidate_all(self):
+        inv, client = make_inventory(instances=[make_instance("web-01")])
+        inv.instances  # noqa: B018
+        inv.invalidate()
+        inv.instances  # noqa: B018
+        assert operations(client) == ["describe_instances", "describe_instances"]
+
+    def test_invalidate_unknown_section(self):
+        inv, _ = make_inventory()
+        with pytest.raises(ValueError, match="Unknown inventory section"):
+            inv.invalidate("subnets")
+
+
+class TestClusterInventoryTags:
+    def test_tags_of_is_cached_per_resource(self):
+        inv, _ = make_inventory(instances=[make_instance("web-01")])
+        instance = inv.instances[0]
+        assert inv.tags_of(instance) is inv.tags_of(instance)
+        assert inv.tags_of(instance).get("Name") == "web-01"
+
+    def test_tags_of_cache_cleared_on_invalidate(self):
+        inv, _ = make_inventory(instances=[make_instance("web-01")])
+        instance = inv.instances[0]
+        first = inv.tags_of(instance)
+        inv.invalidate("instances")
+        assert inv.tags_of(instance) is not first
@@ -0,0 +1,69 @@
+from tagmania.iac_tools.attach_plan import Attachment, plan_attachments
+
+
+def make_instance(name):
+    return {"InstanceId": f"i-{name}", "Tags": [{"Key": "Name", "Value": name}]}
+
+
+def make_volume(vol_id, instance=None, device=None):
+    tags = []
+    if instance is not None:
+        tags.append({"Key": "Instance", "Value": instance})
+    if device is not None:
+        tags.append({"Key": "Device", "Value": device})
+    return {"VolumeId": vol_id, "Tags": tags}
+
+
+class TestPlanAttachments:
+    def test_matches_by_instance_name(self):
+        instances = [make_instance("web-01"), make_instance("db-01")]
+        volumes = [
+            make_volume("vol-1", "db-01", "/dev/sdf"),
+            make_volume("vol-2", "web-01", "/dev/sda1"),
+        ]
+        plan = plan_attachments(instances, volumes)
+        assert plan.attachments == [
+            Attachment("vol-1", "i-db-01", "db-01", "/dev/sdf"),
+            Attachment("vol-2", "i-web-01", "web-01", "/dev/sda1"),
+        ]
+        assert plan.unmatched == []
+        assert plan.conflicts == []
+        assert len(plan) == 2
+
+    def test_unmatched_volumes_reported(self):
+        instances = [make_instance("web-01")]
+        volumes = [
+            make_volume("vol-1", "gone-01", "/dev/sdf"),
+            make_volume("vol-2", "web-01"),
+            make_volume("vol-3"),
+        ]
+        plan = plan_attachments(instances, volumes)
+        assert plan.attachments == []
+        assert plan.unmatched == ["vol-1", "vol-2", "vol-3"]
+
+    def test_duplicate_device_is_conflict(self):
+        instances = [make_instance("web-01")]
+        volumes = [
+            make_volume("vol-1", "web-01", "/dev/sdf"),
+            make_volume("vol-2", "web-01", "/dev/sdf"),
+            make_volume("vol-3", "web-01", "/dev/sdg"),
+        ]
+        plan = plan_attachments(instances, volumes)
+        assert [a.volume_id for a in plan.attachments] == ["vol-3"]
+        assert len(plan.conflicts) == 1
+        conflict = plan.conflicts[0]
+        assert conflict.instance_id == "i-web-01"
+        assert conflict.device == "/dev/sdf"
+        assert conflict.volume_ids == ["vol-1", "vol-2"]
+
+    def test_instances_without_name_ignored(self):
+        instances = [{"InstanceId": "i-anon", "Tags": []}]
+        plan = plan_attachments(instances, [make_volume("vol-1", "", "/dev/sdf")])
+        assert plan.unmatched == ["vol-1"]
+
+    def test_large_plan(self):
+        instances = [make_instance(f"node-{n}") for n in range(500)]
+        volumes = [make_volume(f"vol-{n}", f"node-{n}", "/dev/sdf") for n in range(500)]
+        plan = plan_attachments(instances, volumes)
+        assert len(plan) == 500
+        assert plan.attachments[-1].instance_id == "i-node-499"
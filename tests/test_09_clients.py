@@ -0,0 +1,91 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from tagmania.iac_tools.clients import (
+    DEFAULT_POOL_CONNECTIONS,
+    ClientFactory,
+    get_client_factory,
+    pool_size,
+)
+
+
+def fake_session():
+    session = MagicMock()
+    session.client.side_effect = lambda *args, **kwargs: MagicMock()
+    session.resource.side_effect = lambda *args, **kwargs: MagicMock()
+    return session
+
+
+@pytest.fixture
+def session_class():
+    with patch("boto3.Session") as mock_session:
+        mock_session.side_effect = lambda **kwargs: fake_session()
+        yield mock_session
+
+
+@pytest.fixture
+def factory(session_class):
+    return ClientFactory(rate_limiter=MagicMock())
+
+
+class TestClientFactory:
+    def test_session_per_profile_and_region(self, factory, session_class):
+        a = factory.session("prod", "us-east-1")
+        assert factory.session("prod", "us-east-1") is a
+        assert factory.session("prod", "us-west-2") is not a
+        assert factory.session(None, None) is not a
+        assert session_class.call_count == 3
+        session_class.assert_any_call(profile_name="prod", region_name="us-east-1")
+        session_class.assert_any_call()
+
+    def test_client_is_shared(self, factory):
+        client = factory.client("ec2", "prod")
+        assert factory.client("ec2", "prod") is client
+        assert factory.client("ec2", "dev") is not client
+        assert factory.session("prod").client.call_count == 1
+
+    def test_client_settings(self, factory):
+        factory.client("ec2", max_pool_connections=34)
+        config = factory.session().client.call_args[1]["config"]
+        assert config.max_pool_connections == 34
+        assert config.retries["mode"] == "adaptive"
+        assert config.tcp_keepalive is True
+
+    def test_larger_pool_replaces_client(self, factory):
+        small = factory.client("ec2", max_pool_connections=10)
+        large = factory.client("ec2", max_pool_connections=40)
+        assert large is not small
+        # A smaller request reuses the larger pool
+        assert factory.client("ec2", max_pool_connections=20) is large
+
+    def test_configure_drops_clients_but_keeps_sessions(self, factory):
+        session = factory.session()
+        client = factory.client("ec2")
+        factory.configure(read_timeout=120, tcp_keepalive=False)
+        assert factory.client("ec2") is not client
+        assert factory.session() is session
+        config = session.client.call_args[1]["config"]
+        assert config.read_timeout == 120
+        assert config.tcp_keepalive is False
+
+    def test_clients_are_rate_limited(self, factory):
+        client = factory.client("ec2")
+        resource = factory.resource("ec2")
+        factory._rate_limiter.attach.assert_any_call(client)
+        factory._rate_limiter.attach.assert_any_call(resource.meta.client)
+
+    def test_clear(self, factory, session_class):
+        factory.client("ec2")
+        factory.clear()
+        factory.client("ec2")
+        assert session_class.call_count == 2
+
+
+class TestHelpers:
+    def test_pool_size_tracks_concurrency(self):
+        assert pool_size(1) == DEFAULT_POOL_CONNECTIONS
+        assert pool_size(16) == 34
+
+    def test_process_wide_factory(self):
+        assert get_client_factory() is get_client_factory()
@@ -0,0 +1,100 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from botocore.exceptions import ClientError
+
+from tagmania.iac_tools.deletion_queue import DeletionQueue
+
+
+def client_error(code):
+    return ClientError({"Error": {"Code": code, "Message": code}}, "DeleteVolume")
+
+
+def make_queue(client, **kwargs):
+    sleeps = []
+    queue = DeletionQueue(client, max_workers=4, sleep=sleeps.append, **kwargs)
+    return queue, sleeps
+
+
+class TestDeletionQueue:
+    def test_deletes_volumes_and_snapshots(self):
+        client = MagicMock()
+        queue, _ = make_queue(client)
+        queue.submit("volume", ["vol-1", "vol-2"])
+        queue.submit("snapshot", ["snap-1"])
+        queue.drain()
+        assert sorted(c[1]["VolumeId"] for c in client.delete_volume.call_args_list) == [
+            "vol-1",
+            "vol-2",
+        ]
+        client.delete_snapshot.assert_called_once_with(SnapshotId="snap-1")
+        assert queue.status() == "Deletions: 0 pending, 3 deleted, 0 failed."
+
+    def test_retries_volume_in_use(self):
+        client = MagicMock()
+        client.delete_volume.side_effect = [
+            client_error("VolumeInUse"),
+            client_error("VolumeInUse"),
+            {},
+        ]
+        queue, sleeps = make_queue(client, retry_delay=1.0)
+        queue.submit("volume", ["vol-1"])
+        queue.drain()
+        assert client.delete_volume.call_count == 3
+        assert sleeps == [1.0, 2.0]
+        assert queue.deleted == [("volume", "vol-1")]
+
+    def test_gives_up_after_attempts(self):
+        client = MagicMock()
+        client.delete_volume.side_effect = client_error("RequestLimitExceeded")
+        queue, _ = make_queue(client, attempts=3)
+        queue.submit("volume", ["vol-1"])
+        with pytest.raises(Exception, match="deletions: 1 of 1 deletions failed"):
+            queue.drain()
+        assert client.delete_volume.call_count == 3
+        assert ("volume", "vol-1") in queue.failed
+
+    def test_other_errors_are_not_retried(self):
+        client = MagicMock()
+        client.delete_snapshot.side_effect = client_error("UnauthorizedOperation")
+        queue, sleeps = make_queue(client)
+        queue.submit("snapshot", ["snap-1"])
+        with pytest.raises(Exception, match="1 of 1 deletions failed"):
+            queue.drain()
+        assert client.delete_snapshot.call_count == 1
+        assert sleeps == []
+
+    def test_missing_resource_counts_as_deleted(self):
+        client = MagicMock()
+        client.delete_volume.side_effect = client_error("InvalidVolume.NotFound")
+        queue, _ = make_queue(client)
+        queue.submit("volume", ["vol-gone"])
+        queue.drain()
+        assert queue.deleted == [("volume", "vol-gone")]
+
+    def test_pending_until_done(self):
+        client = MagicMock()
+        release = threading.Event()
+        client.delete_volume.side_effect = lambda VolumeId: release.wait(5)
+        queue, _ = make_queue(client)
+        queue.submit("volume", ["vol-1"])
+        # Submitting a pending resource again does not queue a second delete
+        queue.submit("volume", ["vol-1"])
+        assert queue.pending == [("volume", "vol-1")]
+        with pytest.raises(Exception, match="1 still pending"):
+            queue.drain(timeout=0.01)
+        release.set()
+        queue.drain()
+        assert queue.pending == []
+        assert client.delete_volume.call_count == 1
+
+    def test_unknown_kind(self):
+        queue, _ = make_queue(MagicMock())
+        with pytest.raises(ValueError, match="Unknown resource kind"):
+            queue.submit("instance", ["i-1"])
+
+    def test_drain_empty_queue(self):
+        queue, _ = make_queue(MagicMock())
+        queue.drain()
+        assert queue.status() == "Deletions: 0 pending, 0 deleted, 0 failed."
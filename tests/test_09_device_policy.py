@@ -0,0 +1,35 @@
+import re
+
+import pytest
+
+from tagmania.iac_tools.device_policy import ALL_DEVICES, DevicePolicy
+
+
+class TestDevicePolicy:
+    def test_default_selects_everything(self):
+        assert ALL_DEVICES.selects_all
+        assert ALL_DEVICES.selects("/dev/sda1", 8, "/dev/sda1")
+
+    def test_exclude_root(self):
+        policy = DevicePolicy(exclude_root=True)
+        assert not policy.selects("/dev/xvda", root_device="/dev/xvda")
+        assert policy.selects("/dev/sdf", root_device="/dev/xvda")
+        # Without a known root device nothing is excluded as root
+        assert policy.selects("/dev/xvda")
+
+    def test_include_and_exclude_patterns(self):
+        policy = DevicePolicy(include=r"^/dev/sd[f-p]$", exclude="sdh")
+        assert policy.selects("/dev/sdf")
+        assert not policy.selects("/dev/sda1")
+        assert not policy.selects("/dev/sdh")
+
+    def test_min_size(self):
+        policy = DevicePolicy(min_size=10)
+        assert policy.selects("/dev/sdf", 10)
+        assert not policy.selects("/dev/sdf", 9)
+        assert policy.selects("/dev/sdf")  # unknown size is not filtered
+        assert not policy.selects_all
+
+    def test_invalid_pattern(self):
+        with pytest.raises(re.error):
+            DevicePolicy(include="sd[")
@@ -0,0 +1,63 @@
+import threading
+import time
+
+import pytest
+
+from tagmania.iac_tools.executor import BatchExecutor
+
+
+class TestBatchExecutor:
+    def test_results_in_submission_order(self):
+        executor = BatchExecutor(max_workers=4)
+        result = executor.run("square", lambda n: n * n, [3, 1, 2])
+        assert result.ok
+        assert result.succeeded_items == [3, 1, 2]
+        assert result.results == [9, 1, 4]
+        assert result.summary() == "square: 3 succeeded, 0 failed."
+
+    def test_failures_collected_without_stopping_batch(self):
+        def fn(n):
+            if n % 2:
+                raise RuntimeError(f"odd {n}")
+            return n
+
+        result = BatchExecutor(max_workers=2).run("evens", fn, range(5))
+        assert result.succeeded_items == [0, 2, 4]
+        assert [item for item, _ in result.failed] == [1, 3]
+        assert len(result) == 5
+        assert not result.ok
+
+    def test_raise_for_failures(self, capsys):
+        result = BatchExecutor().run("boom", lambda n: 1 / n, [0, 1])
+        with pytest.raises(Exception, match="boom: 1 of 2 operations failed"):
+            result.raise_for_failures()
+        assert "boom failed for 0" in capsys.readouterr().out
+
+    def test_concurrency_is_bounded(self):
+        lock = threading.Lock()
+        active = peak = 0
+
+        def fn(_):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.01)
+            with lock:
+                active -= 1
+
+        BatchExecutor(max_workers=3).run("sleep", fn, range(12))
+        assert 1 < peak <= 3
+
+    def test_pool_reused_across_batches(self):
+        executor = BatchExecutor(max_workers=2)
+        executor.run("a", lambda n: n, [1])
+        pool = executor._pool
+        executor.run("b", lambda n: n, [2])
+        assert executor._pool is pool
+        executor.shutdown()
+        assert executor._pool is None
+
+    def test_invalid_max_workers(self):
+        with pytest.raises(ValueError, match="at least 1"):
+            BatchExecutor(max_workers=0)
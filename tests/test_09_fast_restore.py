@@ -0,0 +1,120 @@
+from unittest.mock import MagicMock
+
+from tagmania.iac_tools.fast_restore import FastRestore
+
+
+def make_client(active=(), unsuccessful=()):
+    client = MagicMock()
+    client.get_paginator.return_value.paginate.return_value = [
+        {
+            "FastSnapshotRestores": [
+                {"SnapshotId": s, "AvailabilityZone": z, "State": "enabled"} for s, z in active
+            ]
+        }
+    ]
+
+    def enable(AvailabilityZones, SourceSnapshotIds):
+        zone = AvailabilityZones[0]
+        return {
+            "Successful": [
+                {"SnapshotId": s, "AvailabilityZone": zone}
+                for s in SourceSnapshotIds
+                if s not in unsuccessful
+            ],
+            "Unsuccessful": [
+                {
+                    "SnapshotId": s,
+                    "FastSnapshotRestoreStateErrors": [
+                        {"AvailabilityZone": zone, "Error": {"Message": "limit exceeded"}}
+                    ],
+                }
+                for s in SourceSnapshotIds
+                if s in unsuccessful
+            ],
+        }
+
+    client.enable_fast_snapshot_restores.side_effect = enable
+    return client
+
+
+def make_waiter(failed=None, completed=None):
+    waiter = MagicMock()
+    waiter.failed = failed or {}
+    waiter.completed = completed or {}
+    return waiter
+
+
+class TestFastRestore:
+    def test_enable_one_call_per_zone(self):
+        client = make_client()
+        fast = FastRestore(client, make_waiter)
+        fast.enable({"snap-1": {"az-a"}, "snap-2": {"az-a"}, "snap-3": {"az-b"}})
+        calls = {
+            c[1]["AvailabilityZones"][0]: c[1]["SourceSnapshotIds"]
+            for c in client.enable_fast_snapshot_restores.call_args_list
+        }
+        assert calls == {"az-a": ["snap-1", "snap-2"], "az-b": ["snap-3"]}
+        assert fast.ready == {"snap-1", "snap-2", "snap-3"}
+
+    def test_already_enabled_is_reused_and_left_on(self):
+        client = make_client(active=[("snap-1", "az-a")])
+        fast = FastRestore(client, make_waiter)
+        fast.enable({"snap-1": {"az-a"}, "snap-2": {"az-a"}})
+        assert fast.reused == [("snap-1", "az-a")]
+        fast.disable()
+        client.disable_fast_snapshot_restores.assert_called_once_with(
+            AvailabilityZones=["az-a"], SourceSnapshotIds=["snap-2"]
+        )
+
+    def test_unsuccessful_snapshots_restore_without_fsr(self, capsys):
+        client = make_client(unsuccessful={"snap-2"})
+        fast = FastRestore(client, make_waiter)
+        fast.enable({"snap-1": {"az-a"}, "snap-2": {"az-a"}})
+        assert fast.ready == {"snap-1"}
+        assert "not enabled for snap-2 in az-a: limit exceeded" in capsys.readouterr().out
+
+    def test_wait_failures_are_not_ready(self):
+        waiter = make_waiter(failed={"snap-1/az-a": "timeout"})
+        waiter.wait.side_effect = Exception("Error: wait: 1 resources did not finish")
+        fast = FastRestore(make_client(), lambda: waiter)
+        fast.enable({"snap-1": {"az-a"}, "snap-2": {"az-a"}})
+        fast.wait(timeout=60)
+        waiter.add_many.assert_called_once_with(
+            "fast_snapshot_restore", ["snap-1/az-a", "snap-2/az-a"], "enabled"
+        )
+        assert fast.ready == {"snap-2"}
+        # A pair that never became enabled is still turned off again
+        fast.disable()
+        assert fast.enabled == [("snap-1", "az-a"), ("snap-2", "az-a")]
+
+    def test_summary_reports_wait_and_cost(self):
+        now = [0.0]
+        waiter = make_waiter(completed={"snap-1/az-a": None, "snap-2/az-b": None})
+        waiter.wait.side_effect = lambda timeout: now.__setitem__(0, 1800.0)
+        fast = FastRestore(make_client(), lambda: waiter, price=1.0, clock=lambda: now[0])
+        fast.enable({"snap-1": {"az-a"}, "snap-2": {"az-b"}})
+        fast.wait(timeout=3600)
+        now[0] = 3 * 3600.0
+        fast.disable()
+        summary = fast.summary()
+        assert "2 snapshot/zone pairs enabled" in summary
+        assert "30.0 min spent waiting" in summary
+        assert "estimated cost $6.00" in summary
+
+    def test_summary_counts_only_confirmed_pairs(self):
+        now = [0.0]
+        waiter = make_waiter(failed={"snap-2/az-b": "timeout"}, completed={"snap-1/az-a": None})
+        waiter.wait.side_effect = Exception("Error: wait: 1 resources did not finish")
+        fast = FastRestore(make_client(), lambda: waiter, price=1.0, clock=lambda: now[0])
+        fast.enable({"snap-1": {"az-a"}, "snap-2": {"az-b"}})
+        fast.wait(timeout=3600)
+        now[0] = 2 * 3600.0
+        fast.disable()
+        assert fast.confirmed == [("snap-1", "az-a")]
+        summary = fast.summary()
+        assert "1 snapshot/zone pairs enabled" in summary
+        assert "1 failed" in summary
+        assert "estimated cost $2.00" in summary
+
+    def test_summary_when_unused(self):
+        assert FastRestore(MagicMock(), make_waiter).summary() == "Fast snapshot restore: not used."
@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import tagmania
+
+CLI_MODULES = [
+    "tagmania.start_cluster",
+    "tagmania.stop_cluster",
+    "tagmania.snapshot_manager",
+    "tagmania.delete_volumes",
+    "tagmania.delete_snapshots",
+    "tagmania.tag_manager",
+]
+
+# Modules that only an AWS call should load
+HEAVY_MODULES = ["boto3", "botocore.session", "botocore.client", "botocore.config"]
+
+
+def run_python(code, *flags):
+    env = dict(os.environ)
+    src = str(Path(tagmania.__file__).parent.parent)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (src, env.get("PYTHONPATH")) if p)
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+
+
+def cumulative_import_us(stderr, module):
+    """Cumulative microseconds of a top-level import in -X importtime output."""
+    for line in stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1])
+    raise AssertionError(f"{module} not in import time output")
+
+
+class TestColdStart:
+    def test_cli_help_does_not_load_boto3(self):
+        code = (
+            "import sys\n"
+            f"import {', '.join(CLI_MODULES)}\n"
+            "sys.argv = ['cluster-snap', '--help']\n"
+            "try:\n"
+            "    tagmania.snapshot_manager.main()\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            "import tagmania.iac_tools\n"
+            "tagmania.iac_tools.ClusterSet('test1')\n"
+            f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules])\n"
+        )
+        out = run_python(code).stdout
+        assert out.strip().splitlines()[-1] == "[]"
+
+    def test_cli_import_budget(self):
+        # Importing every CLI must cost less than importing boto3 alone
+        code = "import " + ", ".join(CLI_MODULES) + "\nimport boto3\n"
+        stderr = run_python(code, "-X", "importtime").stderr
+        cli_us = sum(cumulative_import_us(stderr, m) for m in CLI_MODULES)
+        assert cli_us < cumulative_import_us(stderr, "boto3")
@@ -0,0 +1,169 @@
+from unittest.mock import MagicMock, patch
+
+import boto3
+import pytest
+from botocore.awsrequest import AWSResponse
+
+from tagmania.iac_tools.rate_limit import (
+    RateLimiter,
+    TokenBucket,
+    action_family,
+    get_rate_limiter,
+    retry_config,
+)
+
+THROTTLED = (
+    b"<Response><Errors><Error><Code>RequestLimitExceeded</Code>"
+    b"<Message>Request limit exceeded.</Message></Error></Errors>"
+    b"<RequestID>1</RequestID></Response>"
+)
+NO_VOLUMES = (
+    b'<DescribeVolumesResponse xmlns="http://ec2.amazonaws.com/doc/2016-11-15/">'
+    b"<requestId>1</requestId><volumeSet/></DescribeVolumesResponse>"
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class RawBody:
+    def __init__(self, body):
+        self.body = body
+
+    def stream(self, **kwargs):
+        yield self.body
+
+
+def ec2_client(responses):
+    """Real EC2 client whose HTTP responses come from ``responses``."""
+    client = boto3.client(
+        "ec2",
+        region_name="us-east-1",
+        aws_access_key_id="testing",
+        aws_secret_access_key="testing",
+    )
+
+    def send(request, **kwargs):
+        status, body = responses.pop(0)
+        return AWSResponse(request.url, status, {}, RawBody(body))
+
+    return client, send
+
+
+class TestActionFamily:
+    @pytest.mark.parametrize(
+        ("operation", "family"),
+        [
+            ("DescribeVolumes", "describe"),
+            ("GetFunction", "describe"),
+            ("CreateTags", "tags"),
+            ("StopInstances", "instances"),
+            ("CreateVolume", "mutate"),
+            ("AttachVolume", "mutate"),
+        ],
+    )
+    def test_families(self, operation, family):
+        assert action_family(operation) == family
+
+
+class TestTokenBucket:
+    def test_burst_then_wait(self):
+        clock = FakeClock()
+        bucket = TokenBucket(2.0, 3, clock=clock, sleep=clock.sleep)
+        waits = [bucket.acquire() for _ in range(5)]
+        assert waits[:3] == [0.0, 0.0, 0.0]
+        assert waits[3:] == [0.5, 0.5]
+        assert clock.sleeps == [0.5, 0.5]
+
+    def test_throttle_halves_rate_and_recovers(self):
+        clock = FakeClock()
+        bucket = TokenBucket(10.0, 5, clock=clock, sleep=clock.sleep)
+        bucket.throttled()
+        assert bucket.rate == 5.0
+        # The burst left in the bucket is dropped
+        assert bucket.acquire() == pytest.approx(0.2)
+        for _ in range(100):
+            bucket.succeeded()
+        assert bucket.rate == 10.0
+
+    def test_rate_has_a_floor(self):
+        bucket = TokenBucket(1.0, 1, min_rate=0.25, sleep=lambda s: None)
+        for _ in range(10):
+            bucket.throttled()
+        assert bucket.rate == 0.25
+
+    def test_invalid_rate(self):
+        with pytest.raises(ValueError, match="positive rate"):
+            TokenBucket(0, 1)
+
+
+class TestRateLimiter:
+    def test_counts_per_family(self):
+        clock = FakeClock()
+        limiter = RateLimiter(clock=clock, sleep=clock.sleep)
+        limiter.before_call("ec2", "DescribeVolumes")
+        limiter.after_call("ec2", "DescribeVolumes", None)
+        limiter.before_call("ec2", "CreateVolume")
+        limiter.after_call("ec2", "CreateVolume", "RequestLimitExceeded")
+        stats = limiter.stats()
+        assert stats["ec2/describe"]["calls"] == 1
+        assert stats["ec2/describe"]["throttled"] == 0
+        assert stats["ec2/mutate"]["throttled"] == 1
+        assert stats["ec2/mutate"]["rate"] == 2.0
+        assert limiter.throttled == 1
+
+    def test_other_errors_leave_the_rate_alone(self):
+        limiter = RateLimiter(rates={"mutate": (4.0, 10)})
+        limiter.before_call("ec2", "CreateVolume")
+        limiter.after_call("ec2", "CreateVolume", "InvalidSnapshot.NotFound")
+        assert limiter.stats()["ec2/mutate"]["rate"] == 4.0
+
+    def test_summary(self):
+        limiter = RateLimiter(sleep=lambda s: None)
+        assert limiter.summary() == "API calls: none."
+        limiter.before_call("ec2", "AttachVolume")
+        limiter.after_call("ec2", "AttachVolume", "RequestLimitExceeded")
+        assert limiter.summary() == "API calls: ec2/mutate 1 calls (1 throttled, now 2.0/s)."
+
+    def test_attached_client_is_limited_and_retried(self):
+        limiter = RateLimiter(sleep=lambda s: None)
+        client, send = ec2_client([(503, THROTTLED), (200, NO_VOLUMES)])
+        limiter.attach(client)
+        # Attaching twice does not count calls twice
+        limiter.attach(client)
+        client.meta.events.register("before-send", send)
+        with patch("botocore.endpoint.time.sleep"):
+            response = client.describe_volumes()
+        assert response["Volumes"] == []
+        stats = limiter.stats()["ec2/describe"]
+        assert stats["calls"] == 2
+        assert stats["throttled"] == 1
+
+    def test_connection_errors_are_not_counted_as_throttles(self):
+        limiter = RateLimiter()
+        limiter._on_response("needs-retry.ec2.DescribeVolumes", response=None)
+        assert limiter.stats() == {}
+
+    def test_attach_registers_handlers(self):
+        client = MagicMock()
+        RateLimiter().attach(client)
+        events = [c[0][0] for c in client.meta.events.register.call_args_list]
+        assert events == ["before-send", "needs-retry"]
+
+
+class TestModuleHelpers:
+    def test_process_wide_limiter(self):
+        assert get_rate_limiter() is get_rate_limiter()
+
+    def test_adaptive_retries(self):
+        assert retry_config().retries["mode"] == "adaptive"
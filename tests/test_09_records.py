@@ -0,0 +1,61 @@
+import copy
+from unittest.mock import MagicMock
+
+import pytest
+
+from tagmania.iac_tools.records import InstanceRecord, SnapshotRecord, VolumeRecord
+
+INSTANCE = {
+    "InstanceId": "i-1",
+    "State": {"Name": "running"},
+    "Placement": {"AvailabilityZone": "us-east-1a"},
+    "BlockDeviceMappings": [{"DeviceName": "/dev/sda1"}],
+    "Tags": [{"Key": "Name", "Value": "web-01"}],
+}
+
+
+class TestRecord:
+    def test_reads_describe_data(self):
+        instance = InstanceRecord(INSTANCE)
+        assert instance.id == "i-1"
+        assert instance.state["Name"] == "running"
+        assert instance.placement["AvailabilityZone"] == "us-east-1a"
+        assert instance.block_device_mappings[0]["DeviceName"] == "/dev/sda1"
+        assert instance.instance_id == "i-1"
+        assert instance.tags == INSTANCE["Tags"]
+        assert instance.meta.data is INSTANCE
+
+    def test_missing_fields_match_boto3(self):
+        volume = VolumeRecord({"VolumeId": "vol-1"})
+        assert volume.tags is None
+        assert volume.state is None
+        assert volume.attachments is None
+
+    def test_falls_back_on_resource(self):
+        factory = MagicMock()
+        snapshot = SnapshotRecord({"SnapshotId": "snap-1", "State": "completed"}, factory)
+        snapshot.delete()
+        snapshot.create_tags(Tags=[])
+        factory.assert_called_once_with("Snapshot", "snap-1")
+        resource = factory.return_value
+        assert resource.meta.data == {"SnapshotId": "snap-1", "State": "completed"}
+        resource.delete.assert_called_once_with()
+        assert snapshot.meta.client is resource.meta.client
+
+    def test_no_factory(self):
+        volume = VolumeRecord({"VolumeId": "vol-1"})
+        with pytest.raises(AttributeError, match="no boto3 resource"):
+            volume.delete()
+
+    def test_equality_and_hash(self):
+        a = VolumeRecord({"VolumeId": "vol-1"})
+        b = VolumeRecord({"VolumeId": "vol-1", "State": "available"})
+        assert a == b
+        assert len({a, b}) == 1
+        assert a != SnapshotRecord({"SnapshotId": "vol-1"})
+        assert repr(a) == "VolumeRecord(id='vol-1')"
+
+    def test_slots_only(self):
+        instance = InstanceRecord(INSTANCE)
+        assert not hasattr(instance, "__dict__")
+        assert copy.copy(instance).id == "i-1"
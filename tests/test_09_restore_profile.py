@@ -0,0 +1,52 @@
+import pytest
+
+from tagmania.iac_tools.restore_profile import DEFAULT_PROFILE, RestoreProfile, parse_baseline
+
+
+class TestRestoreProfile:
+    def test_default_matches_previous_behaviour(self):
+        assert DEFAULT_PROFILE.volume_options(100) == {"VolumeInitializationRate": 300}
+        assert DEFAULT_PROFILE.baseline_tag() is None
+
+    def test_rate_tiers_by_size(self):
+        profile = RestoreProfile.parse("rate=0:300/1024:200/4096:100")
+        assert profile.initialization_rate(8) == 300
+        assert profile.initialization_rate(1024) == 200
+        assert profile.initialization_rate(5000) == 100
+        assert profile.initialization_rate(None) == 300
+
+    def test_no_rate(self):
+        profile = RestoreProfile.parse("rate=none type=gp3")
+        assert profile.volume_options(100) == {"VolumeType": "gp3"}
+
+    def test_volume_overrides_and_baseline(self):
+        profile = RestoreProfile.parse(
+            "rate=250 type=gp3 iops=16000 throughput=1000 baseline-iops=3000 "
+            "baseline-throughput=125"
+        )
+        assert profile.volume_options(10) == {
+            "VolumeType": "gp3",
+            "Iops": 16000,
+            "Throughput": 1000,
+            "VolumeInitializationRate": 250,
+        }
+        tag = profile.baseline_tag()
+        assert tag == "baseline-iops=3000 baseline-throughput=125"
+        assert parse_baseline(tag) == {"Iops": 3000, "Throughput": 125}
+
+    def test_spec_round_trip(self):
+        spec = "rate=0:300/512:200 type=gp3 baseline-type=gp2"
+        assert RestoreProfile.parse(spec).to_spec() == spec
+
+    @pytest.mark.parametrize(
+        "spec, message",
+        [
+            ("rate=50", "not between 100 and 300"),
+            ("speed=fast", "Unknown restore profile key 'speed'"),
+            ("iops=lots", "Expected a number"),
+            ("gp3", "Expected key=value"),
+        ],
+    )
+    def test_invalid(self, spec, message):
+        with pytest.raises(ValueError, match=message):
+            RestoreProfile.parse(spec)
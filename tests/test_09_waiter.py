@@ -0,0 +1,253 @@
+from unittest.mock import MagicMock
+
+import botocore.session
+import pytest
+from botocore.stub import Stubber
+
+from tagmania.iac_tools.inventory import MAX_FILTER_VALUES
+from tagmania.iac_tools.waiter import ResourceWaiter
+
+RESULT_KEYS = {
+    "describe_instances": "Reservations",
+    "describe_volumes": "Volumes",
+    "describe_snapshots": "Snapshots",
+}
+
+
+def make_item(operation, resource_id, state, tags=()):
+    if operation == "describe_instances":
+        return {"Instances": [{"InstanceId": resource_id, "State": {"Name": state}}]}
+    id_key = "VolumeId" if operation == "describe_volumes" else "SnapshotId"
+    return {id_key: resource_id, "State": state, "Tags": list(tags)}
+
+
+def make_client(timeline):
+    """Mock EC2 client replaying a state per poll.
+
+    timeline maps resource ID -> (operation, [state on poll 1, poll 2, ...]).
+    The last state repeats; None means the resource does not exist.
+    """
+    client = MagicMock()
+    polls = {}
+    requested = []
+
+    def get_paginator(operation):
+        paginator = MagicMock()
+
+        def paginate(Filters, **kwargs):
+            ids = Filters[0]["Values"]
+            requested.append((operation, list(ids)))
+            items = []
+            for resource_id in ids:
+                op, states = timeline[resource_id]
+                n = polls.get(resource_id, 0)
+                polls[resource_id] = n + 1
+                state = states[min(n, len(states) - 1)]
+                if op == operation and state is not None:
+                    items.append(make_item(operation, resource_id, state))
+            return [{RESULT_KEYS[operation]: items}]
+
+        paginator.paginate.side_effect = paginate
+        return paginator
+
+    client.get_paginator.side_effect = get_paginator
+    return client, requested
+
+
+def make_waiter(client, **kwargs):
+    sleeps = []
+    waiter = ResourceWaiter(client, jitter=0, sleep=sleeps.append, **kwargs)
+    return waiter, sleeps
+
+
+class TestResourceWaiter:
+    def test_mixed_kinds_in_one_loop(self):
+        client, _ = make_client(
+            {
+                "i-1": ("describe_instances", ["pending", "running"]),
+                "vol-1": ("describe_volumes", ["creating", "creating", "available"]),
+                "snap-1": ("describe_snapshots", ["completed"]),
+            }
+        )
+        waiter, _ = make_waiter(client)
+        waiter.add("instance", "i-1", "running")
+        waiter.add("volume", "vol-1", "available")
+        waiter.add("snapshot", "snap-1", "completed")
+        completed = waiter.wait()
+        assert set(completed) == {"i-1", "vol-1", "snap-1"}
+
+    def test_only_unfinished_resources_requeried(self):
+        client, requested = make_client(
+            {
+                "vol-1": ("describe_volumes", ["available"]),
+                "vol-2": ("describe_volumes", ["creating", "available"]),
+            }
+        )
+        waiter, _ = make_waiter(client)
+        waiter.add_many("volume", ["vol-1", "vol-2"], "available")
+        waiter.wait()
+        assert requested == [
+            ("describe_volumes", ["vol-1", "vol-2"]),
+            ("describe_volumes", ["vol-2"]),
+        ]
+
+    def test_callback_fires_per_resource_when_done(self):
+        client, _ = make_client(
+            {
+                "vol-1": ("describe_volumes", ["available"]),
+                "vol-2": ("describe_volumes", ["creating", "creating", "available"]),
+            }
+        )
+        order = []
+        waiter, _ = make_waiter(client)
+        waiter.add_many(
+            "volume", ["vol-1", "vol-2"], "available", lambda rid, item: order.append(rid)
+        )
+        waiter.poll()
+        assert order == ["vol-1"]
+        waiter.wait()
+        assert order == ["vol-1", "vol-2"]
+
+    def test_delay_backs_off_and_resets(self):
+        client, _ = make_client(
+            {
+                "vol-1": ("describe_volumes", ["creating", "creating", "available"]),
+                "vol-2": ("describe_volumes", ["creating"] * 4 + ["available"]),
+            }
+        )
+        waiter, sleeps = make_waiter(client, initial_delay=2, backoff=2, max_delay=5)
+        waiter.add_many("volume", ["vol-1", "vol-2"], "available")
+        waiter.wait()
+        assert sleeps == [2, 4, 2, 4]
+
+    def test_jitter_spreads_delay(self):
+        client, _ = make_client({"vol-1": ("describe_volumes", ["creating", "available"])})
+        sleeps = []
+        waiter = ResourceWaiter(
+            client, initial_delay=10, backoff=1, jitter=0.2, sleep=sleeps.append
+        )
+        waiter.add("volume", "vol-1", "available")
+        waiter.wait()
+        assert 8 <= sleeps[0] <= 12
+
+    def test_deleted_target(self):
+        client, _ = make_client({"vol-1": ("describe_volumes", ["deleting", None])})
+        waiter, _ = make_waiter(client)
+        waiter.add("volume", "vol-1", "deleted")
+        assert waiter.wait() == {"vol-1": None}
+
+    def test_new_resource_missing_briefly_is_not_a_failure(self):
+        client, _ = make_client({"vol-1": ("describe_volumes", [None, None, "available"])})
+        waiter, _ = make_waiter(client)
+        waiter.add("volume", "vol-1", "available")
+        assert set(waiter.wait()) == {"vol-1"}
+
+    def test_predicate_target(self):
+        client, _ = make_client({"vol-1": ("describe_volumes", ["available"])})
+        seen = []
+        waiter, _ = make_waiter(client)
+        waiter.add("volume", "vol-1", lambda item: seen.append(item) or len(seen) > 1)
+        waiter.wait()
+        assert len(seen) == 2
+
+    def test_failures_reported_after_others_complete(self):
+        client, _ = make_client(
+            {
+                "vol-1": ("describe_volumes", ["creating", "error"]),
+                "vol-2": ("describe_volumes", ["creating", "available"]),
+                "vol-3": ("describe_volumes", [None]),
+            }
+        )
+        waiter, _ = make_waiter(client)
+        waiter.add_many("volume", ["vol-1", "vol-2", "vol-3"], "available")
+        with pytest.raises(Exception, match=r"2 resources did not finish: .*vol-1 \(error\)"):
+            waiter.wait()
+        assert set(waiter.completed) == {"vol-2"}
+        assert waiter.failed == {"vol-3": "deleted", "vol-1": "error"}
+
+    def test_timeout(self):
+        client, _ = make_client({"snap-1": ("describe_snapshots", ["pending"])})
+        now = [0.0]
+        waiter = ResourceWaiter(
+            client, jitter=0, sleep=lambda s: now.__setitem__(0, now[0] + s), clock=lambda: now[0]
+        )
+        waiter.add("snapshot", "snap-1", "completed")
+        with pytest.raises(Exception, match=r"snap-1 \(timeout\)"):
+            waiter.wait(timeout=30)
+        assert now[0] >= 30
+
+    def test_id_filters_chunked(self):
+        ids = [f"vol-{n}" for n in range(MAX_FILTER_VALUES + 5)]
+        client, requested = make_client({rid: ("describe_volumes", ["available"]) for rid in ids})
+        waiter, _ = make_waiter(client)
+        waiter.add_many("volume", ids, "available")
+        waiter.wait()
+        assert [len(r[1]) for r in requested] == [MAX_FILTER_VALUES, 5]
+
+    def test_unknown_kind(self):
+        waiter, _ = make_waiter(MagicMock())
+        with pytest.raises(ValueError, match="Unknown resource kind"):
+            waiter.add("subnet", "subnet-1", "available")
+
+    def test_fast_snapshot_restore_pairs(self):
+        client = MagicMock()
+        pages = [
+            [
+                {"SnapshotId": "snap-1", "AvailabilityZone": "az-a", "State": "enabled"},
+                {"SnapshotId": "snap-1", "AvailabilityZone": "az-b", "State": "optimizing"},
+            ],
+            [{"SnapshotId": "snap-1", "AvailabilityZone": "az-b", "State": "enabled"}],
+        ]
+        calls = []
+
+        def paginate(Filters, **kwargs):
+            calls.append(Filters[0]["Values"])
+            return [{"FastSnapshotRestores": pages[len(calls) - 1]}]
+
+        client.get_paginator.return_value.paginate.side_effect = paginate
+        waiter, _ = make_waiter(client)
+        waiter.add_many("fast_snapshot_restore", ["snap-1/az-a", "snap-1/az-b"], "enabled")
+        assert set(waiter.wait()) == {"snap-1/az-a", "snap-1/az-b"}
+        # Both pairs are described with a single snapshot-id filter value
+        assert calls == [["snap-1"], ["snap-1"]]
+
+    def test_volume_initialization_state(self):
+        client = MagicMock()
+        statuses = [
+            {"VolumeId": "vol-1", "VolumeStatus": {"Details": [{"Name": "io-enabled"}]}},
+            {
+                "VolumeId": "vol-2",
+                "VolumeStatus": {
+                    "Details": [{"Name": "initialization-state", "Status": "initializing"}]
+                },
+            },
+        ]
+        client.get_paginator.return_value.paginate.return_value = [{"VolumeStatuses": statuses}]
+        waiter, _ = make_waiter(client)
+        waiter.add_many("volume_initialization", ["vol-1", "vol-2"], "completed")
+        waiter.poll()
+        assert set(waiter.completed) == {"vol-1"}
+
+    def test_volume_initialization_request(self):
+        # DescribeVolumeStatus takes the IDs as VolumeIds, it has no volume-id filter
+        client = botocore.session.get_session().create_client(
+            "ec2",
+            region_name="us-east-1",
+            aws_access_key_id="testing",
+            aws_secret_access_key="testing",
+        )
+        status = {
+            "VolumeId": "vol-1",
+            "VolumeStatus": {"Details": [{"Name": "initialization-state", "Status": "completed"}]},
+        }
+        with Stubber(client) as stubber:
+            stubber.add_response(
+                "describe_volume_status",
+                {"VolumeStatuses": [status]},
+                {"VolumeIds": ["vol-1", "vol-2"]},
+            )
+            waiter, _ = make_waiter(client)
+            waiter.add_many("volume_initialization", ["vol-1", "vol-2"], "completed")
+            waiter.poll()
+            stubber.assert_no_pending_responses()
+        assert set(waiter.completed) == {"vol-1"}